@@ -5,6 +5,7 @@
 #   - ptk_pydantic_validator.py
 #   - ptk_rust.rs
 #   - ptk_rust_tests.rs
+# or, with --synthetic OUT, a seeded synthetic PTK document of any size
 
 import json, datetime, os, textwrap
 
@@ -374,7 +375,34 @@ def write_rs_tests(path="ptk_rust_tests.rs"):
     with open(path, "w", encoding="utf-8") as f:
         f.write(RS_TESTS.strip() + "\n")
 
+def parse_args(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="Generate the canonical PTK artifacts, or a synthetic PTK document.")
+    ap.add_argument("--synthetic", metavar="OUT", help="write a seeded synthetic PTK document to OUT instead")
+    ap.add_argument("--lines", type=int, default=14)
+    ap.add_argument("--nodes-per-line", default="2:9", help="N or MIN:MAX (uniform per line)")
+    ap.add_argument("--cross-density", type=float, default=0.25, help="cross-sutra pairs per node")
+    ap.add_argument("--special", type=int, default=1, help="special edge pairs")
+    ap.add_argument("--weights", default="const", choices=["const", "uniform", "lognormal"])
+    ap.add_argument("--weight-spread", type=float, default=0.25)
+    ap.add_argument("--seed", type=int, default=0)
+    return ap.parse_args(argv)
+
+def write_synthetic(args):
+    from pt_sim.ptk_synth import SynthSpec, write_synthetic_ptk
+    lo, _, hi = args.nodes_per_line.partition(":")
+    spec = SynthSpec(lines=args.lines, nodes_min=int(lo), nodes_max=int(hi or lo),
+                     cross_density=args.cross_density, special_pairs=args.special,
+                     weight_dist=args.weights, weight_spread=args.weight_spread, seed=args.seed)
+    counts = write_synthetic_ptk(args.synthetic, spec)
+    print("Generated:", args.synthetic, counts)
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.synthetic:
+        write_synthetic(args)
+        raise SystemExit(0)
+
     nodes = build_nodes()
     edges, by_line = build_edges(nodes)
     layout = build_layout(by_line)
@@ -31,6 +31,10 @@ def make_rng(seed: Optional[int] = None) -> np.random.Generator:
         seed = DEFAULT_SEED
     return np.random.default_rng(seed)
 
+def derive_seed(root_seed: int, index: int) -> int:
+    """Reproducible 31-bit seed for event `index` of a run seeded with `root_seed`."""
+    return int(stable_hash_obj(["ptk-event", root_seed, index])[:8], 16) & 0x7FFFFFFF
+
 def write_run_manifest(path: str, seed: int, config: Optional[Dict[str, Any]] = None,
                        extra: Optional[Dict[str, Any]] = None, git_sha: Optional[str] = None) -> RunManifest:
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -1,18 +1,26 @@
 # pt-sim/pt_sim/detector/bridge.py
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+from functools import lru_cache
+from typing import (TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence,
+                    Tuple, Union, cast)
 import numpy as np
 
+from pt_sim.core.rng import DEFAULT_SEED, derive_seed, make_rng
+from pt_sim.detector.digitize import Digitizer
+from pt_sim.detector.readout import SparseReadout
+
 # ---- static types only (for mypy) ----
 if TYPE_CHECKING:
     from pt_sim.detector.geometry import Geometry, Layer, ADC
     from pt_sim.detector.digitize import adc_response as AdcResponseFunc
+    from pt_sim.ptk_result import EmissionResult
 
 # ---- runtime symbols (assign once, then fill in try-block) ----
 _Geometry: Any = None
 _Layer: Any = None
 _ADC: Any = None
 _adc_response: Any = None
+_EmissionResult: Any = None
 
 try:
     from pt_sim.detector.geometry import Geometry as rtGeometry, Layer as rtLayer, ADC as rtADC
@@ -24,6 +32,12 @@ try:
 except Exception:  # pragma: no cover
     pass
 
+try:  # kernel result tables; plain dict results work without them
+    from pt_sim.ptk_result import EmissionResult as rtEmissionResult
+    _EmissionResult = rtEmissionResult
+except Exception:  # pragma: no cover
+    pass
+
 
 
 # ---------------- Utilities & compatibility ----------------
@@ -33,6 +47,9 @@ def _to_int(x: object) -> int:
         return int(x)
     raise TypeError(f"Expected int-like for node id, got {type(x).__name__}")
 
+def _is_emission_result(x: object) -> bool:
+    return _EmissionResult is not None and isinstance(x, _EmissionResult)
+
 def _have_geometry_runtime() -> bool:
     return _Geometry is not None and _Layer is not None and _ADC is not None
 
@@ -58,9 +75,35 @@ def _qp_to_node(line: int, pos: int, n: int) -> int:
     y = (pos - 1) % n
     return x + y * n
 
-def _extract_supported_edges(result: Dict[str, Any], n: int, scale: float) -> List[Tuple[int, float]]:
+def _columns_to_arrays(
+    result: EmissionResult, n: int, scale: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Node and scaled energy arrays for `EmissionResult`: particles by Q,
+    then fields (no Q -> node of line 1, pos 1)."""
+    p, f = result.particle, result.field
+    line = p.q_line.astype(np.int64)
+    pos = p.q_pos.astype(np.int64)
+    nodes = np.concatenate([(line - 1) % n + ((pos - 1) % n) * n,
+                            np.full(len(f.energy), _qp_to_node(1, 1, n), dtype=np.int64)])
+    e = np.concatenate([p.energy, f.energy]) * scale
+    keep = e != 0.0
+    return nodes[keep], e[keep]
+
+def _edges_from_columns(result: EmissionResult, n: int, scale: float) -> List[Tuple[int, float]]:
+    """Fast path for `EmissionResult`: particles by Q, then fields
+    (no Q -> node of line 1, pos 1)."""
+    nodes, e = _columns_to_arrays(result, n, scale)
+    return list(zip(nodes.tolist(), e.tolist()))
+
+def _extract_supported_edges(
+    result: Mapping[str, Any], n: int, scale: float
+) -> List[Tuple[int, float]]:
     edges: List[Tuple[int, float]] = []
 
+    if _is_emission_result(result):
+        # kernel fields carry edge-id strings, so the support_edges path never applies
+        return _edges_from_columns(cast("EmissionResult", result), n, scale)
+
     # Preferred: fields[*].support_edges
     for f in (result.get("fields") or []):
         if isinstance(f, dict):
@@ -97,10 +140,99 @@ def _extract_supported_edges(result: Dict[str, Any], n: int, scale: float) -> Li
     return edges
 
 
+def _edge_arrays(
+    result_or_edges: Union[Mapping[str, Any], Iterable[Tuple[int, float]]],
+    G: "Geometry",
+    n: Optional[int],
+    scale: float,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Normalize a result or (node, energy) iterable to int64 node /
+    float64 energy arrays (energies scaled)."""
+    N = int(n) if n is not None else int(getattr(G, "cells_x", 32))
+    if _is_emission_result(result_or_edges):
+        return _columns_to_arrays(cast("EmissionResult", result_or_edges), N, scale)
+    if isinstance(result_or_edges, Mapping):
+        edges = _extract_supported_edges(result_or_edges, N, scale)
+        return (np.array([i for i, _ in edges], dtype=np.int64),
+                np.array([e for _, e in edges], dtype=float))
+    pairs = list(result_or_edges)
+    if not pairs:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=float)
+    ids, es = zip(*pairs)
+    nodes = np.array(ids)
+    if nodes.dtype.kind not in "iub":
+        for i in ids:
+            _to_int(i)  # raises the TypeError for the first bad id
+    return nodes.astype(np.int64), np.array(es, dtype=float) * scale
+
+
+@lru_cache(maxsize=64)
+def _stencil(ribbon_width: int, atten: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Window offsets (dy, dx) and weights atten**(|dy| + |dx|), row-major
+    over the (2w+1)^2 window."""
+    d = np.arange(-ribbon_width, ribbon_width + 1)
+    dy = np.repeat(d, d.size)
+    dx = np.tile(d, d.size)
+    w = np.power(atten, np.abs(dy) + np.abs(dx))
+    for a in (dy, dx, w):
+        a.setflags(write=False)
+    return dy, dx, w
+
+
+_SCATTER_CHUNK = 1 << 20  # (deposit, offset) entries per np.add.at pass
+
+
+def _scatter_deposits(img: np.ndarray, nodes: np.ndarray, energies: np.ndarray, ribbon_width: int,
+                      atten: float, event: Optional[np.ndarray] = None) -> None:
+    """Add every deposit's attenuated (2w+1)^2 stencil to `img` in place, clipped at the borders.
+
+    `img` is one (cells_y, cells_x) image, or a C-contiguous stack of them
+    with `event` giving each deposit's image. Each cell receives its
+    contributions in deposit order, one add at a time (np.add.at is
+    unbuffered and sequential), so the image is bit-identical to adding
+    the patches deposit by deposit.
+    """
+    cy, cx = img.shape[-2:]
+    dy, dx, w = _stencil(int(ribbon_width), float(atten))
+    if not nodes.size or not w.size:
+        return
+    flat = img.reshape(-1)
+    per = max(1, _SCATTER_CHUNK // w.size)
+    for s in range(0, nodes.size, per):
+        node = nodes[s:s + per]
+        x = (node % cx)[:, None] + dx
+        y = ((node // cx) % cy)[:, None] + dy
+        inside = (x >= 0) & (x < cx) & (y >= 0) & (y < cy)
+        idx = y * cx + x
+        if event is not None:
+            idx += (event[s:s + per] * (cy * cx))[:, None]
+        vals = energies[s:s + per, None] * w
+        np.add.at(flat, idx[inside], vals[inside])
+
+
+def _adc_settings(G: "Geometry", layer_name: str) -> Tuple[float, float, float, float]:
+    """(pedestal, gain, noise_sigma, threshold) of `layer_name`, or the
+    defaults if the geometry has no layers."""
+    # Defaults
+    ped, gain, noise, thr = 200.0, 1.0, 2.0, 205.0
+
+    # If geometry exposes a 'layer' method with adc settings, use them
+    layer_fn = getattr(G, "layer", None)
+    if callable(layer_fn):
+        layer = layer_fn(layer_name)  # runtime object
+        if layer is None:
+            raise ValueError(f"Layer '{layer_name}' not found in geometry.")
+        ped = float(layer.adc.pedestal)
+        gain = float(layer.adc.gain)
+        noise = float(layer.adc.noise_sigma)
+        thr = float(layer.adc.threshold)
+    return ped, gain, noise, thr
+
+
 # ---------------- Core image builders (new API with legacy compat) ----------------
 
 def kernel_to_ecal_image(
-    result_or_edges: Union[Dict[str, Any], Iterable[Tuple[int, float]]],
+    result_or_edges: Union[Mapping[str, Any], Iterable[Tuple[int, float]]],
     *args,  # legacy positional: Geometry or int(n)
     geom: Optional["Geometry"] = None,
     n: Optional[int] = None,
@@ -122,29 +254,14 @@ def kernel_to_ecal_image(
     scale = e_scale if e_scale is not None else (E_scale if E_scale is not None else 1.0)
     G = _ensure_geom(geom, n)
 
-    # Normalize to supported_edges iterable
-    if isinstance(result_or_edges, dict):
-        N = int(n) if n is not None else int(getattr(G, "cells_x", 32))
-        supported_edges = _extract_supported_edges(result_or_edges, N, scale)
-    else:
-        supported_edges = [(_to_int(i), float(e) * scale) for (i, e) in result_or_edges]
-
+    nodes, energies = _edge_arrays(result_or_edges, G, n, scale)
     img = np.zeros((G.cells_y, G.cells_x), dtype=float)
-    for node_id, e in supported_edges:
-        x = node_id % G.cells_x
-        y = (node_id // G.cells_x) % G.cells_y
-        x0, x1 = max(0, x - ribbon_width), min(G.cells_x, x + ribbon_width + 1)
-        y0, y1 = max(0, y - ribbon_width), min(G.cells_y, y + ribbon_width + 1)
-        patch = img[y0:y1, x0:x1]
-        ky = np.abs(np.arange(y0, y1) - y)[:, None]
-        kx = np.abs(np.arange(x0, x1) - x)[None, :]
-        kernel = np.power(atten, ky + kx)
-        patch += e * kernel
+    _scatter_deposits(img, nodes, energies, ribbon_width, atten)
     return img
 
 
 def kernel_to_adc_counts(
-    result_or_edges: Union[Dict[str, Any], Iterable[Tuple[int, float]]],
+    result_or_edges: Union[Mapping[str, Any], Iterable[Tuple[int, float]]],
     *args,
     geom: Optional["Geometry"] = None,
     n: Optional[int] = None,
@@ -153,7 +270,12 @@ def kernel_to_adc_counts(
     e_scale: Optional[float] = None,
     ribbon_width: int = 1,
     atten: float = 1.0,
+    rng: Optional[np.random.Generator] = None,
+    digitizer: Optional[Digitizer] = None,
 ) -> np.ndarray:
+    """Digitized counts for one event. `digitizer` overrides the layer's ADC
+    settings; `rng` seeds the noise (default: the digitizer's stream, or the
+    legacy global `np.random` state)."""
     if args:
         a = args[0]
         if _Geometry is not None and hasattr(a, "cells_x") and hasattr(a, "cells_y"):
@@ -174,23 +296,169 @@ def kernel_to_adc_counts(
         E_scale=scale,
     )
 
-    # Defaults
-    ped, gain, noise, thr = 200.0, 1.0, 2.0, 205.0
+    if digitizer is not None:
+        return digitizer.digitize(img, out=img, rng=rng)
 
-    # If geometry exposes a 'layer' method with adc settings, use them
-    layer_fn = getattr(G, "layer", None)
-    if callable(layer_fn):
-        layer = layer_fn(layer_name)  # runtime object
-        if layer is None:
-            raise ValueError(f"Layer '{layer_name}' not found in geometry.")
-        ped = float(layer.adc.pedestal)
-        gain = float(layer.adc.gain)
-        noise = float(layer.adc.noise_sigma)
-        thr = float(layer.adc.threshold)
+    ped, gain, noise, thr = _adc_settings(G, layer_name)
 
     if _adc_response is not None:
-        return _adc_response(img, pedestal=ped, gain=gain, noise_sigma=noise, threshold=thr)
+        return _adc_response(img, pedestal=ped, gain=gain, noise_sigma=noise, threshold=thr,
+                             rng=rng)
 
     noisy = ped + gain * img
     return np.where(noisy >= thr, noisy, 0.0)
 
+
+
+# ---------------- Batched builders ----------------
+
+EventInput = Union[Mapping[str, Any], Iterable[Tuple[int, float]]]
+
+
+_EVENT_CHUNK = 64  # events per scatter / digitize pass (keeps the working set in cache)
+
+
+def _batch_out(
+    n_events: int, G: "Geometry", dtype: Any, out: Optional[np.ndarray]
+) -> np.ndarray:
+    shape = (n_events, G.cells_y, G.cells_x)
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or not out.flags.c_contiguous:
+        raise ValueError(f"out must be a C-contiguous array of shape {shape}")
+    return out
+
+
+def _fill_images(buf: np.ndarray, events: Sequence[EventInput], G: "Geometry", n: Optional[int],
+                 scale: float, ribbon_width: int, atten: float) -> None:
+    """Images of `events` into the float64 stack `buf`, all deposits in one scatter pass."""
+    arrays = [_edge_arrays(ev, G, n, scale) for ev in events]
+    sizes = [a[0].size for a in arrays]
+    buf.fill(0.0)
+    if arrays and sum(sizes):
+        nodes = np.concatenate([a[0] for a in arrays])
+        energies = np.concatenate([a[1] for a in arrays])
+        _scatter_deposits(buf, nodes, energies, ribbon_width, atten,
+                          event=np.repeat(np.arange(len(arrays)), sizes))
+
+
+def _event_chunks(out: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+    """(first event, float64 buffer) per chunk: slices of `out` when it is
+    float64, else a reused scratch stack."""
+    scratch = None
+    if out.dtype != np.float64:
+        scratch = np.empty((min(_EVENT_CHUNK, out.shape[0]),) + out.shape[1:], dtype=float)
+    for k0 in range(0, out.shape[0], _EVENT_CHUNK):
+        k1 = min(out.shape[0], k0 + _EVENT_CHUNK)
+        yield k0, out[k0:k1] if scratch is None else scratch[:k1 - k0]
+
+
+def _digitize_chunk(buf: np.ndarray, digitizer: Digitizer, root: int, first: int) -> None:
+    """Digitize a stack of images in place; image k uses the generator of event `first + k`."""
+    for k in range(buf.shape[0]):
+        digitizer.digitize(buf[k], out=buf[k], rng=make_rng(derive_seed(root, first + k)))
+
+
+def kernel_to_ecal_image_batch(
+    events: Sequence[EventInput],
+    geom: Optional["Geometry"] = None,
+    n: Optional[int] = None,
+    E_scale: Optional[float] = None,
+    e_scale: Optional[float] = None,
+    ribbon_width: int = 1,
+    atten: float = 1.0,
+    dtype: Any = np.float64,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """`kernel_to_ecal_image` for many events, filled into one (n_events, cells_y, cells_x) array.
+
+    All deposits of a chunk of events go through a single scatter pass.
+    Images are built in float64 (bit-identical to the single-event call)
+    and cast on store, so `dtype=np.float32` only rounds the final values.
+    `out` may be a preallocated C-contiguous array of that shape.
+    """
+    scale = e_scale if e_scale is not None else (E_scale if E_scale is not None else 1.0)
+    G = _ensure_geom(geom, n)
+    out = _batch_out(len(events), G, dtype, out)
+    for k0, buf in _event_chunks(out):
+        _fill_images(buf, events[k0:k0 + buf.shape[0]], G, n, scale, ribbon_width, atten)
+        if out.dtype != np.float64:
+            out[k0:k0 + buf.shape[0]] = buf
+    return out
+
+
+def kernel_to_adc_counts_batch(
+    events: Sequence[EventInput],
+    geom: Optional["Geometry"] = None,
+    n: Optional[int] = None,
+    layer_name: str = "ecal",
+    E_scale: Optional[float] = None,
+    e_scale: Optional[float] = None,
+    ribbon_width: int = 1,
+    atten: float = 1.0,
+    seed: Optional[int] = None,
+    first_event: int = 0,
+    digitizer: Optional[Digitizer] = None,
+    dtype: Any = np.float64,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """`kernel_to_adc_counts` for many events into one (n_events, cells_y, cells_x) array.
+
+    Event k draws its noise from its own generator seeded with
+    `derive_seed(seed, first_event + k)` (seed None: `DEFAULT_SEED`), so any
+    event's counts are reproducible on their own, whatever batch or chunk
+    it was produced in. `digitizer` overrides the layer's ADC settings (e.g.
+    per-channel pedestals); its own stream is not used.
+    """
+    scale = e_scale if e_scale is not None else (E_scale if E_scale is not None else 1.0)
+    G = _ensure_geom(geom, n)
+    if digitizer is None:
+        digitizer = Digitizer(*_adc_settings(G, layer_name))
+    root = DEFAULT_SEED if seed is None else seed
+    out = _batch_out(len(events), G, dtype, out)
+    for k0, buf in _event_chunks(out):
+        _fill_images(buf, events[k0:k0 + buf.shape[0]], G, n, scale, ribbon_width, atten)
+        _digitize_chunk(buf, digitizer, root, first_event + k0)
+        if out.dtype != np.float64:
+            out[k0:k0 + buf.shape[0]] = buf
+    return out
+
+
+def kernel_to_adc_sparse(
+    events: Sequence[EventInput],
+    geom: Optional["Geometry"] = None,
+    n: Optional[int] = None,
+    layer_name: str = "ecal",
+    E_scale: Optional[float] = None,
+    e_scale: Optional[float] = None,
+    ribbon_width: int = 1,
+    atten: float = 1.0,
+    seed: Optional[int] = None,
+    first_event: int = 0,
+    digitizer: Optional[Digitizer] = None,
+    dtype: Any = np.float64,
+) -> SparseReadout:
+    """Zero-suppressed `kernel_to_adc_counts_batch`: only channels above threshold are kept.
+
+    Noise can lift any channel over threshold, so every channel is still
+    digitized, but only in one reused scratch stack of `_EVENT_CHUNK`
+    events; the (n_events, cells_y, cells_x) array is never built. Hits are
+    identical to `SparseReadout.from_dense` of the dense batch output.
+    """
+    scale = e_scale if e_scale is not None else (E_scale if E_scale is not None else 1.0)
+    G = _ensure_geom(geom, n)
+    if digitizer is None:
+        digitizer = Digitizer(*_adc_settings(G, layer_name))
+    root = DEFAULT_SEED if seed is None else seed
+    scratch = np.empty((min(_EVENT_CHUNK, len(events)), G.cells_y, G.cells_x), dtype=float)
+    parts = []
+    for k0 in range(0, len(events), _EVENT_CHUNK):
+        buf = scratch[:min(_EVENT_CHUNK, len(events) - k0)]
+        _fill_images(buf, events[k0:k0 + buf.shape[0]], G, n, scale, ribbon_width, atten)
+        _digitize_chunk(buf, digitizer, root, first_event + k0)
+        part = SparseReadout.from_dense(buf)
+        part.adc = part.adc.astype(dtype, copy=False)
+        parts.append(part)
+    if not parts:
+        return SparseReadout.empty((G.cells_y, G.cells_x), dtype=dtype)
+    return SparseReadout.concat(parts)
@@ -1,8 +1,76 @@
 from __future__ import annotations
 import numpy as np
-from typing import Tuple
+from typing import TYPE_CHECKING, Optional, Union
 
-def adc_response(energy_map: np.ndarray, pedestal=200.0, gain=1.0, noise_sigma=2.0, threshold=205.0) -> np.ndarray:
-    """Simple ADC model: pedestal + gain*E + Gaussian noise, with thresholding."""
+from pt_sim.core.rng import make_rng
+
+if TYPE_CHECKING:
+    from pt_sim.detector.geometry import ADC
+
+Param = Union[float, np.ndarray]  # scalar, or per-channel array broadcastable to the image
+
+
+def adc_response(energy_map: np.ndarray, pedestal=200.0, gain=1.0, noise_sigma=2.0, threshold=205.0,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Simple ADC model: pedestal + gain*E + Gaussian noise, with thresholding.
+
+    Without `rng` the noise comes from the global `np.random` state (legacy);
+    with one, this is `Digitizer(...).digitize(energy_map)`.
+    """
+    if rng is not None:
+        return Digitizer(pedestal, gain, noise_sigma, threshold, rng=rng).digitize(energy_map)
     noisy = pedestal + gain * energy_map + np.random.normal(0.0, noise_sigma, size=energy_map.shape)
     return np.where(noisy >= threshold, noisy, 0.0)
+
+
+class Digitizer:
+    """ADC model with its own noise stream, working in place.
+
+    counts = pedestal + gain * E + N(0, noise_sigma), set to 0 where below
+    threshold. Each parameter is a scalar or a per-channel array that
+    broadcasts against the energy map. Noise and mask scratch buffers are
+    kept between calls, so digitizing into a caller-supplied `out` does not
+    allocate once the shapes have been seen.
+    """
+
+    def __init__(self, pedestal: Param = 200.0, gain: Param = 1.0, noise_sigma: Param = 2.0,
+                 threshold: Param = 205.0, rng: Optional[np.random.Generator] = None):
+        self.pedestal = pedestal
+        self.gain = gain
+        self.noise_sigma = noise_sigma
+        self.threshold = threshold
+        self.rng = rng if rng is not None else make_rng()
+        self._noise = np.empty(0)
+        self._mask = np.empty(0, dtype=bool)
+
+    @classmethod
+    def from_adc(cls, adc: "ADC", rng: Optional[np.random.Generator] = None) -> "Digitizer":
+        return cls(adc.pedestal, adc.gain, adc.noise_sigma, adc.threshold, rng=rng)
+
+    def _scratch(self, shape) -> None:
+        if self._noise.shape != shape:
+            self._noise = np.empty(shape, dtype=float)
+            self._mask = np.empty(shape, dtype=bool)
+
+    def digitize(self, energy_map: np.ndarray, out: Optional[np.ndarray] = None,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Counts for `energy_map` into `out` (float64, same shape; may be `energy_map` itself).
+
+        Noise is drawn from `rng` if given (e.g. one generator per event),
+        else from the digitizer's own stream.
+        """
+        if out is None:
+            out = np.empty(energy_map.shape, dtype=float)
+        elif out.shape != energy_map.shape or out.dtype != np.float64:
+            raise ValueError(f"out must be float64 with shape {energy_map.shape}")
+        self._scratch(out.shape)
+        noise, mask = self._noise, self._mask
+        np.multiply(energy_map, self.gain, out=out)
+        out += self.pedestal
+        (rng if rng is not None else self.rng).standard_normal(out=noise)
+        noise *= self.noise_sigma
+        out += noise
+        np.greater_equal(out, self.threshold, out=mask)
+        np.logical_not(mask, out=mask)
+        np.copyto(out, 0.0, where=mask)
+        return out
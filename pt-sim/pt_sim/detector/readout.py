@@ -0,0 +1,165 @@
+# pt-sim/pt_sim/detector/readout.py
+"""
+Zero-suppressed sparse ADC readout.
+
+A `SparseReadout` holds the channels above threshold for a run of events:
+flat channel index (y * cells_x + x), ADC value and an optional time per
+hit, with `offsets[k]:offsets[k + 1]` selecting event k. Conversion to and
+from dense (n_events, cells_y, cells_x) arrays is exact.
+
+On disk a readout file is a JSON header followed by chunks, each a group of
+`.npy` records (offsets, channel, adc[, time]) written one after another.
+`SparseWriter` appends chunks as they are produced; `iter_chunks` streams
+them back and `read_readout` loads the whole file.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import IO, Iterator, Optional, Sequence, Tuple
+import json
+import os
+
+import numpy as np
+
+READOUT_FORMAT = "pt-sparse-readout-v1"
+
+
+@dataclass
+class SparseReadout:
+    shape: Tuple[int, int]          # (cells_y, cells_x)
+    offsets: np.ndarray             # int64, n_events + 1
+    channel: np.ndarray             # int32 flat channel index per hit
+    adc: np.ndarray                 # ADC value per hit
+    time: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self.offsets.shape[0] - 1
+
+    @property
+    def n_hits(self) -> int:
+        return int(self.offsets[-1])
+
+    def event(self, k: int) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """(channel, adc, time) of event k."""
+        s = slice(int(self.offsets[k]), int(self.offsets[k + 1]))
+        return self.channel[s], self.adc[s], None if self.time is None else self.time[s]
+
+    def event_index(self) -> np.ndarray:
+        """Event number of every hit."""
+        return np.repeat(np.arange(len(self), dtype=np.int64), np.diff(self.offsets))
+
+    @classmethod
+    def empty(cls, shape: Tuple[int, int], dtype=float, time: bool = False) -> "SparseReadout":
+        """A readout with no events."""
+        return cls(shape, np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                   np.zeros(0, dtype=dtype), np.zeros(0) if time else None)
+
+    @classmethod
+    def from_dense(cls, dense: np.ndarray, time: Optional[np.ndarray] = None) -> "SparseReadout":
+        """Non-zero channels of an (n_events, cells_y, cells_x) array;
+        `time` (same shape) is sampled at the hits."""
+        n, cy, cx = dense.shape
+        flat = dense.reshape(n, cy * cx)
+        ev, ch = np.nonzero(flat)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(ev, minlength=n), out=offsets[1:])
+        t = None if time is None else time.reshape(n, cy * cx)[ev, ch]
+        return cls((cy, cx), offsets, ch.astype(np.int32), flat[ev, ch], t)
+
+    def to_dense(self, dtype=None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """(n_events, cells_y, cells_x) array with zeros off the hits."""
+        cy, cx = self.shape
+        if out is None:
+            out = np.zeros((len(self), cy, cx), dtype=dtype or self.adc.dtype)
+        else:
+            out.fill(0)
+        out.reshape(len(self), cy * cx)[self.event_index(), self.channel] = self.adc
+        return out
+
+    @classmethod
+    def concat(cls, parts: Sequence["SparseReadout"]) -> "SparseReadout":
+        if not parts:
+            raise ValueError("nothing to concatenate")
+        shape = parts[0].shape
+        if any(p.shape != shape for p in parts):
+            raise ValueError("readouts have different shapes")
+        has_time = parts[0].time is not None
+        if any((p.time is not None) != has_time for p in parts):
+            raise ValueError("readouts disagree on the time column")
+        counts = np.concatenate([np.diff(p.offsets) for p in parts])
+        offsets = np.zeros(counts.shape[0] + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        channel = np.concatenate([p.channel for p in parts])
+        adc = np.concatenate([p.adc for p in parts])
+        time = np.concatenate([p.time for p in parts if p.time is not None]) if has_time else None
+        return cls(shape, offsets, channel, adc, time)
+
+
+class SparseWriter:
+    """Append `SparseReadout` chunks to a readout file; use as `with SparseWriter(...) as w:`."""
+
+    def __init__(self, path: str, shape: Tuple[int, int], time: bool = False):
+        if len(shape) != 2 or int(shape[0]) < 1 or int(shape[1]) < 1:
+            raise ValueError(f"shape must be (cells_y, cells_x) with both > 0, got {shape}")
+        self.shape = (int(shape[0]), int(shape[1]))
+        self.time = bool(time)
+        self.n_events = 0
+        header = {"format": READOUT_FORMAT, "shape": list(self.shape), "time": self.time}
+        self._f: IO[bytes] = open(path, "wb")
+        try:
+            np.save(self._f, np.array(json.dumps(header)), allow_pickle=False)
+        except BaseException:
+            self._f.close()
+            raise
+
+    def write(self, chunk: SparseReadout) -> None:
+        if chunk.shape != self.shape:
+            raise ValueError(f"chunk shape {chunk.shape} != file shape {self.shape}")
+        if (chunk.time is not None) != self.time:
+            raise ValueError("chunk time column does not match the file header")
+        arrays = [chunk.offsets, chunk.channel, chunk.adc]
+        if chunk.time is not None:
+            arrays.append(chunk.time)
+        for a in arrays:
+            np.save(self._f, a, allow_pickle=False)
+        self.n_events += len(chunk)
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "SparseWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_readout(path: str, readout: SparseReadout) -> None:
+    with SparseWriter(path, readout.shape, time=readout.time is not None) as w:
+        w.write(readout)
+
+
+def _read_header(f: IO[bytes], path: str) -> Tuple[Tuple[int, int], bool]:
+    header = json.loads(str(np.load(f, allow_pickle=False)))
+    if header.get("format") != READOUT_FORMAT:
+        raise ValueError(f"{path}: not a {READOUT_FORMAT} file")
+    return (int(header["shape"][0]), int(header["shape"][1])), bool(header["time"])
+
+
+def iter_chunks(path: str) -> Iterator[SparseReadout]:
+    """Chunks of a readout file in write order."""
+    with open(path, "rb") as f:
+        shape, has_time = _read_header(f, path)
+        size = os.fstat(f.fileno()).st_size
+        while f.tell() < size:
+            arrays = [np.load(f, allow_pickle=False) for _ in range(4 if has_time else 3)]
+            yield SparseReadout(shape, *arrays)
+
+
+def read_readout(path: str) -> SparseReadout:
+    """The whole file as one readout."""
+    parts = list(iter_chunks(path))
+    if parts:
+        return SparseReadout.concat(parts)
+    with open(path, "rb") as f:
+        shape, has_time = _read_header(f, path)
+    return SparseReadout.empty(shape, time=has_time)
@@ -1,33 +1,213 @@
 # pt-sim/pt_sim/detector/run_from_kernel.py
+"""
+Detector response for emission results.
+
+Without `--results` this digitizes one placeholder deposit (demo). With
+`--results` it streams emission results from a JSONL file (one result per
+line), a JSON file (a list of results, or one), a single `EmissionResult`
+.npz or a directory of them (name order), runs the bridge and digitizer on
+`--workers` processes and appends each chunk of events to one sparse
+readout file (see `detector.readout`).
+
+At most `--queue` chunks are in flight: once the window is full the reader
+waits for the oldest chunk, which is written before the next one is read,
+so memory stays bounded however long the input is. Chunks are written in
+input order and event k's noise comes from `derive_seed(seed, k)`, so the
+output does not depend on the worker count or chunk size.
+"""
 from __future__ import annotations
-import argparse, os, json
+import argparse, os, json, sys, time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 import numpy as np
 from pt_sim.detector.geometry import Geometry
-from pt_sim.detector.bridge import kernel_to_ecal_image, kernel_to_adc_counts
+from pt_sim.detector.bridge import (EventInput, kernel_to_ecal_image, kernel_to_adc_counts,
+                                    kernel_to_adc_sparse)
+from pt_sim.detector.readout import SparseReadout, SparseWriter, write_readout
 
-def main():
-    ap = argparse.ArgumentParser()
-    ap.add_argument("--geom", default="detector/geometry.yaml", help="Path to detector geometry YAML (repo-root relative is fine).")
-    ap.add_argument("--seed", type=int, default=123)
-    ap.add_argument("--out", default="out/detector")
-    args = ap.parse_args()
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
 
-    # 1) geometry
-    geom = Geometry.from_yaml(args.geom)
 
-    # 2) get supported_edges from your kernel (replace with real call)
+# ---------------- Result streams ----------------
+
+def iter_results(path: str) -> Iterator[EventInput]:
+    """Emission results from `path`, one at a time (a JSON list is parsed whole)."""
+    # kernel side: imported here so JSON inputs need nothing beyond the detector package
+    from pt_sim.ptk_result import EmissionResult
+
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if name.endswith(".npz"):
+                yield EmissionResult.load(os.path.join(path, name), None)
+    elif path.endswith(".npz"):
+        yield EmissionResult.load(path, None)
+    elif path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        yield from (data if isinstance(data, list) else [data])
+
+
+def _chunks(items: Iterable[EventInput], size: int) -> Iterator[List[EventInput]]:
+    chunk: List[EventInput] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ---------------- Pipeline ----------------
+
+@dataclass(frozen=True)
+class BridgeSettings:
+    layer_name: str = "ecal"
+    e_scale: float = 1.0
+    ribbon_width: int = 1
+    atten: float = 0.7
+    seed: int = 123
+
+
+_GEOM: Optional[Geometry] = None  # per-worker geometry, set by _init_worker
+
+
+def _init_worker(geom: Geometry) -> None:
+    global _GEOM
+    _GEOM = geom
+
+
+def _digitize_chunk(geom: Geometry, settings: BridgeSettings, first: int,
+                    events: List[EventInput]) -> SparseReadout:
+    return kernel_to_adc_sparse(events, geom, layer_name=settings.layer_name,
+                                e_scale=settings.e_scale, ribbon_width=settings.ribbon_width,
+                                atten=settings.atten, seed=settings.seed, first_event=first)
+
+
+def _digitize_chunk_worker(job: Tuple[BridgeSettings, int, List[EventInput]]) -> SparseReadout:
+    if _GEOM is None:
+        raise RuntimeError("worker not initialized: the pool needs initializer=_init_worker")
+    return _digitize_chunk(_GEOM, *job)
+
+
+def _peak_rss() -> Dict[str, int]:
+    """Peak RSS in bytes of this process and of its (reaped) children."""
+    if resource is None:
+        return {"self": 0, "children": 0}
+    unit = 1 if sys.platform == "darwin" else 1024  # KiB on Linux
+    return {"self": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit,
+            "children": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit}
+
+
+def run_pipeline(results: Iterable[EventInput], geom: Geometry, out: str,
+                 settings: Optional[BridgeSettings] = None, workers: int = 1, chunk: int = 64,
+                 queue: Optional[int] = None) -> Dict[str, Any]:
+    """Digitize every result into the sparse readout file `out`; returns run stats.
+
+    `workers` > 1 uses a process pool with at most `queue` chunks (default
+    2 x workers) in flight.
+    """
+    settings = settings or BridgeSettings()
+    t0 = time.perf_counter()
+    n_events = n_hits = 0
+    with SparseWriter(out, (geom.cells_y, geom.cells_x)) as writer:
+        def emit(part: SparseReadout) -> None:
+            nonlocal n_events, n_hits
+            writer.write(part)
+            n_events += len(part)
+            n_hits += part.n_hits
+
+        if workers <= 1:
+            first = 0
+            for events in _chunks(results, chunk):
+                emit(_digitize_chunk(geom, settings, first, events))
+                first += len(events)
+        else:
+            window = queue or 2 * workers
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(geom,)) as pool:
+                pending: Deque[Future] = deque()
+                first = 0
+                for events in _chunks(results, chunk):
+                    if len(pending) >= window:
+                        emit(pending.popleft().result())
+                    job = (settings, first, events)
+                    pending.append(pool.submit(_digitize_chunk_worker, job))
+                    first += len(events)
+                while pending:
+                    emit(pending.popleft().result())
+    elapsed = time.perf_counter() - t0
+    return {"events": n_events, "hits": n_hits, "seconds": elapsed,
+            "events_per_s": n_events / elapsed if elapsed > 0 else 0.0,
+            "peak_rss_bytes": _peak_rss()}
+
+
+# ---------------- CLI ----------------
+
+def _demo(args: argparse.Namespace, geom: Geometry) -> None:
     # placeholder example: a small cross of energy at center node
     supported_edges = [(geom.cells_x//2 + geom.cells_x*(geom.cells_y//2), 10.0)]
 
-    # 3) image + adc
     img = kernel_to_ecal_image(supported_edges, geom, ribbon_width=1, atten=0.7)
-    adc = kernel_to_adc_counts(supported_edges, geom, layer_name="ecal")
+    np.save(os.path.join(args.out, "ecal_energy.npy"), img)
+    if args.readout == "sparse":
+        readout = kernel_to_adc_sparse([supported_edges], geom, layer_name="ecal", seed=args.seed)
+        write_readout(os.path.join(args.out, "ecal_adc.sparse"), readout)
+    else:
+        adc = kernel_to_adc_counts(supported_edges, geom, layer_name="ecal")
+        np.save(os.path.join(args.out, "ecal_adc.npy"), adc)
 
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--geom", default="detector/geometry.yaml",
+                    help="Path to detector geometry YAML (repo-root relative is fine).")
+    ap.add_argument("--seed", type=int, default=123)
+    ap.add_argument("--out", default="out/detector")
+    ap.add_argument("--readout", choices=("dense", "sparse"), default="dense",
+                    help="Demo ADC output: dense ecal_adc.npy, or zero-suppressed ecal_adc.sparse "
+                         "(see detector.readout)")
+    ap.add_argument("--results",
+                    help="Emission results: .jsonl, .json, result .npz or a directory of them")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Bridge/digitizer processes (0: CPU count)")
+    ap.add_argument("--chunk", type=int, default=64, help="Events per work item / readout chunk")
+    ap.add_argument("--queue", type=int, default=None,
+                    help="Max chunks in flight (default 2 x workers)")
+    ap.add_argument("--layer", default="ecal")
+    ap.add_argument("--e-scale", type=float, default=1.0)
+    ap.add_argument("--ribbon-width", type=int, default=1)
+    ap.add_argument("--atten", type=float, default=0.7)
+    args = ap.parse_args()
+
+    geom = Geometry.from_yaml(args.geom)
     os.makedirs(args.out, exist_ok=True)
-    np.save(os.path.join(args.out, "ecal_energy.npy"), img)
-    np.save(os.path.join(args.out, "ecal_adc.npy"), adc)
     with open(os.path.join(args.out, "geom.json"), "w") as f:
         f.write(geom.to_json())
+    if not args.results:
+        _demo(args, geom)
+        return
+
+    settings = BridgeSettings(args.layer, args.e_scale, args.ribbon_width, args.atten, args.seed)
+    out = os.path.join(args.out, "ecal_adc.sparse")
+    workers = args.workers or os.cpu_count() or 1
+    stats = run_pipeline(iter_results(args.results), geom, out, settings,
+                         workers=workers, chunk=args.chunk, queue=args.queue)
+    rss = stats["peak_rss_bytes"]
+    print(f"Wrote {stats['events']} events ({stats['hits']} hits) to {out}")
+    print(f"{stats['events_per_s']:.1f} events/s over {stats['seconds']:.2f} s; "
+          f"peak RSS {rss['self'] / 2**20:.1f} MiB (main), "
+          f"{rss['children'] / 2**20:.1f} MiB (largest worker)")
 
 if __name__ == "__main__":
     main()
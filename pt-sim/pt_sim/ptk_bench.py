@@ -0,0 +1,215 @@
+# ruff: noqa: E501
+"""
+Emission benchmark suite.
+
+Runs `PTKKernel.simulate_emission` over a matrix of graph sizes, sound
+counts, `max_steps`, engines and input kinds, and reports events/s,
+packets processed/s (sum of live packets over all steps, from one profiled
+pass), the peak Python heap of one event (tracemalloc slows the kernel
+~30x, so only the first event is traced) and the process peak RSS so far.
+Graphs other than the canonical kernel come from `ptk_synth`.
+
+Input kinds:
+  "cancel" - every + sound has a - partner at the same node, frequency and
+             opposite phase (the worst case for cancellation candidates)
+  "free"   - the same load with frequencies far outside cancel_bandwidth
+Packets only travel on edges of their own polarity, so on well-formed
+documents the "cancellations" count stays 0 for both; the pair is kept so
+the suite picks up any routing change that lets them meet.
+
+Results are plain JSON (`run_suite` -> `save`); `compare` flags cases whose
+throughput dropped, or memory grew, by more than a threshold against a
+stored baseline. CLI: tools/bench_emission.py.
+"""
+
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import io
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+import numpy as np
+
+from .ptk_kernel import EmissionConfig, PTKKernel, Sound
+from .ptk_synth import SynthSpec, write_synthetic_ptk
+
+BENCH_FORMAT = "ptk-bench-v1"
+INPUT_KINDS = ("cancel", "free")
+# graph size key -> synthetic spec; "canonical" is the bundled ptk.v1.json
+GRAPH_SIZES: Dict[str, Optional[SynthSpec]] = {
+    "canonical": None,
+    "1k": SynthSpec(lines=100, nodes_min=8, nodes_max=12, seed=1),
+    "10k": SynthSpec(lines=1000, nodes_min=8, nodes_max=12, seed=1),
+}
+
+Event = Tuple[List[Sound], List[Sound]]
+
+
+@dataclass(frozen=True)
+class BenchCase:
+    graph: str = "canonical"
+    sounds: int = 8          # sounds per event (half +, half -)
+    max_steps: int = 50
+    inputs: str = "cancel"
+    engine: str = "packet"
+    events: int = 8
+
+    @property
+    def name(self) -> str:
+        return f"{self.graph}/s{self.sounds}/t{self.max_steps}/{self.inputs}/{self.engine}"
+
+
+def default_matrix(quick: bool = False) -> List[BenchCase]:
+    if quick:
+        return [BenchCase(g, 8, 20, i, e, events=4) for g in ("canonical", "1k") for i in INPUT_KINDS for e in ("packet", "vector")]
+    return [BenchCase(g, s, t, i, e)
+            for g in GRAPH_SIZES for s in (8, 64) for t in (20, 40) for i in INPUT_KINDS for e in ("packet", "vector", "event")]
+
+
+def load_graph(key: str, canonical_path: str = "ptk.v1.json") -> PTKKernel:
+    spec = GRAPH_SIZES[key]
+    if spec is None:
+        return PTKKernel.from_file(canonical_path)
+    buf = io.StringIO()
+    write_synthetic_ptk(buf, spec)
+    return PTKKernel(json.loads(buf.getvalue()))
+
+
+def make_events(kernel: PTKKernel, case: BenchCase, seed: int = 0) -> List[Event]:
+    """Deterministic events for `case`: `sounds` sounds each, spread over the graph."""
+    rng = np.random.default_rng(seed)
+    ids = kernel.graph.node_ids
+    half = max(1, case.sounds // 2)
+    events = []
+    for _ in range(case.events):
+        nodes = rng.integers(0, len(ids), size=half).tolist()
+        freq = rng.uniform(200.0, 800.0, size=half).tolist()
+        pos = [Sound(ids[n], +1, 5.0, f, 0.0, 0.9) for n, f in zip(nodes, freq)]
+        if case.inputs == "cancel":
+            neg = [Sound(ids[n], -1, 5.0, f, math.pi, 0.9) for n, f in zip(nodes, freq)]
+        else:
+            neg = [Sound(ids[n], -1, 5.0, 3.0 * f, 0.0, 0.9) for n, f in zip(nodes, freq)]
+        events.append((pos, neg))
+    return events
+
+
+def _best_time(fn: Callable[[], Any], repeat: int, min_time: float = 0.05) -> float:
+    """Best per-call time over `repeat` samples of enough calls to take `min_time`."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        t = time.perf_counter() - t0
+        if t >= min_time:
+            break
+        loops *= 2
+    best = t / loops
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        best = min(best, (time.perf_counter() - t0) / loops)
+    return best
+
+
+def _max_rss() -> int:
+    if resource is None:
+        return 0
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024  # KiB on Linux
+
+
+def run_case(kernel: PTKKernel, case: BenchCase, repeat: int = 3) -> Dict[str, Any]:
+    cfg = EmissionConfig(max_steps=case.max_steps, engine=case.engine, max_outputs=10 ** 6)
+    events = make_events(kernel, case)
+
+    def run() -> None:
+        for pos, neg in events:
+            kernel.simulate_emission(pos, neg, cfg)
+
+    elapsed = _best_time(run, repeat)
+
+    prof_cfg = EmissionConfig(**{**asdict(cfg), "profile": True})
+    packets = steps = cancellations = 0
+    for pos, neg in events:
+        res = kernel.simulate_emission(pos, neg, prof_cfg)
+        totals = res.profile["totals"] if res.profile else {}
+        packets += totals.get("live_packets", 0)
+        cancellations += totals.get("cancellations", 0)
+        steps += res.steps
+
+    tracemalloc.start()
+    try:
+        kernel.simulate_emission(*events[0], cfg)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "case": asdict(case),
+        "seconds": elapsed,
+        "events_per_s": len(events) / elapsed,
+        "packets": packets,
+        "packets_per_s": packets / elapsed,
+        "steps": steps,
+        "cancellations": cancellations,
+        "peak_mem_bytes": peak,
+        "max_rss_bytes": _max_rss(),
+    }
+
+
+def run_suite(cases: Iterable[BenchCase], repeat: int = 3, canonical_path: str = "ptk.v1.json",
+              progress: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    kernels: Dict[str, PTKKernel] = {}
+    results: Dict[str, Any] = {}
+    for case in cases:
+        if case.graph not in kernels:
+            kernels[case.graph] = load_graph(case.graph, canonical_path)
+        results[case.name] = r = run_case(kernels[case.graph], case, repeat)
+        if progress:
+            progress(case.name, r)
+    return {
+        "format": BENCH_FORMAT,
+        "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "python": platform.python_version(),
+                 "numpy": np.__version__, "machine": platform.machine(), "platform": platform.platform(),
+                 "repeat": repeat},
+        "cases": results,
+    }
+
+
+def save(report: Dict[str, Any], path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("format") != BENCH_FORMAT:
+        raise ValueError(f"{path}: not a {BENCH_FORMAT} report")
+    return report
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10,
+            mem_threshold: float = 0.25) -> List[Dict[str, Any]]:
+    """Per common case: throughput and memory ratios vs. baseline, with `regression` set
+    when events/s fell by more than `threshold` or peak memory grew by more than `mem_threshold`."""
+    rows = []
+    for name in sorted(set(baseline["cases"]) & set(current["cases"])):
+        b, c = baseline["cases"][name], current["cases"][name]
+        speed = c["events_per_s"] / b["events_per_s"]
+        mem = c["peak_mem_bytes"] / max(1, b["peak_mem_bytes"])
+        rows.append({"case": name, "speed": speed, "mem": mem,
+                     "regression": speed < 1.0 - threshold or mem > 1.0 + mem_threshold})
+    return rows
@@ -0,0 +1,146 @@
+# ruff: noqa: E501
+"""
+On-disk, content-addressed cache of emission results.
+
+Entries are keyed by `stable_hash_obj` of the PTK document hash, both sound
+lists and the full `EmissionConfig`, and stored as `EmissionResult.save`
+.npz files under `<root>/<key[:2]>/<key>.npz`. Writes go to a temp file
+that is renamed into place, so readers in other processes never see a
+partial entry. Recency is the file mtime (touched on every hit); when the
+directory grows past `max_bytes` the least recently used entries are
+removed until it is back under `evict_to` of the cap. Each instance
+tracks the size of its own writes between scans, so processes sharing a
+root can together overshoot the cap (by up to one cap per process) before
+one of them re-scans and evicts: across processes the limit is approximate.
+
+Runs that are not reproducible (no `rng_seed`, non-counter ids, profiling)
+bypass the cache.
+"""
+
+from __future__ import annotations
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+import os
+import tempfile
+import zipfile
+
+from .core.rng import stable_hash_obj
+from .ptk_graph import new_file_mode
+from .ptk_kernel import EmissionConfig, PTKKernel, Sound
+from .ptk_result import EmissionResult
+
+CACHE_FORMAT = "ptk-emission-cache-v1"
+
+
+class EmissionCache:
+    def __init__(self, root: str, max_bytes: int = 1 << 30, evict_to: float = 0.9):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.evict_to = evict_to
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "bypassed": 0, "stores": 0, "evictions": 0}
+        os.makedirs(root, exist_ok=True)
+        self._size = self._scan()[1]   # estimate; re-scanned before evicting
+
+    @staticmethod
+    def key(kernel: PTKKernel, positive: List[Sound], negative: List[Sound], cfg: EmissionConfig) -> str:
+        return stable_hash_obj({
+            "format": CACHE_FORMAT, "ptk": kernel.ptk_hash,
+            "positive": [asdict(s) for s in positive], "negative": [asdict(s) for s in negative],
+            "cfg": asdict(cfg),
+        })
+
+    @staticmethod
+    def cacheable(cfg: EmissionConfig) -> bool:
+        return cfg.rng_seed is not None and cfg.id_strategy == "counter" and not cfg.profile
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + ".npz")
+
+    def simulate(self, kernel: PTKKernel, positive: List[Sound], negative: List[Sound],
+                 cfg: Optional[EmissionConfig] = None) -> EmissionResult:
+        """`kernel.simulate_emission` through the cache."""
+        cfg = cfg or EmissionConfig()
+        if not self.cacheable(cfg):
+            self.stats["bypassed"] += 1
+            return kernel.simulate_emission(positive, negative, cfg)
+        key = self.key(kernel, positive, negative, cfg)
+        res = self.get(key, kernel)
+        if res is None:
+            res = kernel.simulate_emission(positive, negative, cfg)
+            self.put(key, res)
+        return res
+
+    def get(self, key: str, kernel: PTKKernel) -> Optional[EmissionResult]:
+        path = self.path(key)
+        try:
+            res = EmissionResult.load(path, kernel.graph)
+        except FileNotFoundError:
+            self.stats["misses"] += 1
+            return None
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # unreadable entry (e.g. from an older writer): drop it
+            self._remove(path)
+            self.stats["misses"] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # evicted by another process since the load; the result is still good
+        self.stats["hits"] += 1
+        return res
+
+    def put(self, key: str, result: EmissionResult) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                result.save(f)
+            os.chmod(tmp, new_file_mode())
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        self.stats["stores"] += 1
+        self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until under `evict_to * max_bytes`."""
+        entries, total = self._scan()
+        target = self.evict_to * self.max_bytes
+        for _, size, path in sorted(entries):
+            if total <= target:
+                break
+            if self._remove(path):
+                self.stats["evictions"] += 1
+            total -= size
+        self._size = total
+
+    def clear(self) -> None:
+        for _, _, path in self._scan()[0]:
+            self._remove(path)
+        self._size = 0
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        entries: List[Tuple[float, int, str]] = []
+        for dirpath, _, files in os.walk(self.root):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:   # evicted by another process
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries, sum(e[1] for e in entries)
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
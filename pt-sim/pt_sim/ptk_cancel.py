@@ -0,0 +1,111 @@
+# ruff: noqa: E501
+"""
+Cancellation pairing for one mixed-polarity edge.
+
+A (+, -) packet pair is eligible when their relative frequency difference
+is within `cancel_bandwidth` and their phases are opposed to within
+`cancel_phase_tol`. Eligibility depends only on frequency and phase, which
+cancellation does not change, so the pairs can be listed up front; the
+engines then apply `cancel_efficiency x min(coherence) x min(energy)` to
+each pair in list order.
+
+Modes (`EmissionConfig.cancel_mode`):
+  "binned"      - every eligible pair. Packets are binned by log-frequency
+                  (bin width = the bandwidth in log space) and by phase
+                  (N packets shifted by pi, bin width >= the tolerance), so
+                  eligible partners sit in the 3 x 3 neighbouring bins and
+                  the work is O(P + N + candidates). Pairs are ordered by P
+                  index, then N index.
+  "two_pointer" - compatibility mode: walk P and N in frequency order,
+                  comparing each packet with one candidate at a time; only
+                  the pairs met along the walk can cancel.
+
+Both take P and N already sorted by frequency (stable).
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+import math
+
+if TYPE_CHECKING:
+    from .ptk_kernel import EmissionConfig
+
+CANCEL_MODES = ("binned", "two_pointer")
+Pairs = Tuple[List[Tuple[int, int]], int]  # (pairs in application order, pairs compared)
+
+_TWO_PI = 2 * math.pi
+_F_MIN = 2e-6  # below this the 1e-6 clamp on the mean frequency widens the band
+
+
+def eligible(fp: float, php: float, fn: float, phn: float, cfg: "EmissionConfig") -> bool:
+    df = abs(fp - fn) / max(1e-6, (fp + fn) / 2.0)
+    dphi = abs(((php - phn + math.pi) % _TWO_PI) - math.pi)
+    return df <= cfg.cancel_bandwidth and dphi >= (math.pi - cfg.cancel_phase_tol)
+
+
+def two_pointer_pairs(fp: Sequence[float], pp: Sequence[float], fn: Sequence[float], pn: Sequence[float],
+                      cfg: "EmissionConfig") -> Pairs:
+    pairs: List[Tuple[int, int]] = []
+    i = j = 0
+    while i < len(fp) and j < len(fn):
+        if eligible(fp[i], pp[i], fn[j], pn[j], cfg):
+            pairs.append((i, j))
+        if fp[i] <= fn[j]:
+            i += 1
+        else:
+            j += 1
+    return pairs, i + j
+
+
+def binned_pairs(fp: Sequence[float], pp: Sequence[float], fn: Sequence[float], pn: Sequence[float],
+                 cfg: "EmissionConfig") -> Pairs:
+    bw = cfg.cancel_bandwidth
+    # |ln(fp / fn)| <= fw  <=>  relative difference <= bw (positive frequencies)
+    fw = math.log((2.0 + bw) / (2.0 - bw)) if 0.0 < bw < 2.0 else (1.0 if bw <= 0.0 else math.inf)
+    n_ph = max(1, int(_TWO_PI // cfg.cancel_phase_tol)) if cfg.cancel_phase_tol > 0 else 1
+    ph_w = _TWO_PI / n_ph
+
+    def fbin(f: float) -> Optional[int]:
+        if f < _F_MIN:
+            return None  # compared with everything
+        return 0 if fw == math.inf else math.floor(math.log(f) / fw)
+
+    def pbin(phase: float) -> int:
+        return min(n_ph - 1, int((phase % _TWO_PI) // ph_w))
+
+    index: Dict[Tuple[int, int], List[int]] = {}
+    loose: List[int] = []
+    for j in range(len(fn)):
+        b = fbin(fn[j])
+        if b is None:
+            loose.append(j)
+        else:
+            index.setdefault((b, pbin(pn[j] + math.pi)), []).append(j)
+    ph_near = sorted({-1, 0, 1} if n_ph >= 3 else set(range(n_ph)))
+
+    pairs: List[Tuple[int, int]] = []
+    compared = 0
+    for i in range(len(fp)):
+        b = fbin(fp[i])
+        if b is None:
+            cand = list(range(len(fn)))
+        else:
+            q = pbin(pp[i])
+            cand = list(loose)
+            for df in (-1, 0, 1):
+                for dq in ph_near:
+                    cand.extend(index.get((b + df, (q + dq) % n_ph), ()))
+            cand.sort()
+        compared += len(cand)
+        pairs.extend((i, j) for j in cand if eligible(fp[i], pp[i], fn[j], pn[j], cfg))
+    return pairs, compared
+
+
+def cancel_pairs(fp: Sequence[float], pp: Sequence[float], fn: Sequence[float], pn: Sequence[float],
+                 cfg: "EmissionConfig") -> Pairs:
+    """Pairs to cancel on one edge for `cfg.cancel_mode`."""
+    if cfg.cancel_mode == "binned":
+        return binned_pairs(fp, pp, fn, pn, cfg)
+    if cfg.cancel_mode == "two_pointer":
+        return two_pointer_pairs(fp, pp, fn, pn, cfg)
+    raise ValueError(f"Unknown cancel_mode '{cfg.cancel_mode}'")
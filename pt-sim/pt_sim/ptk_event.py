@@ -0,0 +1,274 @@
+# ruff: noqa: E501
+"""
+Event-driven emission engine for PTKKernel.
+
+A packet's progress does not depend on its energy, so the step at which it
+reaches the end of its edge is known when it is created. Instead of moving
+every packet every step, packets sit in a priority queue keyed on that
+arrival step (or on the earlier step at which gain decay would drop them
+below 1e-12). Each step only touches packets that arrive, get dropped, or
+share an edge with an opposite-polarity packet (a cancellation
+opportunity). The per-step ledger is kept from energy sums per (gain value,
+arrival step) cohort, so idle steps cost O(distinct gains x steps per
+edge), not O(packets).
+
+Energies are advanced by repeated multiplication when a packet is touched,
+so thresholds and outputs match the fixed-step engine for any
+`step_len > 0`. The fixed-step engine's packet list order is kept per edge,
+with the live edges in order of first appearance: after a step that
+touches anything, the previous order is walked once and every edge's
+survivors and split children are placed where that engine would list
+them. Touched edges are processed in that order, so cancellation pairing,
+the running field-energy threshold and the output order all match; only
+the last bits of the ledger sums differ.
+
+Selected with `EmissionConfig(engine="event")`.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Generator, List, Tuple
+import heapq
+
+import numpy as np
+
+from .ptk_cancel import cancel_pairs
+from .ptk_kernel import EmissionStep, _Outputs, _Profiler, _check_ledger, _step_record
+
+if TYPE_CHECKING:
+    from .ptk_kernel import PTKKernel, Sound, _RunContext
+
+
+@dataclass
+class _Pending:
+    seq: int          # creation order, also the tie-break within a step
+    edge: int
+    polarity: int
+    energy: float     # energy after step `at`
+    at: int           # step at which `energy` was last materialized
+    due: int          # arrival step (prog >= 1.0)
+    frequency: float
+    phase: float
+    coherence: float
+    event: int = 0    # step of the next queued event (arrival or drop)
+
+
+def steps_per_edge(step_len: float) -> int:
+    """Number of `prog += step_len` increments until prog >= 1.0."""
+    if not step_len > 0.0:
+        raise ValueError("event engine needs step_len > 0")
+    prog, n = 0.0, 0
+    while prog < 1.0:
+        prog += step_len
+        n += 1
+    return n
+
+
+def iter_emission_event(kernel: "PTKKernel", positive: List["Sound"], negative: List["Sound"], run: "_RunContext") -> Generator[EmissionStep, None, float]:
+    cfg = run.cfg
+    if cfg.coalesce:
+        raise ValueError("coalescing is not supported by the event engine")
+    if cfg.roulette:
+        raise ValueError("roulette pruning is not supported by the event engine")
+    G = kernel.graph
+    k = steps_per_edge(cfg.step_len)
+    gain: List[float] = G.gains(cfg).tolist()
+    target: List[int] = G.edge_target.tolist()
+    out_ptr: List[int] = G.out_ptr.tolist()
+    out_edges: List[int] = G.out_edges.tolist()
+    # energy bookkeeping per (distinct gain value, arrival step) cohort:
+    # cohorts leave together, so their sums never cancel catastrophically
+    gvals, gclass_arr = np.unique(G.gains(cfg), return_inverse=True)
+    gclass: List[int] = gclass_arr.reshape(-1).tolist()
+    cls_gain: List[float] = gvals.tolist()
+    cohort: Dict[Tuple[int, int], List[float]] = {}
+
+    live: Dict[int, _Pending] = {}
+    on_edge: Dict[int, Dict[int, _Pending]] = {}
+    n_pol: Dict[Tuple[int, int], int] = {}
+    mixed: Dict[int, None] = {}
+    queue: List[Tuple[int, int]] = []
+    seq = 0
+
+    def current(p: _Pending, t: int) -> float:
+        # repeated multiplication, not pow: bit-identical to the fixed-step engine
+        E, g = p.energy, gain[p.edge]
+        for _ in range(t - p.at):
+            E *= g
+        return E
+
+    def schedule(p: _Pending) -> None:
+        # next event is the arrival, or the first step gain decay takes E <= 1e-12
+        E, g = p.energy, gain[p.edge]
+        t = p.at
+        while t < p.due:
+            t += 1
+            E *= g
+            if E <= 1e-12:
+                break
+        p.event = t
+        heapq.heappush(queue, (p.event, p.seq))
+
+    def add(edge: int, polarity: int, E: float, t: int, frequency: float, phase: float, coherence: float) -> None:
+        nonlocal seq
+        p = _Pending(seq, edge, polarity, E, t, t + k, frequency, phase, coherence)
+        seq += 1
+        live[p.seq] = p
+        on_edge.setdefault(edge, {})[p.seq] = p
+        key = (edge, polarity)
+        n_pol[key] = n_pol.get(key, 0) + 1
+        if n_pol.get((edge, -polarity), 0):
+            mixed[edge] = None
+        c = cohort.setdefault((gclass[edge], p.due), [0.0, 0])
+        c[0] += E
+        c[1] += 1
+        schedule(p)
+
+    def remove(p: _Pending, E: float) -> None:
+        del live[p.seq]
+        del on_edge[p.edge][p.seq]
+        key = (p.edge, p.polarity)
+        n_pol[key] -= 1
+        if not n_pol[key]:
+            mixed.pop(p.edge, None)
+        key2 = (gclass[p.edge], p.due)
+        c = cohort[key2]
+        c[0] -= E
+        c[1] -= 1
+        if not c[1]:
+            del cohort[key2]
+
+    for s in positive + negative:
+        node = G.node_index.get(s.node_id)
+        if node is None or s.polarity not in (1, -1):
+            continue
+        outs = G.outs(node, s.polarity).tolist()
+        for e in outs:
+            add(e, s.polarity, s.energy / len(outs), 0, s.frequency, s.phase, s.coherence)
+    # live edges in order of first appearance in the fixed-step engine's list
+    edge_order: List[int] = list(on_edge)
+
+    def regroup(old: Dict[int, List[_Pending]], spawn: Dict[int, float], step: int) -> List[int]:
+        # Place survivors and children in list order: walk the edges as they
+        # stood this step; a touched edge's packets are replaced in turn by
+        # themselves (still live) or their children; other edges move whole.
+        placed: Dict[int, None] = {}
+        first_new = seq
+        for e in edge_order:
+            b = old.get(e)
+            if b is None:
+                if e in placed:  # children landed first: move the survivors behind them
+                    d = on_edge[e]
+                    for sq in [sq for sq in d if sq < first_new]:
+                        d[sq] = d.pop(sq)
+                placed[e] = None
+                continue
+            for p in b:
+                if p.seq in live:
+                    placed[e] = None
+                    d = on_edge[e]
+                    d[p.seq] = d.pop(p.seq)
+                elif p.seq in spawn:
+                    r = 2 * target[e] + (p.polarity < 0)
+                    for oe in out_edges[out_ptr[r]:out_ptr[r + 1]]:
+                        placed[oe] = None
+                        add(oe, p.polarity, spawn[p.seq], step, p.frequency, p.phase, p.coherence)
+        return list(placed)
+
+    prof = _Profiler() if cfg.profile else None
+    out = _Outputs(kernel, cfg, run.event, prof)
+    step = 0
+    while step < cfg.max_steps and live and len(out) < cfg.max_outputs:
+        step += 1
+        n_live = len(live)
+        energy_before = sum(c[0] for c in cohort.values())
+        for (cls, _), c in cohort.items():
+            c[0] *= cls_gain[cls]
+
+        # packets with something to do this step, grouped by edge
+        touched: Dict[int, Dict[int, _Pending]] = {}
+        while queue and queue[0][0] == step:
+            _, sq = heapq.heappop(queue)
+            p = live.get(sq)
+            if p is not None and p.event == step:
+                touched.setdefault(p.edge, {})[sq] = p
+        for e in mixed:
+            touched.setdefault(e, {})
+        order = [e for e in edge_order if e in touched]
+        old: Dict[int, List[_Pending]] = {}
+        spawn: Dict[int, float] = {}
+
+        cancelled_energy = 0.0
+        field_energy = 0.0
+        localized_energy = 0.0
+        comparisons = cancellations = splits = 0
+        for edge in order:
+            if prof:
+                prof.enter("cancel")
+            plist = old[edge] = list(on_edge[edge].values())
+            arriving = [p for p in plist if p.seq in touched[edge]]
+            if edge in mixed:
+                cur = {p.seq: current(p, step) for p in plist}
+                P = sorted((p for p in plist if p.polarity == +1), key=lambda x: x.frequency)
+                N = sorted((p for p in plist if p.polarity == -1), key=lambda x: x.frequency)
+                pairs, compared = cancel_pairs([p.frequency for p in P], [p.phase for p in P],
+                                               [n.frequency for n in N], [n.phase for n in N], cfg)
+                for i, j in pairs:
+                    p, n = P[i], N[j]
+                    dE = cfg.cancel_efficiency * min(p.coherence, n.coherence) * min(cur[p.seq], cur[n.seq])
+                    cur[p.seq] -= dE
+                    cur[n.seq] -= dE
+                    cohort[(gclass[edge], p.due)][0] -= dE
+                    cohort[(gclass[edge], n.due)][0] -= dE
+                    cancelled_energy += dE * 2.0
+                    field_energy += dE * 0.5
+                cancellations += len(pairs)
+                comparisons += compared
+
+                if field_energy >= cfg.field_E_thresh:
+                    coh_mean = sum(p.coherence for p in plist) / float(len(plist))
+                    out.field([edge], field_energy, coh_mean)
+
+                # re-materialize and reschedule every packet on the edge
+                arriving = []
+                for p in plist:
+                    p.energy, p.at = cur[p.seq], step
+                    if p.energy <= 1e-12 or p.due == step:
+                        arriving.append(p)
+                    else:
+                        schedule(p)
+
+            if prof:
+                prof.enter("propagate")
+            target_node = target[edge]
+            for p in arriving:
+                E = current(p, step)
+                remove(p, E)
+                if E <= 1e-12:
+                    continue
+                r = 2 * target_node + (p.polarity < 0)
+                lo, hi = out_ptr[r], out_ptr[r + 1]
+                if lo == hi:
+                    localized_energy += E
+                    if E >= cfg.particle_E_thresh and p.coherence >= cfg.coherence_thresh:
+                        out.particle(target_node, E, p.coherence)
+                else:
+                    spawn[p.seq] = (E * cfg.split_decay) / float(hi - lo)
+                    splits += 1
+        if order:
+            edge_order = regroup(old, spawn, step)
+
+        if prof:
+            prof.enter("ledger")
+        energy_after = sum(c[0] for c in cohort.values())
+        step_rec = _step_record(step, energy_before, energy_after - energy_before, localized_energy,
+                                field_energy, cancelled_energy, cfg)
+        if cfg.ledger_check_every and step % cfg.ledger_check_every == 0:
+            _check_ledger(step_rec, energy_after, sum(current(p, step) for p in live.values()), cfg)
+        prof_rec = prof.record(live_packets=n_live, edges_touched=len(order), cancel_comparisons=comparisons,
+                               cancellations=cancellations, splits=splits) if prof else None
+        yield out.snapshot(step, step_rec, len(live), energy_after, prof_rec)
+        if prof:
+            prof.restart()
+
+    return sum(current(p, step) for p in live.values())
@@ -0,0 +1,212 @@
+"""
+Compiled PTK graph: integer node/edge ids and CSR adjacency.
+
+Built once per PTK document. The emission engines read topology, gains and
+targets from these arrays so the step loop never hashes edge/node strings.
+
+`load_or_compile` keeps a binary copy (.npz) of the compiled graph next to
+the JSON, tagged with the SHA-256 of the JSON bytes; it is rebuilt
+whenever the JSON changes, so later runs skip `json.load` and compilation.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, List, Optional, Tuple, Union
+import hashlib
+import json
+import os
+import tempfile
+import zipfile
+
+import numpy as np
+
+from .core.rng import stable_hash_obj
+
+if TYPE_CHECKING:
+    from .ptk_kernel import EmissionConfig
+
+# edge type codes
+WITHIN_LINE, CROSS_SUTRA, SPECIAL, OTHER = 0, 1, 2, 3
+EDGE_TYPES = {"within_line": WITHIN_LINE, "cross_sutra": CROSS_SUTRA, "special": SPECIAL}
+
+COMPILED_FORMAT = "ptk-compiled-v1"
+_STR_FIELDS = ("node_ids", "node_labels", "edge_ids")
+_ARRAY_FIELDS = ("node_line", "node_pos", "edge_source", "edge_target", "edge_polarity",
+                 "edge_type", "edge_weight", "out_ptr", "out_edges")
+
+
+def row_of(node: Any, polarity: Any) -> Any:
+    """CSR row of (node, polarity): 2*node for +1, 2*node+1 for -1. Works on scalars and arrays."""
+    return 2 * node + (np.asarray(polarity) < 0).astype(np.int64)
+
+
+@dataclass
+class CompiledGraph:
+    node_ids: List[str]        # node index -> id
+    node_line: np.ndarray      # float64
+    node_pos: np.ndarray       # float64
+    edge_ids: List[str]        # edge index -> id
+    edge_source: np.ndarray    # int64 node index
+    edge_target: np.ndarray    # int64 node index
+    edge_polarity: np.ndarray  # int8
+    edge_type: np.ndarray      # int8 type code
+    edge_weight: np.ndarray    # float64 flow weight
+    out_ptr: np.ndarray        # int64, len 2*n_nodes + 1
+    out_edges: np.ndarray      # int64 edge indices, grouped by row in document order
+    node_labels: List[str] = field(default_factory=list)  # node index -> label
+    node_index: Dict[str, int] = field(default_factory=dict)
+    _gain_cache: Dict[Tuple[float, float, float], np.ndarray] = field(
+        default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.node_index:
+            self.node_index = {nid: i for i, nid in enumerate(self.node_ids)}
+        # shared by concurrent runs: never written after construction
+        for v in vars(self).values():
+            if isinstance(v, np.ndarray):
+                v.setflags(write=False)
+
+    @classmethod
+    def from_ptk(cls, ptk: Dict[str, Any]) -> "CompiledGraph":
+        nodes = ptk["nodes"]
+        edges = ptk["edges"]
+        node_ids = [str(n["id"]) for n in nodes]
+        idx = {nid: i for i, nid in enumerate(node_ids)}
+        src = np.array([idx[str(e["source"])] for e in edges], dtype=np.int64)
+        pol = np.array([int(e["polarity"]) for e in edges], dtype=np.int8)
+        rows = row_of(src, pol) if len(edges) else np.zeros(0, dtype=np.int64)
+        out_ptr = np.zeros(2 * len(node_ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=2 * len(node_ids)), out=out_ptr[1:])
+        return cls(
+            node_ids=node_ids,
+            node_line=np.array([float(n["line"]) for n in nodes], dtype=float),
+            node_pos=np.array([float(n["pos"]) for n in nodes], dtype=float),
+            edge_ids=[str(e["id"]) for e in edges],
+            edge_source=src,
+            edge_target=np.array([idx[str(e["target"])] for e in edges], dtype=np.int64),
+            edge_polarity=pol,
+            edge_type=np.array([EDGE_TYPES.get(e["type"], OTHER) for e in edges], dtype=np.int8),
+            edge_weight=np.array([float(e["flow"].get("weight", 1.0)) for e in edges], dtype=float),
+            out_ptr=out_ptr,
+            out_edges=np.argsort(rows, kind="stable").astype(np.int64),
+            node_labels=[str(n.get("label", "")) for n in nodes],
+            node_index=idx,
+        )
+
+    def save(self, file: Union[str, BinaryIO], meta: Optional[Dict[str, Any]] = None) -> None:
+        """Write the arrays (and `meta`, as JSON) to an .npz."""
+        header = dict(meta or {}, format=COMPILED_FORMAT)
+        arrays: Dict[str, Any] = {"meta": np.array(json.dumps(header))}
+        for name in _STR_FIELDS:
+            arrays[name] = np.array(getattr(self, name), dtype=str)
+        for name in _ARRAY_FIELDS:
+            arrays[name] = getattr(self, name)
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, file: Union[str, BinaryIO]) -> Tuple["CompiledGraph", Dict[str, Any]]:
+        """Inverse of `save`; returns the graph and its meta dict."""
+        with np.load(file, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("format") != COMPILED_FORMAT:
+                raise ValueError(f"not a {COMPILED_FORMAT} file")
+            kw: Dict[str, Any] = {name: z[name].tolist() for name in _STR_FIELDS}
+            kw.update({name: z[name] for name in _ARRAY_FIELDS})
+        return cls(**kw), meta
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_ids)
+
+    def out_degree(self, rows: Any) -> Any:
+        return self.out_ptr[rows + 1] - self.out_ptr[rows]
+
+    def outs(self, node: int, polarity: int) -> np.ndarray:
+        r = int(row_of(node, polarity))
+        return self.out_edges[self.out_ptr[r]:self.out_ptr[r + 1]]
+
+    def gains(self, cfg: "EmissionConfig") -> np.ndarray:
+        """Per-edge, per-step gain (type gain x flow weight) for `cfg`.
+
+        Cached per gain triple; concurrent first calls may both compute it,
+        which is harmless (same read-only result).
+        """
+        key = (cfg.within_gain, cfg.cross_gain, cfg.special_gain)
+        g = self._gain_cache.get(key)
+        if g is None:
+            by_type = np.array([cfg.within_gain, cfg.cross_gain, cfg.special_gain, 1.0],
+                               dtype=float)
+            g = by_type[self.edge_type] * self.edge_weight
+            g.setflags(write=False)
+            self._gain_cache[key] = g
+        return g
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it; done once, at import
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
+
+
+def new_file_mode() -> int:
+    """Mode `open()` gives a new file under the process umask (mkstemp uses 0600)."""
+    return 0o666 & ~_UMASK
+
+
+def compiled_path_for(path: str) -> str:
+    """Default location of the compiled copy of `path`: <dir>/.ptk_cache/<name>.npz."""
+    d, name = os.path.split(os.path.abspath(path))
+    return os.path.join(d, ".ptk_cache", name + ".npz")
+
+
+def _write_compiled(compiled_path: str, graph: CompiledGraph, meta: Dict[str, Any]) -> None:
+    d = os.path.dirname(compiled_path)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=d, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            graph.save(f, meta)
+        os.chmod(tmp, new_file_mode())
+        os.replace(tmp, compiled_path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def load_or_compile(
+    path: str, compiled_path: Optional[str] = None
+) -> Tuple[CompiledGraph, Dict[str, Any]]:
+    """Compiled graph for the PTK JSON at `path`, via its binary copy.
+
+    The copy is used when its recorded source hash matches the JSON bytes;
+    otherwise the JSON is parsed, compiled and the copy (re)written
+    atomically. If the copy cannot be written (e.g. a read-only directory)
+    the graph compiled in memory is returned. Meta holds "source_hash" and
+    "ptk_hash" (the document's `stable_hash_obj`).
+    """
+    compiled_path = compiled_path or compiled_path_for(path)
+    with open(path, "rb") as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+    try:
+        graph, meta = CompiledGraph.load(compiled_path)
+        if meta.get("source_hash") == source_hash:
+            return graph, meta
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        pass
+    doc = json.loads(raw)
+    graph = CompiledGraph.from_ptk(doc)
+    meta = {"source_hash": source_hash, "ptk_hash": stable_hash_obj(doc), "format": COMPILED_FORMAT}
+    try:
+        _write_compiled(compiled_path, graph, meta)
+    except OSError:
+        pass  # not writable: use this compile, try again next time
+    return graph, meta
@@ -4,15 +4,29 @@
 PTK Kernel — mypy clean
 - Uses a typed Packet dataclass (no ambiguous List[List[...]] indexing)
 - Fixes types for by_edge buckets and next_edges keys
-- Keeps energy ledger & conservation checks (from earlier patch)
+- Keeps energy ledger & conservation checks (from earlier patch), updated
+  incrementally from per-stage energy deltas
+- Topology/gains come from a CompiledGraph (integer ids, CSR adjacency)
 """
 
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Tuple, Optional, Any
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Dict, Optional, Any, Callable, Generator, NamedTuple, Sequence, Tuple, cast
+import json
 import uuid
 import math
-import random
+import time
+
+import numpy as np
+
+from .core.rng import derive_seed, stable_hash_obj
+from .ptk_cancel import CANCEL_MODES, cancel_pairs
+from .ptk_graph import CompiledGraph, load_or_compile
+from .ptk_result import EmissionResult, OutputColumns
+
+if TYPE_CHECKING:
+    from .ptk_linear import LinearResponse
 
 # -------------------- Data Models --------------------
 
@@ -45,11 +59,69 @@ class EmissionConfig:
     cross_gain: float = 0.9
     special_gain: float = 1.2
     conservation_tol: float = 1e-6  # relative allowed drift per step
+    engine: str = "packet"          # "packet" (reference), "vector" (NumPy columns) or "event" (priority queue)
+    coalesce: bool = False          # merge near-identical packets after each step
+    coalesce_freq_tol: float = 1e-3   # relative frequency bin width
+    coalesce_phase_tol: float = 1e-2  # phase bin width, radians
+    ledger_check_every: int = 0     # debug: every N steps re-check the running ledger against full sums (0 = off)
+    profile: bool = False           # per-step phase timings and hot-path counters in result["profile"]
+    id_strategy: str = "counter"    # output ids: key of ID_STRATEGIES ("counter" or "uuid4")
+    roulette: bool = False          # Russian roulette for packets below roulette_frac x the seeded energy
+    roulette_frac: float = 1e-4
+    roulette_survival: float = 0.1  # survival probability p; survivors carry energy / p
+    cancel_mode: str = "binned"     # "binned" (every eligible pair) or "two_pointer" (compatibility); see ptk_cancel
+
+
+class OutputId(NamedTuple):
+    """Compact, reproducible output id; rendered as a string only on serialization."""
+    run: int      # derived from cfg.rng_seed
+    event: int    # event index within a batch (0 for single runs)
+    seq: int      # output object number within the event
+
+    def __str__(self) -> str:
+        return f"{self.run:08x}-{self.event}-{self.seq}"
+
+
+def run_id(seed: Optional[int]) -> int:
+    """32-bit run id derived from the seed (random when there is no seed)."""
+    if seed is None:
+        return uuid.uuid4().int & 0xFFFFFFFF
+    return int(stable_hash_obj(["ptk-run", seed])[:8], 16)
+
+
+class CounterIds:
+    """Default id strategy: (run, event, seq) counters."""
+
+    def __init__(self, cfg: "EmissionConfig", event: int):
+        self.run = run_id(cfg.rng_seed)
+        self.event = event
+        self.seq = 0
+
+    def __call__(self) -> OutputId:
+        self.seq += 1
+        return OutputId(self.run, self.event, self.seq - 1)
+
+
+class Uuid4Ids:
+    """Legacy id strategy: a random UUID per object."""
+
+    def __init__(self, cfg: "EmissionConfig", event: int):
+        pass
+
+    def __call__(self) -> uuid.UUID:
+        return uuid.uuid4()
+
+
+# id strategies: name -> factory(cfg, event) returning a zero-arg id source
+ID_STRATEGIES: Dict[str, Callable[["EmissionConfig", int], Callable[[], Any]]] = {
+    "counter": CounterIds,
+    "uuid4": Uuid4Ids,
+}
 
 
 @dataclass
 class Particle:
-    id: str
+    id: Any                      # id object from the id strategy; str() when serialized
     locus: str
     energy: float
     mass2: float
@@ -58,7 +130,7 @@ class Particle:
 
 @dataclass
 class Field:
-    id: str
+    id: Any
     support_edges: List[str]
     energy: float
     strength: float
@@ -67,9 +139,9 @@ class Field:
 
 @dataclass
 class DetectionEvent:
-    id: str
+    id: Any
     kind: str
-    ref_id: str
+    ref_id: Any
     confidence: float
 
 # Typed packet instead of List[List[float]]
@@ -77,7 +149,7 @@ class DetectionEvent:
 
 @dataclass
 class Packet:
-    edge_id: str
+    edge: int                    # edge index in the compiled graph
     prog: float
     energy: float
     frequency: float
@@ -85,209 +157,485 @@ class Packet:
     coherence: float
     polarity: int
 
+
+@dataclass
+class EmissionStep:
+    """Compact snapshot yielded by `PTKKernel.iter_emission` after every step.
+
+    Outputs are kept as columns; `particles` / `fields` / `detections`
+    build the dataclass objects on access.
+    """
+    step: int
+    record: Dict[str, Any]                # this step's ledger record
+    outputs: OutputColumns                # emitted during this step
+    live_packets: int                     # packets still propagating
+    live_energy: float                    # their total energy
+    profile: Optional[Dict[str, Any]] = None  # phase timings / counters when cfg.profile
+    graph: Optional[CompiledGraph] = field(default=None, repr=False)
+
+    @property
+    def particles(self) -> List[Particle]:
+        G, o = cast(CompiledGraph, self.graph), self.outputs
+        return [Particle(id=i, locus=G.node_ids[n], energy=E, mass2=E * (0.8 + 0.4 * coh),
+                         Q={"line": float(G.node_line[n]), "pos": float(G.node_pos[n])})
+                for i, n, E, coh in zip(o.p_id, o.p_node, o.p_energy, o.p_coh)]
+
+    @property
+    def fields(self) -> List[Field]:
+        G, o = cast(CompiledGraph, self.graph), self.outputs
+        return [Field(id=i, support_edges=[G.edge_ids[e] for e in es], energy=E,
+                      strength=E * (0.5 + 0.5 * coh), mode=("vector" if coh > 0.7 else "scalar"))
+                for i, es, E, coh in zip(o.f_id, o.f_edges, o.f_energy, o.f_coh)]
+
+    @property
+    def detections(self) -> List[DetectionEvent]:
+        o = self.outputs
+        out: List[DetectionEvent] = []
+        for i, k, r in zip(o.d_id, o.d_kind, o.d_ref):
+            if k == 0:
+                out.append(DetectionEvent(id=i, kind="particle", ref_id=o.p_id[r], confidence=min(1.0, 0.6 + 0.4 * o.p_coh[r])))
+            else:
+                out.append(DetectionEvent(id=i, kind="field", ref_id=o.f_id[r], confidence=min(1.0, 0.5 + 0.5 * o.f_coh[r])))
+        return out
+
+
+PROFILE_PHASES = ("bucket", "cancel", "propagate", "emit", "coalesce", "prune", "ledger")
+PROFILE_COUNTERS = ("live_packets", "edges_touched", "cancel_comparisons", "cancellations", "splits")
+
+
+class _Profiler:
+    """Wall time per phase for one step (`cfg.profile`).
+
+    `enter(phase)` charges the time since the previous mark to the phase
+    that was running and makes `phase` current.
+    """
+
+    def __init__(self) -> None:
+        self.phase = "bucket"
+        self.time = dict.fromkeys(PROFILE_PHASES, 0.0)
+        self._t = time.perf_counter()
+
+    def enter(self, phase: str) -> None:
+        t = time.perf_counter()
+        self.time[self.phase] += t - self._t
+        self.phase, self._t = phase, t
+
+    def restart(self) -> None:
+        """Start timing again in "bucket" (time spent outside the engine, e.g. in the consumer, is not charged)."""
+        self.phase, self._t = "bucket", time.perf_counter()
+
+    def record(self, **counters: int) -> Dict[str, Any]:
+        """Close the step: timings plus `counters`, then reset for the next step."""
+        self.enter("bucket")
+        rec: Dict[str, Any] = {"time_s": self.time}
+        rec.update(counters)
+        self.time = dict.fromkeys(PROFILE_PHASES, 0.0)
+        return rec
+
+
+class _Outputs:
+    """Outputs emitted during the current step of one emission run."""
+
+    def __init__(self, kernel: "PTKKernel", cfg: EmissionConfig, event: int = 0, prof: Optional[_Profiler] = None):
+        self.kernel = kernel
+        self.prof = prof
+        strategy = ID_STRATEGIES.get(cfg.id_strategy)
+        if strategy is None:
+            raise ValueError(f"Unknown id strategy '{cfg.id_strategy}'")
+        self.new_id = strategy(cfg, event)
+        self.count = 0
+        self.cols = OutputColumns()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def particle(self, node: int, E: float, coh: float) -> None:
+        if self.prof:
+            prev = self.prof.phase
+            self.prof.enter("emit")
+        pid = self.new_id()
+        self.cols.add_particle(pid, self.new_id(), node, E, coh)
+        self.count += 1
+        if self.prof:
+            self.prof.enter(prev)
+
+    def field(self, edges: List[int], E: float, coh: float) -> None:
+        if self.prof:
+            prev = self.prof.phase
+            self.prof.enter("emit")
+        fid = self.new_id()
+        self.cols.add_field(fid, self.new_id(), edges, E, coh)
+        self.count += 1
+        if self.prof:
+            self.prof.enter(prev)
+
+    def snapshot(self, step: int, record: Dict[str, Any], live_packets: int, live_energy: float,
+                 profile: Optional[Dict[str, Any]] = None) -> EmissionStep:
+        snap = EmissionStep(step, record, self.cols, live_packets, live_energy, profile, self.kernel.graph)
+        self.cols = OutputColumns()
+        return snap
+
+
+class _Collector:
+    """Accumulates `EmissionStep`s into an `EmissionResult`."""
+
+    def __init__(self, graph: CompiledGraph, positive: List[Sound], negative: List[Sound]):
+        self.graph = graph
+        self.ledger: Dict[str, Any] = {
+            "input_energy": sum(s.energy for s in positive + negative), "steps": [], "final": {}}
+        self.cols = OutputColumns()
+        self.profile: List[Dict[str, Any]] = []
+        self.steps = 0
+
+    def add(self, snap: EmissionStep) -> None:
+        self.steps = snap.step
+        self.ledger["steps"].append(snap.record)
+        if snap.profile is not None:
+            self.profile.append(snap.profile)
+        self.cols.extend(snap.outputs)
+
+    def result(self, remaining_energy: float) -> EmissionResult:
+        self.ledger["final"] = {
+            "particles_energy": sum(self.cols.p_energy),
+            "fields_energy": sum(self.cols.f_energy),
+            "remaining_packets_energy": remaining_energy
+        }
+        profile = None
+        if self.profile:
+            totals: Dict[str, Any] = {"time_s": {ph: sum(r["time_s"][ph] for r in self.profile) for ph in PROFILE_PHASES}}
+            totals.update({c: sum(r[c] for r in self.profile) for c in PROFILE_COUNTERS})
+            profile = {"steps": self.profile, "totals": totals}
+        return EmissionResult.from_outputs(self.graph, self.cols, self.steps, self.ledger, profile)
+
+
+# the running ledger is re-summed once its accumulated rounding bound could
+# exceed this fraction of the live energy (e.g. after a large loss)
+LEDGER_RESYNC_REL = 1e-9
+_EPS = 4.0 * 2.220446049250313e-16
+
+
+def _step_record(step: int, energy_before: float, net: float, localized: float, field: float, cancelled: float,
+                 cfg: EmissionConfig, pruned: float = 0.0) -> Dict[str, Any]:
+    """Ledger record for one step; `net` is the change of live-packet energy,
+    of which `pruned` came from Russian roulette (booked in its own fields)."""
+    removed = max(0.0, pruned - net)
+    accounted = localized + field + (cancelled * 0.5)
+    drift = max(0.0, removed - accounted)
+    rec: Dict[str, Any] = {
+        "step": step,
+        "drift_rel": drift / max(1e-12, energy_before)
+    }
+    if rec["drift_rel"] > cfg.conservation_tol:
+        rec["conservation_warning"] = True
+    return rec
+
+
+def _check_ledger(rec: Dict[str, Any], running: float, full: float, cfg: EmissionConfig) -> None:
+    """Debug check (`cfg.ledger_check_every`): compare the running live energy with a full sum."""
+    err = abs(running - full) / max(1e-12, abs(full))
+    rec["ledger_check_rel"] = err
+    if err > cfg.conservation_tol:
+        rec["ledger_mismatch"] = True
+
+
+def _drain(run: Generator[EmissionStep, None, float], col: _Collector) -> EmissionResult:
+    while True:
+        try:
+            col.add(next(run))
+        except StopIteration as stop:
+            return col.result(stop.value)
+
 # -------------------- Kernel --------------------
 
 
+@dataclass
+class _RunContext:
+    """Per-call state of one emission run; nothing is stored on the kernel."""
+    cfg: EmissionConfig
+    rng: np.random.Generator      # per-event generator (see for_event)
+    event: int = 0                # event index within a batch (output ids)
+
+    @classmethod
+    def start(cls, cfg: Optional[EmissionConfig]) -> "_RunContext":
+        cfg = cfg or EmissionConfig()
+        if not 0.0 < cfg.roulette_survival <= 1.0:
+            raise ValueError(f"roulette_survival must be in (0, 1], got {cfg.roulette_survival}")
+        return cls(cfg, np.random.default_rng(cfg.rng_seed))
+
+    def for_event(self, event: int) -> "_RunContext":
+        """Context for event `event` of a batch. Its generator is seeded with
+        `derive_seed(cfg.rng_seed, event)`, as `ptk_parallel` seeds that event,
+        so batch results do not depend on which other events share the batch.
+        """
+        seed = self.cfg.rng_seed
+        return _RunContext(self.cfg, np.random.default_rng(None if seed is None else derive_seed(seed, event)), event)
+
+
 class PTKKernel:
+    """Emission kernel over one PTK document.
+
+    The compiled graph is read-only and every call keeps its state in a
+    `_RunContext`, so one kernel can serve concurrent calls from threads.
+    """
+
     def __init__(self, ptk: Dict[str, Any]):
-        self.ptk = ptk
-        self.nodes: Dict[str, Dict[str, Any]] = {
-            n["id"]: n for n in ptk["nodes"]}
-        self.edges: List[Dict[str, Any]] = list(ptk["edges"])
-        self.edge_index: Dict[str, Dict[str, Any]] = {
-            e["id"]: e for e in self.edges}
-        # adjacency by (node, polarity)
-        self.next_edges: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
-        for e in self.edges:
-            key: Tuple[str, int] = (str(e["source"]), int(e["polarity"]))
-            self.next_edges.setdefault(key, []).append(e)
-
-    def _edge_gain(self, e: Dict[str, Any]) -> float:
-        t = e["type"]
-        w = float(e["flow"].get("weight", 1.0))
-        if t == "within_line":
-            return self.cfg.within_gain * w
-        if t == "cross_sutra":
-            return self.cfg.cross_gain * w
-        if t == "special":
-            return self.cfg.special_gain * w
-        return 1.0 * w
-
-    def _charges_from_node(self, node_id: str) -> Dict[str, float]:
-        n = self.nodes[node_id]
-        return {"line": float(n["line"]), "pos": float(n["pos"])}
-
-    def _init_rng(self, cfg: EmissionConfig) -> None:
-        if cfg.rng_seed is not None:
-            random.seed(cfg.rng_seed)
-
-    def simulate_emission(self, positive: List[Sound], negative: List[Sound], cfg: Optional[EmissionConfig] = None) -> Dict[str, Any]:
-        self.cfg = cfg or EmissionConfig()
-        self._init_rng(self.cfg)
-
-        ledger: Dict[str, Any] = {
-            "input_energy": 0.0, "steps": [], "final": {}}
-        ledger["input_energy"] = sum(s.energy for s in positive + negative)
+        self._ptk: Optional[Dict[str, Any]] = ptk
+        self.source: Optional[str] = None
+        self.graph = CompiledGraph.from_ptk(ptk)
+
+    @classmethod
+    def from_file(cls, path: str, compiled_path: Optional[str] = None) -> "PTKKernel":
+        """Kernel for the PTK JSON at `path`, loaded from its compiled binary
+        copy (built on first use, rebuilt when the JSON changes). The JSON
+        itself is only parsed if `.ptk` is read.
+        """
+        graph, meta = load_or_compile(path, compiled_path)
+        K = cls.__new__(cls)
+        K._ptk = None
+        K.source = path
+        K.graph = graph
+        K.__dict__["ptk_hash"] = meta["ptk_hash"]
+        return K
+
+    @property
+    def ptk(self) -> Dict[str, Any]:
+        if self._ptk is None:
+            with open(cast(str, self.source), "r", encoding="utf-8") as f:
+                self._ptk = json.load(f)
+        return self._ptk
+
+    @cached_property
+    def ptk_hash(self) -> str:
+        """Content hash of the PTK document (`stable_hash_obj`), computed once."""
+        return stable_hash_obj(self.ptk)
+
+    def simulate_emission(self, positive: List[Sound], negative: List[Sound], cfg: Optional[EmissionConfig] = None) -> EmissionResult:
+        return _drain(self.iter_emission(positive, negative, cfg), _Collector(self.graph, positive, negative))
+
+    def iter_emission(self, positive: List[Sound], negative: List[Sound], cfg: Optional[EmissionConfig] = None) -> Generator[EmissionStep, None, float]:
+        """Step-by-step emission: yields an `EmissionStep` after every step.
+
+        Nothing is retained between steps, so callers can stream snapshots
+        to disk or stop early (e.g. once `live_energy` drops below a
+        threshold) simply by leaving the loop. The generator's return value
+        is the energy left in live packets.
+        """
+        return self._run_engine(positive, negative, _RunContext.start(cfg))
+
+    def _run_engine(self, positive: List[Sound], negative: List[Sound], run: _RunContext) -> Generator[EmissionStep, None, float]:
+        """Dispatch on `run.cfg.engine`."""
+        engine = run.cfg.engine
+        if run.cfg.cancel_mode not in CANCEL_MODES:
+            raise ValueError(f"Unknown cancel_mode '{run.cfg.cancel_mode}'")
+        if engine == "vector":
+            from .ptk_vector import iter_emission_vector
+            return iter_emission_vector(self, positive, negative, run)
+        if engine == "event":
+            from .ptk_event import iter_emission_event
+            return iter_emission_event(self, positive, negative, run)
+        if engine != "packet":
+            raise ValueError(f"Unknown emission engine '{engine}'")
+        return self._iter_packets(positive, negative, run)
+
+    def localized_response(self, positive: List[Sound], negative: List[Sound], cfg: Optional[EmissionConfig] = None) -> "LinearResponse":
+        """Energy localized per terminal node over the run, ignoring output limits.
+
+        Cancellation-free runs take the linear-response path (sparse
+        propagation per edge, no packets); others step `cfg.engine`.
+        See `ptk_linear`.
+        """
+        from .ptk_linear import localized_response
+        return localized_response(self, positive, negative, _RunContext.start(cfg))
+
+    def simulate_emission_batch(self, events: Sequence[Tuple[List[Sound], List[Sound]]], cfg: Optional[EmissionConfig] = None) -> List[EmissionResult]:
+        """Run many independent (positive, negative) events; one result per event.
+
+        With the vector engine all events advance together in a single
+        stepping loop. The packet engine runs them one by one (reference).
+        """
+        run = _RunContext.start(cfg)
+        if run.cfg.engine == "vector":
+            from .ptk_vector import simulate_emission_vector_batch
+            return simulate_emission_vector_batch(self, events, run)
+        return [_drain(self._run_engine(pos, neg, run.for_event(i)), _Collector(self.graph, pos, neg))
+                for i, (pos, neg) in enumerate(events)]
+
+    def _iter_packets(self, positive: List[Sound], negative: List[Sound], run: _RunContext) -> Generator[EmissionStep, None, float]:
+        G = self.graph
+        cfg = run.cfg
+        # plain lists: index lookups only inside the step loop
+        gain: List[float] = G.gains(cfg).tolist()
+        target: List[int] = G.edge_target.tolist()
+        out_ptr: List[int] = G.out_ptr.tolist()
+        out_edges: List[int] = G.out_edges.tolist()
 
         # Packets as typed objects
         packets: List[Packet] = []
 
         def seed(sounds: List[Sound]) -> None:
             for s in sounds:
-                outs = self.next_edges.get((s.node_id, s.polarity), [])
+                node = G.node_index.get(s.node_id)
+                if node is None or s.polarity not in (1, -1):
+                    continue
+                outs = G.outs(node, s.polarity).tolist()
                 if not outs:
                     continue
                 share = s.energy / len(outs)
                 for e in outs:
                     packets.append(Packet(
-                        edge_id=str(e["id"]), prog=0.0, energy=share,
+                        edge=e, prog=0.0, energy=share,
                         frequency=s.frequency, phase=s.phase,
                         coherence=s.coherence, polarity=s.polarity
                     ))
 
         seed(positive)
         seed(negative)
+        # running live-packet energy, updated from the per-stage deltas below
+        live_energy = sum(p.energy for p in packets)
+        ledger_err = 0.0
+        roulette_below = cfg.roulette_frac * live_energy
 
-        particles: List[Particle] = []
-        fields: List[Field] = []
-        dets: List[DetectionEvent] = []
-
-        def emit_particle(node_id: str, E: float, coh: float) -> None:
-            p = Particle(
-                id=str(uuid.uuid4()), locus=node_id, energy=E,
-                mass2=E * (0.8 + 0.4 * coh), Q=self._charges_from_node(node_id)
-            )
-            particles.append(p)
-            dets.append(DetectionEvent(
-                id=str(uuid.uuid4()), kind="particle", ref_id=p.id,
-                confidence=min(1.0, 0.6 + 0.4 * coh)
-            ))
-
-        def emit_field(edge_ids: List[str], E: float, coh: float) -> None:
-            f = Field(
-                id=str(uuid.uuid4()), support_edges=edge_ids[:32], energy=E,
-                strength=E * (0.5 + 0.5 * coh), mode=("vector" if coh > 0.7 else "scalar")
-            )
-            fields.append(f)
-            dets.append(DetectionEvent(
-                id=str(uuid.uuid4()), kind="field", ref_id=f.id,
-                confidence=min(1.0, 0.5 + 0.5 * coh)
-            ))
+        prof = _Profiler() if cfg.profile else None
+        out = _Outputs(self, cfg, run.event, prof)
+        buckets: List[Optional[List[Packet]]] = [None] * G.n_edges
 
         step = 0
-        while step < self.cfg.max_steps and packets and (len(particles) + len(fields) < self.cfg.max_outputs):
+        while step < cfg.max_steps and packets and len(out) < cfg.max_outputs:
             step += 1
+            n_live = len(packets)
 
-            # Bucket packets by edge (typed)
-            by_edge: Dict[str, List[Packet]] = {}
-            energy_before = sum(p.energy for p in packets)
+            # Bucket packets by edge, edges in order of first appearance
+            order: List[int] = []
+            energy_before = live_energy
+            gained = 0.0
 
             for pk in packets:
-                e = self.edge_index[pk.edge_id]
-                pk.prog += self.cfg.step_len
-                pk.energy *= self._edge_gain(e)
-                by_edge.setdefault(pk.edge_id, []).append(pk)
+                pk.prog += cfg.step_len
+                e0 = pk.energy
+                pk.energy *= gain[pk.edge]
+                gained += pk.energy - e0
+                b = buckets[pk.edge]
+                if b is None:
+                    b = buckets[pk.edge] = []
+                    order.append(pk.edge)
+                b.append(pk)
 
             new_packets: List[Packet] = []
             cancelled_energy = 0.0
             field_energy = 0.0
             localized_energy = 0.0
-
-            for edge_id, plist in by_edge.items():
+            dropped = 0.0
+            split_in = 0.0
+            split_out = 0.0
+            comparisons = cancellations = splits = 0
+
+            for edge in order:
+                if prof:
+                    prof.enter("cancel")
+                plist = cast(List[Packet], buckets[edge])
+                buckets[edge] = None
                 P = [p for p in plist if p.polarity == +1]
                 N = [p for p in plist if p.polarity == -1]
 
                 if P and N:
                     P.sort(key=lambda x: x.frequency)
                     N.sort(key=lambda x: x.frequency)
-                    i = j = 0
-                    while i < len(P) and j < len(N):
+                    pairs, compared = cancel_pairs([p.frequency for p in P], [p.phase for p in P],
+                                                   [n.frequency for n in N], [n.phase for n in N], cfg)
+                    for i, j in pairs:
                         p, n = P[i], N[j]
-                        df = abs(p.frequency - n.frequency) / \
-                            max(1e-6, (p.frequency + n.frequency) / 2.0)
-                        dphi = abs(((p.phase - n.phase + math.pi) %
-                                   (2 * math.pi)) - math.pi)
-                        if df <= self.cfg.cancel_bandwidth and dphi >= (math.pi - self.cfg.cancel_phase_tol):
-                            k = self.cfg.cancel_efficiency * \
-                                min(p.coherence, n.coherence)
-                            dE = k * min(p.energy, n.energy)
-                            p.energy -= dE
-                            n.energy -= dE
-                            cancelled_energy += dE * 2.0
-                            field_energy += dE * 0.5
-                        if p.frequency <= n.frequency:
-                            i += 1
-                        else:
-                            j += 1
-
-                    if field_energy >= self.cfg.field_E_thresh:
+                        k = cfg.cancel_efficiency * \
+                            min(p.coherence, n.coherence)
+                        dE = k * min(p.energy, n.energy)
+                        p.energy -= dE
+                        n.energy -= dE
+                        cancelled_energy += dE * 2.0
+                        field_energy += dE * 0.5
+                    cancellations += len(pairs)
+                    comparisons += compared
+
+                    if field_energy >= cfg.field_E_thresh:
                         coh_vals = [p.coherence for p in P + N]
                         coh_mean = sum(coh_vals) / float(len(coh_vals))
-                        emit_field([edge_id], field_energy, coh_mean)
+                        out.field([edge], field_energy, coh_mean)
 
                 # Propagate / localize
-                e = self.edge_index[edge_id]
-                target_node = str(e["target"])
+                if prof:
+                    prof.enter("propagate")
+                target_node = target[edge]
                 for pk in plist:
                     if pk.energy <= 1e-12:
+                        dropped += pk.energy
                         continue
                     if pk.prog < 1.0:
                         new_packets.append(pk)
                     else:
-                        outs = self.next_edges.get(
-                            (target_node, pk.polarity), [])
-                        if not outs:
+                        r = 2 * target_node + (pk.polarity < 0)
+                        lo, hi = out_ptr[r], out_ptr[r + 1]
+                        if lo == hi:
                             localized_energy += pk.energy
-                            if pk.energy >= self.cfg.particle_E_thresh and pk.coherence >= self.cfg.coherence_thresh:
-                                emit_particle(
+                            if pk.energy >= cfg.particle_E_thresh and pk.coherence >= cfg.coherence_thresh:
+                                out.particle(
                                     target_node, pk.energy, pk.coherence)
                         else:
-                            share = (pk.energy * self.cfg.split_decay) / \
-                                float(len(outs))
-                            for oe in outs:
+                            share = (pk.energy * cfg.split_decay) / \
+                                float(hi - lo)
+                            split_in += pk.energy
+                            split_out += share * (hi - lo)
+                            splits += 1
+                            for oe in out_edges[lo:hi]:
                                 new_packets.append(Packet(
-                                    edge_id=str(oe["id"]), prog=0.0, energy=share,
+                                    edge=oe, prog=0.0, energy=share,
                                     frequency=pk.frequency, phase=pk.phase,
                                     coherence=pk.coherence, polarity=pk.polarity
                                 ))
 
             packets = new_packets
-            energy_after = sum(p.energy for p in packets)
-
-            removed = max(0.0, energy_before - energy_after)
-            accounted = localized_energy + \
-                field_energy + (cancelled_energy * 0.5)
-            drift = max(0.0, removed - accounted)
-            step_rec = {
-                "step": step,
-                "drift_rel": drift / max(1e-12, energy_before)
-            }
-            if step_rec["drift_rel"] > self.cfg.conservation_tol:
-                step_rec["conservation_warning"] = True
-            ledger["steps"].append(step_rec)
-
-        ledger["final"] = {
-            "particles_energy": sum(p.energy for p in particles),
-            "fields_energy": sum(f.energy for f in fields),
-            "remaining_packets_energy": sum(p.energy for p in packets)
-        }
-
-        return {
-            "particles": [asdict(p) for p in particles],
-            "fields": [asdict(f) for f in fields],
-            "detections": [asdict(d) for d in dets],
-            "steps": step,
-            "ledger": ledger
-        }
+            coalesce_rec: Dict[str, Any] = {}
+            if prof:
+                prof.enter("coalesce")
+            if cfg.coalesce:
+                from .ptk_vector import coalesce_packets
+                packets, coalesce_rec = coalesce_packets(packets, cfg)
+            roulette_rec: Dict[str, Any] = {}
+            if prof:
+                prof.enter("prune")
+            if cfg.roulette:
+                from .ptk_vector import roulette_packets
+                packets, roulette_rec = roulette_packets(packets, cfg, roulette_below, run.rng)
+            if prof:
+                prof.enter("ledger")
+
+            pruned = roulette_rec.get("roulette_energy_delta", 0.0)
+            net = (gained - cancelled_energy - dropped - localized_energy
+                   - split_in + split_out + coalesce_rec.get("coalesce_energy_delta", 0.0) + pruned)
+            live_energy = max(0.0, energy_before + net)
+            ledger_err += _EPS * (energy_before + abs(gained) + cancelled_energy + dropped
+                                  + localized_energy + split_in + split_out)
+            if cfg.roulette:
+                ledger_err += _EPS * roulette_rec.get("roulette_energy_in", 0.0) / cfg.roulette_survival
+            if ledger_err > LEDGER_RESYNC_REL * live_energy:
+                live_energy, ledger_err = sum(p.energy for p in packets), 0.0
+            step_rec = _step_record(step, energy_before, net, localized_energy,
+                                    field_energy, cancelled_energy, cfg, pruned)
+            step_rec.update(coalesce_rec)
+            step_rec.update(roulette_rec)
+            if cfg.ledger_check_every and step % cfg.ledger_check_every == 0:
+                _check_ledger(step_rec, live_energy, sum(p.energy for p in packets), cfg)
+            prof_rec = prof.record(live_packets=n_live, edges_touched=len(order), cancel_comparisons=comparisons,
+                                   cancellations=cancellations, splits=splits) if prof else None
+            yield out.snapshot(step, step_rec, len(packets), live_energy, prof_rec)
+            if prof:
+                prof.restart()
+
+        return sum(p.energy for p in packets)
 
 
 if __name__ == "__main__":
     # Optional demo only; not executed during import
-    import json
-    demo = json.load(open("ptk.v1.json", "r", encoding="utf-8"))
-    K = PTKKernel(demo)
+    K = PTKKernel.from_file("ptk.v1.json")
     pos = [Sound("n1", +1, 5.0, 440.0, 0.0, 0.9)]
     neg = [Sound("n4", -1, 5.0, 440.0, math.pi, 0.9)]
     res = K.simulate_emission(pos, neg, EmissionConfig(max_steps=10))
-    json.dump(res, open("out/ptk_emission_result_demo.json", "w"), indent=2)
+    json.dump(res.to_dict(), open("out/ptk_emission_result_demo.json", "w"), indent=2)
     print("Demo wrote out/ptk_emission_result_demo.json")
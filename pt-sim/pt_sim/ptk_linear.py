@@ -0,0 +1,130 @@
+# ruff: noqa: E501
+"""
+Linear-response path for cancellation-free runs.
+
+Without cancellation, packets never interact: the energy on every edge is a
+linear function of the sound energies (gain per step, split_decay / degree
+at every split). `propagate_linear` therefore steps one energy vector per
+edge "age" (steps already taken on the edge, 0 .. k-1 for k steps per edge)
+instead of individual packets. Splits are a sparse matrix-vector product
+over the compiled graph (COO parent -> child edge arrays, applied with
+`np.bincount`), so a step costs O(edges x k + split fan-out) however many
+packets the reference engines would be carrying.
+
+What it computes is the aggregate energy flow: energy localized at every
+terminal node over the run, and the energy still in flight after the last
+step. It runs until `max_steps` or until no energy is left in flight,
+regardless of `max_outputs` and the particle thresholds. Individual packets
+at or below 1e-12, which the engines drop, are kept, so results match the
+engines to within that tail.
+
+`localized_response` takes this path only when `cancellation_possible` is
+false. That check is conservative: no (+, -) sound pair may be within
+`cancel_bandwidth` and `cancel_phase_tol` of each other, and coalescing and
+roulette pruning must be off. Otherwise it falls back to stepping
+`cfg.engine` with every localization recorded as a particle.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Dict, List, Tuple
+import math
+import sys
+
+import numpy as np
+
+from .ptk_event import steps_per_edge
+from .ptk_graph import CompiledGraph, row_of
+
+if TYPE_CHECKING:
+    from .ptk_kernel import EmissionConfig, PTKKernel, Sound, _RunContext
+
+
+@dataclass
+class LinearResponse:
+    localized: np.ndarray   # float64 per node: energy localized there over the run
+    remaining: float        # energy still in flight after the last step
+    steps: int
+    linear: bool            # True: linear path; False: fell back to packet stepping
+
+    def by_node(self, graph: CompiledGraph) -> Dict[str, float]:
+        """Localized energy keyed by node id, non-zero nodes only."""
+        return {graph.node_ids[i]: float(self.localized[i]) for i in np.flatnonzero(self.localized)}
+
+
+def cancellation_possible(positive: List["Sound"], negative: List["Sound"], cfg: "EmissionConfig") -> bool:
+    """True unless no + packet can ever meet a cancelling - packet."""
+    if cfg.coalesce or cfg.roulette:
+        return True
+    sounds = positive + negative
+    P = [s for s in sounds if s.polarity == 1]
+    N = [s for s in sounds if s.polarity == -1]
+    if not P or not N:
+        return False
+    fp = np.array([s.frequency for s in P])[:, None]
+    fn = np.array([s.frequency for s in N])[None, :]
+    pp = np.array([s.phase for s in P])[:, None]
+    pn = np.array([s.phase for s in N])[None, :]
+    df = np.abs(fp - fn) / np.maximum(1e-6, (fp + fn) / 2.0)
+    dphi = np.abs(((pp - pn + math.pi) % (2 * math.pi)) - math.pi)
+    return bool(((df <= cfg.cancel_bandwidth) & (dphi >= math.pi - cfg.cancel_phase_tol)).any())
+
+
+def _split_coo(G: CompiledGraph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split matrix in COO form: parent and child edge per entry, plus every edge's out-degree (0 = terminal)."""
+    rows = row_of(G.edge_target, G.edge_polarity)
+    deg = G.out_degree(rows)
+    parent = np.repeat(np.arange(G.n_edges), deg)
+    offset = np.arange(parent.shape[0]) - np.repeat(np.cumsum(deg) - deg, deg)
+    child = G.out_edges[G.out_ptr[rows][parent] + offset]
+    return parent, child, deg
+
+
+def _seed(G: CompiledGraph, sounds: List["Sound"]) -> np.ndarray:
+    x = np.zeros(G.n_edges, dtype=float)
+    for s in sounds:
+        node = G.node_index.get(s.node_id)
+        if node is None or s.polarity not in (1, -1):
+            continue
+        outs = G.outs(node, s.polarity)
+        if outs.size:
+            np.add.at(x, outs, s.energy / len(outs))
+    return x
+
+
+def propagate_linear(G: CompiledGraph, positive: List["Sound"], negative: List["Sound"], cfg: "EmissionConfig") -> LinearResponse:
+    """Aggregate energy flow by sparse propagation (assumes no cancellation)."""
+    k = steps_per_edge(cfg.step_len)
+    gain = G.gains(cfg)
+    parent, child, deg = _split_coo(G)
+    w = cfg.split_decay / deg[parent]
+    terminal = deg == 0
+    term_target = G.edge_target[terminal]
+
+    ages = [_seed(G, positive + negative)] + [np.zeros(G.n_edges) for _ in range(k - 1)]
+    localized = np.zeros(G.n_nodes, dtype=float)
+    step = 0
+    while step < cfg.max_steps and any(a.any() for a in ages):
+        step += 1
+        ages = [a * gain for a in ages]
+        arrived = ages.pop()
+        localized += np.bincount(term_target, weights=arrived[terminal], minlength=G.n_nodes)
+        ages.insert(0, np.bincount(child, weights=arrived[parent] * w, minlength=G.n_edges))
+    return LinearResponse(localized, float(sum(a.sum() for a in ages)), step, True)
+
+
+def packet_response(kernel: "PTKKernel", positive: List["Sound"], negative: List["Sound"], run: "_RunContext") -> LinearResponse:
+    """Reference: step the engine with every localization kept as a particle."""
+    from .ptk_kernel import _Collector, _drain, _RunContext
+
+    cfg = replace(run.cfg, particle_E_thresh=0.0, coherence_thresh=0.0, max_outputs=sys.maxsize, profile=False)
+    res = _drain(kernel._run_engine(positive, negative, _RunContext(cfg, run.rng, run.event)),
+                 _Collector(kernel.graph, positive, negative))
+    localized = np.bincount(res.particle.locus, weights=res.particle.energy, minlength=kernel.graph.n_nodes)
+    return LinearResponse(localized, float(res.ledger["final"]["remaining_packets_energy"]), res.steps, False)
+
+
+def localized_response(kernel: "PTKKernel", positive: List["Sound"], negative: List["Sound"], run: "_RunContext") -> LinearResponse:
+    if cancellation_possible(positive, negative, run.cfg):
+        return packet_response(kernel, positive, negative, run)
+    return propagate_linear(kernel.graph, positive, negative, run.cfg)
@@ -0,0 +1,253 @@
+# ruff: noqa: E501
+"""
+Columnar emission results.
+
+Engines append outputs to `OutputColumns` (plain parallel lists, no
+per-output objects). `EmissionResult` concatenates them into NumPy columns
+and derives mass2 / Q / strength / confidence in bulk. It is a read-only
+Mapping with the classic keys ("particles", "fields", "detections",
+"steps", "ledger" and, when profiled, "profile"); the dict views are only
+built when one of those keys is read, and `to_dict()` returns the plain
+dict for JSON. `save` / `load` round-trip the tables through an .npz.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Sequence, Union
+import json
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from .ptk_graph import CompiledGraph
+
+PARTICLE, FIELD = 0, 1  # detection kind codes
+DETECTION_KINDS = ("particle", "field")
+SUPPORT_EDGES_MAX = 32
+
+
+@dataclass
+class OutputColumns:
+    """Outputs appended during one step (or a whole run), as parallel lists."""
+    p_id: List[Any] = field(default_factory=list)
+    p_node: List[int] = field(default_factory=list)
+    p_energy: List[float] = field(default_factory=list)
+    p_coh: List[float] = field(default_factory=list)
+    f_id: List[Any] = field(default_factory=list)
+    f_edges: List[List[int]] = field(default_factory=list)
+    f_energy: List[float] = field(default_factory=list)
+    f_coh: List[float] = field(default_factory=list)
+    d_id: List[Any] = field(default_factory=list)
+    d_kind: List[int] = field(default_factory=list)   # PARTICLE / FIELD
+    d_ref: List[int] = field(default_factory=list)    # row in the particle / field columns
+
+    def add_particle(self, pid: Any, did: Any, node: int, E: float, coh: float) -> None:
+        self.p_id.append(pid)
+        self.p_node.append(node)
+        self.p_energy.append(E)
+        self.p_coh.append(coh)
+        self.d_id.append(did)
+        self.d_kind.append(PARTICLE)
+        self.d_ref.append(len(self.p_id) - 1)
+
+    def add_field(self, fid: Any, did: Any, edges: List[int], E: float, coh: float) -> None:
+        self.f_id.append(fid)
+        self.f_edges.append(edges[:SUPPORT_EDGES_MAX])
+        self.f_energy.append(E)
+        self.f_coh.append(coh)
+        self.d_id.append(did)
+        self.d_kind.append(FIELD)
+        self.d_ref.append(len(self.f_id) - 1)
+
+    def extend(self, other: "OutputColumns") -> None:
+        """Append `other`, re-basing its detection refs."""
+        n_p, n_f = len(self.p_id), len(self.f_id)
+        for name in ("p_id", "p_node", "p_energy", "p_coh", "f_id", "f_edges", "f_energy", "f_coh", "d_id", "d_kind"):
+            getattr(self, name).extend(getattr(other, name))
+        self.d_ref.extend(r + (n_p if k == PARTICLE else n_f) for k, r in zip(other.d_kind, other.d_ref))
+
+
+@dataclass
+class ParticleTable:
+    id: List[Any]              # id objects (str() on serialization)
+    locus: np.ndarray          # int64 node index
+    energy: np.ndarray
+    mass2: np.ndarray
+    q_line: np.ndarray
+    q_pos: np.ndarray
+    coherence: np.ndarray
+
+
+@dataclass
+class FieldTable:
+    id: List[Any]
+    energy: np.ndarray
+    strength: np.ndarray
+    coherence: np.ndarray
+    vector: np.ndarray         # bool: mode "vector" (else "scalar")
+    support_ptr: np.ndarray    # int64 CSR offsets into support_edges
+    support_edges: np.ndarray  # int64 edge indices
+
+
+@dataclass
+class DetectionTable:
+    id: List[Any]
+    kind: np.ndarray           # int8 PARTICLE / FIELD
+    ref: np.ndarray            # int64 row in the particle / field table
+    confidence: np.ndarray
+
+
+def particle_table(graph: "CompiledGraph", c: OutputColumns) -> ParticleTable:
+    node = np.asarray(c.p_node, dtype=np.int64)
+    E = np.asarray(c.p_energy, dtype=float)
+    coh = np.asarray(c.p_coh, dtype=float)
+    return ParticleTable(
+        id=c.p_id, locus=node, energy=E, mass2=E * (0.8 + 0.4 * coh),
+        q_line=graph.node_line[node], q_pos=graph.node_pos[node], coherence=coh,
+    )
+
+
+def field_table(c: OutputColumns) -> FieldTable:
+    E = np.asarray(c.f_energy, dtype=float)
+    coh = np.asarray(c.f_coh, dtype=float)
+    ptr = np.zeros(len(c.f_edges) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in c.f_edges], out=ptr[1:])
+    return FieldTable(
+        id=c.f_id, energy=E, strength=E * (0.5 + 0.5 * coh), coherence=coh, vector=coh > 0.7,
+        support_ptr=ptr, support_edges=np.asarray([e for es in c.f_edges for e in es], dtype=np.int64),
+    )
+
+
+def detection_table(c: OutputColumns, p_coh: np.ndarray, f_coh: np.ndarray) -> DetectionTable:
+    kind = np.asarray(c.d_kind, dtype=np.int8)
+    ref = np.asarray(c.d_ref, dtype=np.int64)
+    is_p = kind == PARTICLE
+    conf = np.empty(len(ref), dtype=float)
+    conf[is_p] = np.minimum(1.0, 0.6 + 0.4 * p_coh[ref[is_p]])
+    conf[~is_p] = np.minimum(1.0, 0.5 + 0.5 * f_coh[ref[~is_p]])
+    return DetectionTable(id=c.d_id, kind=kind, ref=ref, confidence=conf)
+
+
+class EmissionResult(Mapping[str, Any]):
+    """Result of one emission run: NumPy output tables plus ledger.
+
+    `particle`, `field` and `detection` are the columnar tables. Reading
+    `result["particles"]` (etc.) builds the classic list of dicts once and
+    caches it; `to_dict()` returns everything as a plain dict.
+    """
+
+    def __init__(self, graph: Optional["CompiledGraph"], particle: ParticleTable, field: FieldTable,
+                 detection: DetectionTable, steps: int, ledger: Dict[str, Any],
+                 profile: Optional[Dict[str, Any]] = None):
+        self.graph = graph
+        self.particle = particle
+        self.field = field
+        self.detection = detection
+        self.steps = steps
+        self.ledger = ledger
+        self.profile = profile
+        self._views: Dict[str, Any] = {}
+
+    @classmethod
+    def from_outputs(cls, graph: "CompiledGraph", outputs: OutputColumns, steps: int,
+                     ledger: Dict[str, Any], profile: Optional[Dict[str, Any]] = None) -> "EmissionResult":
+        particle = particle_table(graph, outputs)
+        field = field_table(outputs)
+        return cls(graph, particle, field, detection_table(outputs, particle.coherence, field.coherence),
+                   steps, ledger, profile)
+
+    def save(self, file: Union[str, BinaryIO]) -> None:
+        """Write the tables to an .npz (ids stored as strings, ledger as JSON)."""
+        arrays: Dict[str, Any] = {
+            "meta": np.array(json.dumps({"steps": self.steps, "ledger": self.ledger, "profile": self.profile})),
+        }
+        for prefix, table in (("p", self.particle), ("f", self.field), ("d", self.detection)):
+            for name, value in vars(table).items():
+                arrays[f"{prefix}_{name}"] = np.array([str(i) for i in value], dtype=str) if name == "id" else value
+        np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, file: Union[str, BinaryIO], graph: Optional["CompiledGraph"]) -> "EmissionResult":
+        """Inverse of `save`; ids come back as strings."""
+        with np.load(file, allow_pickle=False) as z:
+            cols = {k: z[k] for k in z.files}
+        meta = json.loads(str(cols.pop("meta")))
+
+        def table(kind: Any, prefix: str) -> Any:
+            return kind(**{name: (cols[f"{prefix}_{name}"].tolist() if name == "id" else cols[f"{prefix}_{name}"])
+                           for name in kind.__dataclass_fields__})
+
+        return cls(graph, table(ParticleTable, "p"), table(FieldTable, "f"), table(DetectionTable, "d"),
+                   meta["steps"], meta["ledger"], meta["profile"])
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # pickles (e.g. from pool workers) leave the graph behind; the
+        # receiver sets `result.graph` before reading dict views
+        state = dict(self.__dict__)
+        state["graph"] = None
+        state["_views"] = {}
+        return state
+
+    def _keys(self) -> Sequence[str]:
+        keys = ("particles", "fields", "detections", "steps", "ledger")
+        return keys + ("profile",) if self.profile is not None else keys
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "steps":
+            return self.steps
+        if key == "ledger":
+            return self.ledger
+        if key == "profile" and self.profile is not None:
+            return self.profile
+        if key not in ("particles", "fields", "detections"):
+            raise KeyError(key)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = getattr(self, "_" + key)()
+        return view
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return (f"EmissionResult(steps={self.steps}, particles={len(self.particle.id)}, "
+                f"fields={len(self.field.id)}, detections={len(self.detection.id)})")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict in the classic `simulate_emission` layout (ids as strings)."""
+        return {k: self[k] for k in self._keys()}
+
+    def _require_graph(self) -> "CompiledGraph":
+        if self.graph is None:
+            raise RuntimeError("EmissionResult has no graph attached (set result.graph after unpickling)")
+        return self.graph
+
+    def _particles(self) -> List[Dict[str, Any]]:
+        t = self._require_graph()
+        p = self.particle
+        return [
+            {"id": str(i), "locus": t.node_ids[n], "energy": E, "mass2": m2, "Q": {"line": ql, "pos": qp}}
+            for i, n, E, m2, ql, qp in zip(p.id, p.locus.tolist(), p.energy.tolist(), p.mass2.tolist(),
+                                           p.q_line.tolist(), p.q_pos.tolist())
+        ]
+
+    def _fields(self) -> List[Dict[str, Any]]:
+        f = self.field
+        ptr = f.support_ptr.tolist()
+        edge_ids = [self._require_graph().edge_ids[e] for e in f.support_edges.tolist()]
+        return [
+            {"id": str(i), "support_edges": edge_ids[ptr[k]:ptr[k + 1]], "energy": E, "strength": S,
+             "mode": ("vector" if v else "scalar")}
+            for k, (i, E, S, v) in enumerate(zip(f.id, f.energy.tolist(), f.strength.tolist(), f.vector.tolist()))
+        ]
+
+    def _detections(self) -> List[Dict[str, Any]]:
+        d = self.detection
+        ref_ids = (self.particle.id, self.field.id)
+        return [
+            {"id": str(i), "kind": DETECTION_KINDS[k], "ref_id": str(ref_ids[k][r]), "confidence": c}
+            for i, k, r, c in zip(d.id, d.kind.tolist(), d.ref.tolist(), d.confidence.tolist())
+        ]
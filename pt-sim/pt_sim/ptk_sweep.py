@@ -0,0 +1,221 @@
+# ruff: noqa: E501
+"""
+Parameter sweeps over `EmissionConfig`.
+
+A sweep is a list of points: each point is a dict of `EmissionConfig`
+overrides, from `grid` (cartesian product) or `random_design` (seeded
+uniform / choice draws). Every point runs the same events with the same
+per-event seeds (`ptk_parallel.derive_seed`), so differences between
+points come from the parameters only.
+
+`run_sweep` loads the kernel once (once per worker process with
+`workers > 1`) and runs one point per task. Each completed point is
+appended to a JSONL checkpoint keyed by a hash of its parameters, so an
+interrupted sweep picks up where it stopped. The result is one columnar
+`SweepTable`: a column per swept parameter, then per-point totals over the
+events (particles, fields, their energies, remaining energy, steps,
+conservation warnings) and the maximum per-step drift.
+"""
+
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields, replace
+from typing import IO, Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+import itertools
+import json
+import os
+
+import numpy as np
+
+from .core.rng import stable_hash_obj
+from .ptk_kernel import EmissionConfig, PTKKernel
+from .ptk_result import EmissionResult
+from . import ptk_parallel
+from .ptk_parallel import Event, PTKSource, _run_event, load_kernel
+
+Point = Dict[str, Any]
+METRICS = ("particles", "fields", "particles_energy", "fields_energy", "remaining_energy", "steps",
+           "conservation_warnings", "max_drift_rel")
+_CONFIG_FIELDS = {f.name for f in fields(EmissionConfig)}
+
+
+def _check_names(names: Sequence[str]) -> None:
+    unknown = sorted(set(names) - _CONFIG_FIELDS)
+    if unknown:
+        raise ValueError(f"not EmissionConfig fields: {unknown}")
+
+
+def grid(space: Mapping[str, Sequence[Any]]) -> List[Point]:
+    """Every combination of the listed values (last parameter varies fastest)."""
+    _check_names(list(space))
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[n] for n in names))]
+
+
+def random_design(space: Mapping[str, Union[Tuple[float, float], Sequence[Any]]], n: int, seed: int = 0) -> List[Point]:
+    """`n` seeded random points. A 2-tuple (lo, hi) draws uniformly (integers
+    if both ends are ints, inclusive); a list draws one of its values."""
+    _check_names(list(space))
+    rng = np.random.default_rng(seed)
+    cols: Dict[str, List[Any]] = {}
+    for name, spec in space.items():
+        if isinstance(spec, tuple) and len(spec) == 2:
+            lo, hi = spec
+            if isinstance(lo, int) and isinstance(hi, int):
+                cols[name] = rng.integers(lo, hi + 1, size=n).tolist()
+            else:
+                cols[name] = rng.uniform(lo, hi, size=n).tolist()
+        else:
+            cols[name] = [spec[i] for i in rng.integers(0, len(spec), size=n).tolist()]
+    return [{name: cols[name][i] for name in space} for i in range(n)]
+
+
+def point_id(point: Point) -> str:
+    return stable_hash_obj(point)[:16]
+
+
+def summarize(results: Sequence[EmissionResult]) -> Dict[str, Any]:
+    """Sweep metrics of one point: totals over its events, max drift."""
+    steps = [s for r in results for s in r["ledger"]["steps"]]
+    return {
+        "particles": sum(len(r.particle.id) for r in results),
+        "fields": sum(len(r.field.id) for r in results),
+        "particles_energy": float(sum(r["ledger"]["final"]["particles_energy"] for r in results)),
+        "fields_energy": float(sum(r["ledger"]["final"]["fields_energy"] for r in results)),
+        "remaining_energy": float(sum(r["ledger"]["final"]["remaining_packets_energy"] for r in results)),
+        "steps": sum(r["steps"] for r in results),
+        "conservation_warnings": sum(1 for s in steps if s.get("conservation_warning")),
+        "max_drift_rel": max((s["drift_rel"] for s in steps), default=0.0),
+    }
+
+
+def _run_point(K: PTKKernel, point: Point, events: Sequence[Event], cfg: EmissionConfig, root_seed: Optional[int]) -> Dict[str, Any]:
+    pcfg = replace(cfg, **point)
+    # an rng_seed axis sets the root seed the point's event seeds derive from
+    root = point.get("rng_seed", root_seed)
+    return summarize([_run_event(K, i, ev, pcfg, root) for i, ev in enumerate(events)])
+
+
+def _run_point_worker(job: Tuple[Point, Sequence[Event], EmissionConfig, Optional[int]]) -> Dict[str, Any]:
+    if ptk_parallel._KERNEL is None:
+        raise RuntimeError("worker not initialized: the pool needs initializer=ptk_parallel._init_worker")
+    return _run_point(ptk_parallel._KERNEL, *job)
+
+
+@dataclass
+class SweepTable:
+    """Columnar sweep summary: parameter columns, then `METRICS`, one row per point."""
+    params: List[str]
+    columns: Dict[str, np.ndarray]
+
+    def __len__(self) -> int:
+        return len(self.columns["point_id"])
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        names = list(self.columns)
+        for values in zip(*(self.columns[n].tolist() for n in names)):
+            yield dict(zip(names, values))
+
+    def save(self, path: str) -> None:
+        """.npz (columns as arrays) or, for any other extension, CSV."""
+        if path.endswith(".npz"):
+            arrays: Dict[str, Any] = {"params": np.array(self.params, dtype=str), **self.columns}
+            np.savez(path, **arrays)
+            return
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(",".join(self.columns) + "\n")
+            for row in self.rows():
+                f.write(",".join(str(v) for v in row.values()) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "SweepTable":
+        with np.load(path, allow_pickle=False) as z:
+            params = z["params"].tolist()
+            return cls(params, {k: z[k] for k in z.files if k != "params"})
+
+
+def _table(points: Sequence[Point], summaries: Sequence[Dict[str, Any]]) -> SweepTable:
+    params = list(dict.fromkeys(k for p in points for k in p))
+    cols: Dict[str, Any] = {"point_id": np.array([point_id(p) for p in points], dtype=str)}
+    for name in params:
+        values = [p.get(name) for p in points]
+        cols[name] = np.array(values) if None not in values else np.array([str(v) for v in values], dtype=str)
+    for m in METRICS:
+        cols[m] = np.array([s[m] for s in summaries])
+    return SweepTable(params, cols)
+
+
+def _sweep_key(K: PTKKernel, events: Sequence[Event], cfg: EmissionConfig, root_seed: Optional[int]) -> str:
+    """What a checkpointed point depends on besides its own parameters."""
+    return stable_hash_obj({
+        "ptk": K.ptk_hash, "cfg": asdict(cfg), "root_seed": root_seed,
+        "events": [[[asdict(s) for s in pos], [asdict(s) for s in neg]] for pos, neg in events],
+    })[:16]
+
+
+def _read_checkpoint(path: Optional[str], key: str) -> Dict[str, Dict[str, Any]]:
+    done: Dict[str, Dict[str, Any]] = {}
+    if not path or not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line from an interrupted run
+            if rec.get("sweep") == key:
+                done[rec["id"]] = rec["summary"]
+    return done
+
+
+def _open_checkpoint(path: str) -> IO[str]:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, "a+", encoding="utf-8")
+    if f.tell():
+        f.seek(f.tell() - 1)
+        if f.read(1) != "\n":
+            f.write("\n")  # terminate a torn line so it stays a single bad record
+    return f
+
+
+def run_sweep(ptk: PTKSource, points: Sequence[Point], events: Sequence[Event], cfg: Optional[EmissionConfig] = None,
+              root_seed: Optional[int] = None, workers: Optional[int] = 1, checkpoint: Optional[str] = None) -> SweepTable:
+    """Run every point over `events`; returns the summary table in `points` order.
+
+    `ptk` is a path or parsed document (loaded once per process). With a
+    `checkpoint` path, points already recorded there for the same kernel,
+    base config, events and seed are not re-run, and new ones are appended
+    as they finish. `workers` > 1 runs points on a process pool; None means
+    the CPU count. A point that sets `rng_seed` runs with it as root seed.
+    """
+    cfg = cfg or EmissionConfig()
+    root = cfg.rng_seed if root_seed is None else root_seed
+    for p in points:
+        _check_names(list(p))
+    # for a path this also (re)builds the compiled copy the workers load
+    K = load_kernel(ptk)
+    key = _sweep_key(K, events, cfg, root)
+    done = _read_checkpoint(checkpoint, key)
+    todo = [p for pid, p in dict((point_id(p), p) for p in points).items() if pid not in done]
+    ckpt = _open_checkpoint(checkpoint) if checkpoint and todo else None
+
+    def record(point: Point, summary: Dict[str, Any]) -> None:
+        done[point_id(point)] = summary
+        if ckpt:
+            ckpt.write(json.dumps({"sweep": key, "id": point_id(point), "params": point, "summary": summary}) + "\n")
+            ckpt.flush()
+
+    workers = workers or os.cpu_count() or 1
+    try:
+        if workers <= 1 or len(todo) <= 1:
+            for p in todo:
+                record(p, _run_point(K, p, events, cfg, root))
+        elif todo:
+            with ProcessPoolExecutor(max_workers=workers, initializer=ptk_parallel._init_worker, initargs=(ptk,)) as pool:
+                futures = {pool.submit(_run_point_worker, (p, events, cfg, root)): p for p in todo}
+                for fut in as_completed(futures):
+                    record(futures[fut], fut.result())
+    finally:
+        if ckpt:
+            ckpt.close()
+    return _table(points, [done[point_id(p)] for p in points])
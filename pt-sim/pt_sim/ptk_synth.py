@@ -0,0 +1,161 @@
+# ruff: noqa: E501
+"""
+Seeded synthetic PTK documents for load testing.
+
+`write_synthetic_ptk` emits a document with the same shape as the canonical
+Maheshwara kernel (rows of nodes, within-line +/- chains, cross-sutra and
+special edges in both polarities, one group per line) at any size. Output
+is streamed item by item: nothing larger than one chunk of cross-sutra
+pairs is held in memory, so 10^5-node documents cost a few MB of RSS.
+
+The same `SynthSpec` always produces the same bytes (the meta block carries
+the spec instead of a creation date).
+"""
+
+from __future__ import annotations
+from dataclasses import asdict, dataclass
+from typing import IO, Dict, Iterator, Tuple, Union
+import json
+
+import numpy as np
+
+# (dash, speed, base weight) per edge type, as in the canonical kernel
+EDGE_STYLES: Dict[str, Tuple[Tuple[int, int], float, float]] = {
+    "within_line": ((6, 6), 1.0, 1.8),
+    "cross_sutra": ((2, 8), 1.3, 1.5),
+    "special": ((10, 6), 1.6, 3.0),
+}
+WEIGHT_DISTS = ("const", "uniform", "lognormal")
+MAX_NODES = 10 ** 6
+_CHUNK = 4096
+
+
+@dataclass(frozen=True)
+class SynthSpec:
+    lines: int = 14
+    nodes_min: int = 2               # nodes per line, drawn uniformly from [nodes_min, nodes_max]
+    nodes_max: int = 9
+    cross_density: float = 0.25      # cross-sutra pairs per node
+    special_pairs: int = 1
+    weight_dist: str = "const"       # "const" | "uniform" | "lognormal" around the base weights
+    weight_spread: float = 0.25      # half-width (uniform) or sigma (lognormal)
+    seed: int = 0
+
+    def validate(self) -> None:
+        if self.lines < 1 or not 1 <= self.nodes_min <= self.nodes_max:
+            raise ValueError("need lines >= 1 and 1 <= nodes_min <= nodes_max")
+        if self.lines * self.nodes_max > MAX_NODES:
+            raise ValueError(f"at most {MAX_NODES} nodes")
+        if self.cross_density < 0 or self.special_pairs < 0:
+            raise ValueError("cross_density and special_pairs must be >= 0")
+        if self.cross_density > 0 and self.lines < 2:
+            raise ValueError("cross-sutra edges need at least 2 lines")
+        if self.weight_dist not in WEIGHT_DISTS:
+            raise ValueError(f"weight_dist must be one of {WEIGHT_DISTS}")
+
+
+def _weights(rng: np.random.Generator, spec: SynthSpec, base: float, n: int) -> np.ndarray:
+    if spec.weight_dist == "uniform":
+        w = base * rng.uniform(1.0 - spec.weight_spread, 1.0 + spec.weight_spread, n)
+    elif spec.weight_dist == "lognormal":
+        w = base * np.exp(rng.normal(0.0, spec.weight_spread, n))
+    else:
+        w = np.full(n, base)
+    return np.round(np.maximum(w, 0.0), 6)
+
+
+def _pairs(rng: np.random.Generator, line_start: np.ndarray, n: int, cross_line: bool) -> Iterator[np.ndarray]:
+    """`n` (a, b) pairs of distinct 0-based node indices, in chunks; on different lines if `cross_line`."""
+    total = int(line_start[-1])
+    while n > 0:
+        m = min(n, _CHUNK)
+        ab = rng.integers(0, total, size=(m, 2))
+        if cross_line:
+            line = np.searchsorted(line_start, ab, side="right") - 1
+            ok = line[:, 0] != line[:, 1]
+        else:
+            ok = ab[:, 0] != ab[:, 1]
+        ab = ab[ok]
+        n -= len(ab)
+        yield ab
+
+
+def write_synthetic_ptk(out: Union[str, IO[str]], spec: SynthSpec = SynthSpec()) -> Dict[str, int]:
+    """Stream a synthetic PTK document to a path or text file; returns node/edge counts."""
+    if isinstance(out, str):
+        with open(out, "w", encoding="utf-8") as f:
+            return write_synthetic_ptk(f, spec)
+    spec.validate()
+    rng = np.random.default_rng(spec.seed)
+    sizes = rng.integers(spec.nodes_min, spec.nodes_max + 1, size=spec.lines)
+    line_start = np.zeros(spec.lines + 1, dtype=np.int64)
+    np.cumsum(sizes, out=line_start[1:])
+    n_nodes = int(line_start[-1])
+    if spec.special_pairs and n_nodes < 2:
+        raise ValueError("special edges need at least 2 nodes")
+
+    def dump(obj: object) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    sep = ""
+
+    def item(obj: object) -> None:
+        nonlocal sep
+        out.write(sep + dump(obj))
+        sep = ",\n"
+
+    def section(name: str) -> None:
+        nonlocal sep
+        out.write(f"],\n{dump(name)}: [\n" if name != "nodes" else f"{dump(name)}: [\n")
+        sep = ""
+
+    meta = {"encoding": "unicode", "generator": {"name": "pt_sim.ptk_synth", "spec": asdict(spec)}}
+    out.write("{" + f'"ptk_version": "1.0", "universe": "synthetic", "meta": {dump(meta)},\n')
+
+    section("nodes")
+    for line, size in enumerate(sizes.tolist(), start=1):
+        base = int(line_start[line - 1])
+        for pos in range(1, size + 1):
+            item({"id": f"n{base + pos}", "label": f"L{line}.{pos}", "sanskrit": None,
+                  "line": line, "pos": pos, "features": []})
+
+    section("edges")
+    eid = 0
+
+    def edge(src: int, dst: int, typ: str, pol: int, weight: float) -> None:
+        nonlocal eid
+        eid += 1
+        dash, speed, _ = EDGE_STYLES[typ]
+        item({"id": f"e{eid}", "source": f"n{src + 1}", "target": f"n{dst + 1}", "type": typ,
+              "polarity": pol, "flow": {"dash": list(dash), "speed": speed, "weight": weight}})
+
+    # within-line: positive L->R then negative R->L, one line at a time
+    w_base = EDGE_STYLES["within_line"][2]
+    for line in range(spec.lines):
+        lo, hi = int(line_start[line]), int(line_start[line + 1])
+        w = _weights(rng, spec, w_base, 2 * (hi - lo - 1)).tolist() if hi - lo > 1 else []
+        k = 0
+        for i in range(lo, hi - 1):
+            edge(i, i + 1, "within_line", +1, w[k])
+            k += 1
+        for i in range(hi - 1, lo, -1):
+            edge(i, i - 1, "within_line", -1, w[k])
+            k += 1
+
+    # cross-sutra and special: each pair in both polarities, same weight
+    n_cross = int(round(spec.cross_density * n_nodes))
+    for typ, n, cross_line in (("cross_sutra", n_cross, True), ("special", spec.special_pairs, False)):
+        for ab in _pairs(rng, line_start, n, cross_line):
+            for (a, b), wt in zip(ab.tolist(), _weights(rng, spec, EDGE_STYLES[typ][2], len(ab)).tolist()):
+                edge(a, b, typ, +1, wt)
+                edge(b, a, typ, -1, wt)
+
+    section("groups")
+    for line in range(spec.lines):
+        item({"name": "line", "key": line + 1,
+              "node_ids": [f"n{i + 1}" for i in range(int(line_start[line]), int(line_start[line + 1]))]})
+
+    hints = {"layout": "rows_by_line",
+             "edge_styles": {t: {"dash": list(d)} for t, (d, _, _) in EDGE_STYLES.items()}}
+    out.write(f"],\n\"render_hints\": {dump(hints)}}}\n")
+    return {"nodes": n_nodes, "edges": eid, "lines": spec.lines}
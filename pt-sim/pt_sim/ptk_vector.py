@@ -0,0 +1,551 @@
+# ruff: noqa: E501
+"""
+Struct-of-arrays emission engine for PTKKernel.
+
+Packets live in NumPy columns (edge index, prog, energy, frequency, phase,
+coherence, polarity) instead of `Packet` objects. Advance, gain, bucketing,
+cancellation, splitting and localization are array operations; only the
+(few) emitted outputs are built in Python. The packet ordering of the
+reference engine is reproduced exactly, so results and ledger match
+`PTKKernel._iter_packets` up to floating-point summation order.
+
+Selected with `EmissionConfig(engine="vector")`. Many independent events
+can share one stepping loop (`PTKKernel.simulate_emission_batch`); every
+packet then carries an event index and bucketing is keyed on (event, edge).
+
+`coalesce` (used by both engines when `cfg.coalesce` is set) merges packets
+that share event, edge, polarity and progress and fall into the same
+frequency/phase bin into one energy-weighted packet. `roulette` (with
+`cfg.roulette`) prunes low-energy packets by unbiased Russian roulette.
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, Generator, List, Optional, Sequence, Tuple
+import math
+
+import numpy as np
+
+from .ptk_cancel import cancel_pairs
+from .ptk_graph import CompiledGraph, row_of
+
+from .ptk_result import EmissionResult
+from .ptk_kernel import LEDGER_RESYNC_REL, _EPS, EmissionStep, Packet, _Collector, _Outputs, _Profiler, _check_ledger, _step_record
+
+if TYPE_CHECKING:
+    from .ptk_kernel import PTKKernel, Sound, EmissionConfig, _RunContext
+
+
+@dataclass
+class PacketColumns:
+    edge: np.ndarray         # int64 edge index
+    prog: np.ndarray         # float64
+    energy: np.ndarray       # float64
+    frequency: np.ndarray    # float64
+    phase: np.ndarray        # float64
+    coherence: np.ndarray    # float64
+    polarity: np.ndarray     # int8, +1 / -1
+    event: np.ndarray        # int64 event index within a batch
+
+    def __len__(self) -> int:
+        return int(self.edge.shape[0])
+
+    def take(self, idx: np.ndarray) -> "PacketColumns":
+        return PacketColumns(
+            edge=self.edge[idx], prog=self.prog[idx], energy=self.energy[idx],
+            frequency=self.frequency[idx], phase=self.phase[idx],
+            coherence=self.coherence[idx], polarity=self.polarity[idx],
+            event=self.event[idx],
+        )
+
+
+def _seed(G: CompiledGraph, events: Sequence[List["Sound"]]) -> PacketColumns:
+    cols: Dict[str, List[Any]] = {k: [] for k in ("edge", "energy", "frequency", "phase", "coherence", "polarity", "event")}
+    for ev, s in ((ev, s) for ev, sounds in enumerate(events) for s in sounds):
+        node = G.node_index.get(s.node_id)
+        if node is None or s.polarity not in (1, -1):
+            continue
+        outs = G.outs(node, s.polarity)
+        if outs.size == 0:
+            continue
+        share = s.energy / len(outs)
+        for e in outs:
+            cols["edge"].append(int(e))
+            cols["energy"].append(share)
+            cols["frequency"].append(s.frequency)
+            cols["phase"].append(s.phase)
+            cols["coherence"].append(s.coherence)
+            cols["polarity"].append(s.polarity)
+            cols["event"].append(ev)
+    n = len(cols["edge"])
+    return PacketColumns(
+        edge=np.asarray(cols["edge"], dtype=np.int64),
+        prog=np.zeros(n, dtype=float),
+        energy=np.asarray(cols["energy"], dtype=float),
+        frequency=np.asarray(cols["frequency"], dtype=float),
+        phase=np.asarray(cols["phase"], dtype=float),
+        coherence=np.asarray(cols["coherence"], dtype=float),
+        polarity=np.asarray(cols["polarity"], dtype=np.int8),
+        event=np.asarray(cols["event"], dtype=np.int64),
+    )
+
+
+def _bucket(pk: PacketColumns, n_edges: int) -> Tuple[PacketColumns, np.ndarray, np.ndarray]:
+    """Group packets by (event, edge) in order of first appearance (the
+    reference engine's `by_edge` dict order), stable within each edge.
+    Packets are kept contiguous per event, so groups are too.
+
+    Returns the permuted columns, the group index of every packet and the
+    start offset of every group.
+    """
+    _, first, inv = np.unique(pk.event * n_edges + pk.edge, return_index=True, return_inverse=True)
+    rank = np.empty(first.shape[0], dtype=np.int64)
+    rank[np.argsort(first, kind="stable")] = np.arange(first.shape[0])
+    grp = rank[inv.reshape(-1)]
+    order = np.argsort(grp, kind="stable")
+    grp = grp[order]
+    starts = np.flatnonzero(np.r_[True, grp[1:] != grp[:-1]])
+    return pk.take(order), grp, starts
+
+
+def _cancel(pk: PacketColumns, grp: np.ndarray, n_groups: int, cfg: "EmissionConfig",
+            counts: Optional[Dict[str, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Cancellation on every mixed-polarity edge. Mutates `pk.energy` in place.
+
+    The "two_pointer" mode runs in lockstep across edges; other modes take
+    their pairs from `ptk_cancel.cancel_pairs`, one edge at a time.
+
+    Returns the mixed-group mask, per-group field energy and per-group
+    cancelled energy. If `counts` is given, per-group "cancel_comparisons"
+    and "cancellations" are stored in it.
+    """
+    pos = pk.polarity == 1
+    n_pos = np.bincount(grp[pos], minlength=n_groups)
+    n_neg = np.bincount(grp[~pos], minlength=n_groups)
+    mixed = (n_pos > 0) & (n_neg > 0)
+    field_g = np.zeros(n_groups, dtype=float)
+    cancel_g = np.zeros(n_groups, dtype=float)
+    if counts is not None:
+        counts["cancel_comparisons"] = np.zeros(n_groups, dtype=np.int64)
+        counts["cancellations"] = np.zeros(n_groups, dtype=np.int64)
+    if not mixed.any():
+        return mixed, field_g, cancel_g
+
+    in_mixed = mixed[grp]
+    # per-group frequency-sorted P and N lists (stable, like list.sort)
+    P = np.flatnonzero(in_mixed & pos)
+    N = np.flatnonzero(in_mixed & ~pos)
+    P = P[np.lexsort((pk.frequency[P], grp[P]))]
+    N = N[np.lexsort((pk.frequency[N], grp[N]))]
+    gids = np.flatnonzero(mixed)
+    p_start = np.searchsorted(grp[P], gids)
+    n_start = np.searchsorted(grp[N], gids)
+    p_len, n_len = n_pos[gids], n_neg[gids]
+    if cfg.cancel_mode != "two_pointer":
+        _cancel_pairs(pk, P, N, gids, p_start, n_start, p_len, n_len, cfg, field_g, cancel_g, counts)
+        return mixed, field_g, cancel_g
+
+    i = np.zeros(gids.shape[0], dtype=np.int64)
+    j = np.zeros(gids.shape[0], dtype=np.int64)
+    live = np.arange(gids.shape[0])
+    while live.size:
+        p = P[p_start[live] + i[live]]
+        n = N[n_start[live] + j[live]]
+        fp, fn = pk.frequency[p], pk.frequency[n]
+        df = np.abs(fp - fn) / np.maximum(1e-6, (fp + fn) / 2.0)
+        dphi = np.abs(((pk.phase[p] - pk.phase[n] + math.pi) % (2 * math.pi)) - math.pi)
+        hit = (df <= cfg.cancel_bandwidth) & (dphi >= (math.pi - cfg.cancel_phase_tol))
+        if hit.any():
+            ph, nh = p[hit], n[hit]
+            k = cfg.cancel_efficiency * np.minimum(pk.coherence[ph], pk.coherence[nh])
+            dE = k * np.minimum(pk.energy[ph], pk.energy[nh])
+            pk.energy[ph] -= dE
+            pk.energy[nh] -= dE
+            np.add.at(cancel_g, gids[live[hit]], dE * 2.0)
+            np.add.at(field_g, gids[live[hit]], dE * 0.5)
+            if counts is not None:
+                np.add.at(counts["cancellations"], gids[live[hit]], 1)
+        step_p = fp <= fn
+        i[live[step_p]] += 1
+        j[live[~step_p]] += 1
+        live = live[(i[live] < p_len[live]) & (j[live] < n_len[live])]
+    if counts is not None:
+        counts["cancel_comparisons"][gids] = i + j
+    return mixed, field_g, cancel_g
+
+
+def _cancel_pairs(pk: PacketColumns, P: np.ndarray, N: np.ndarray, gids: np.ndarray, p_start: np.ndarray,
+                  n_start: np.ndarray, p_len: np.ndarray, n_len: np.ndarray, cfg: "EmissionConfig",
+                  field_g: np.ndarray, cancel_g: np.ndarray, counts: Optional[Dict[str, np.ndarray]]) -> None:
+    """Apply `cancel_pairs` per mixed group, in pair order (same arithmetic as the packet engine)."""
+    for g, ps, ns, lp, ln in zip(gids.tolist(), p_start.tolist(), n_start.tolist(), p_len.tolist(), n_len.tolist()):
+        Pg, Ng = P[ps:ps + lp], N[ns:ns + ln]
+        pairs, compared = cancel_pairs(pk.frequency[Pg].tolist(), pk.phase[Pg].tolist(),
+                                       pk.frequency[Ng].tolist(), pk.phase[Ng].tolist(), cfg)
+        if counts is not None:
+            counts["cancel_comparisons"][g] = compared
+            counts["cancellations"][g] = len(pairs)
+        if not pairs:
+            continue
+        idx = np.concatenate([Pg, Ng])
+        energy = pk.energy[idx].tolist()
+        coh = pk.coherence[idx].tolist()
+        for i, j in pairs:
+            j += lp
+            dE = cfg.cancel_efficiency * min(coh[i], coh[j]) * min(energy[i], energy[j])
+            energy[i] -= dE
+            energy[j] -= dE
+            cancel_g[g] += dE * 2.0
+            field_g[g] += dE * 0.5
+        pk.energy[idx] = energy
+
+
+def coalesce(pk: PacketColumns, cfg: "EmissionConfig", n_events: int = 1) -> Tuple[PacketColumns, Dict[str, np.ndarray]]:
+    """Merge packets on the same (event, edge, polarity, prog) whose frequency
+    (relative, `coalesce_freq_tol`) and phase (`coalesce_phase_tol`) fall in
+    the same bin. Energy adds; frequency and coherence become
+    energy-weighted means and phase the energy-weighted circular mean
+    (atan2 of the summed e*sin, e*cos, in [0, 2 pi)). The merged packet takes the place of the first
+    member, so packet order stays deterministic.
+
+    Returns the merged columns and per-event stats: packets merged away,
+    energy change (rounding only) and change of mean packet coherence.
+    """
+    stats = {
+        "coalesced": np.zeros(n_events, dtype=np.int64),
+        "coalesce_energy_delta": np.zeros(n_events, dtype=float),
+        "coalesce_coherence_delta": np.zeros(n_events, dtype=float),
+    }
+    if len(pk) < 2:
+        return pk, stats
+    fbin = np.floor(np.log(np.maximum(pk.frequency, 1e-6)) / np.log1p(cfg.coalesce_freq_tol))
+    pbin = np.floor(np.mod(pk.phase, 2 * math.pi) / cfg.coalesce_phase_tol)
+    keys = np.column_stack([pk.event, pk.edge, pk.polarity, pk.prog, fbin, pbin]).astype(float)
+    _, first, inv = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    m = first.shape[0]
+    if m == len(pk):
+        return pk, stats
+
+    order = np.argsort(first, kind="stable")
+    rank = np.empty(m, dtype=np.int64)
+    rank[order] = np.arange(m)
+    g = rank[inv.reshape(-1)]
+    cnt = np.bincount(g, minlength=m)
+    E = np.bincount(g, weights=pk.energy, minlength=m)
+    w = np.where(E > 0, E, 1.0)
+
+    merged = pk.take(first[order])
+    multi = cnt > 1
+    # zero-energy groups fall back to unweighted means
+    wt = np.where((E > 0)[g], pk.energy, 1.0)
+    for name in ("frequency", "coherence"):
+        x = getattr(pk, name)
+        mean = np.where(E > 0, np.bincount(g, weights=wt * x, minlength=m) / w,
+                        np.bincount(g, weights=x, minlength=m) / cnt)
+        setattr(merged, name, np.where(multi, mean, getattr(merged, name)))
+    # phase is circular: bins are taken modulo 2 pi, so average on the unit circle
+    phase = np.mod(np.arctan2(np.bincount(g, weights=wt * np.sin(pk.phase), minlength=m),
+                              np.bincount(g, weights=wt * np.cos(pk.phase), minlength=m)), 2 * math.pi)
+    merged.phase = np.where(multi, phase, merged.phase)
+    merged.energy = np.where(multi, E, merged.energy)
+
+    n_before = np.bincount(pk.event, minlength=n_events)
+    n_after = np.bincount(merged.event, minlength=n_events)
+    stats["coalesced"] = n_before - n_after
+    stats["coalesce_energy_delta"] = (np.bincount(merged.event, weights=merged.energy, minlength=n_events)
+                                      - np.bincount(pk.event, weights=pk.energy, minlength=n_events))
+    coh_before = np.bincount(pk.event, weights=pk.coherence, minlength=n_events) / np.maximum(n_before, 1)
+    coh_after = np.bincount(merged.event, weights=merged.coherence, minlength=n_events) / np.maximum(n_after, 1)
+    stats["coalesce_coherence_delta"] = coh_after - coh_before
+    return merged, stats
+
+
+def coalesce_packets(packets: List[Packet], cfg: "EmissionConfig") -> Tuple[List[Packet], Dict[str, Any]]:
+    """`coalesce` for the packet engine's `Packet` list (single event)."""
+    pk = PacketColumns(
+        edge=np.array([p.edge for p in packets], dtype=np.int64),
+        prog=np.array([p.prog for p in packets], dtype=float),
+        energy=np.array([p.energy for p in packets], dtype=float),
+        frequency=np.array([p.frequency for p in packets], dtype=float),
+        phase=np.array([p.phase for p in packets], dtype=float),
+        coherence=np.array([p.coherence for p in packets], dtype=float),
+        polarity=np.array([p.polarity for p in packets], dtype=np.int8),
+        event=np.zeros(len(packets), dtype=np.int64),
+    )
+    merged, stats = coalesce(pk, cfg)
+    out = [Packet(*row) for row in zip(merged.edge.tolist(), merged.prog.tolist(), merged.energy.tolist(),
+                                       merged.frequency.tolist(), merged.phase.tolist(),
+                                       merged.coherence.tolist(), merged.polarity.tolist())]
+    return out, {k: v[0].item() for k, v in stats.items()}
+
+
+ROULETTE_STATS = ("rouletted", "roulette_killed", "roulette_energy_in", "roulette_expected_removed",
+                  "roulette_removed", "roulette_energy_delta")
+
+
+def _roulette_stats(n_events: int) -> Dict[str, np.ndarray]:
+    return {k: np.zeros(n_events, dtype=np.int64 if k in ("rouletted", "roulette_killed") else float)
+            for k in ROULETTE_STATS}
+
+
+def roulette(pk: PacketColumns, cfg: "EmissionConfig", threshold: np.ndarray,
+             rngs: Sequence[np.random.Generator]) -> Tuple[PacketColumns, Dict[str, np.ndarray]]:
+    """Russian roulette: every packet with energy below its event's
+    `threshold` survives with probability p = `cfg.roulette_survival` and
+    then carries energy / p; the others are removed. Unbiased: the expected
+    live energy is unchanged. Each event draws from its own generator
+    `rngs[event]`, one uniform per candidate in packet order, so both
+    engines make the same choices and an event's draws do not depend on
+    the other events in the batch.
+
+    Per-event stats: candidates, packets removed, candidate energy, expected
+    energy removed ((1 - p) x candidate energy, which is also the expected
+    reweighting gain), actual energy removed, and the actual net change.
+    """
+    n_events = len(rngs)
+    stats = _roulette_stats(n_events)
+    low = np.flatnonzero(pk.energy < threshold[pk.event])
+    if not len(low):
+        return pk, stats
+    p = cfg.roulette_survival
+    ev = pk.event
+    # per-event uniform streams, scattered back to the (interleaved) candidates
+    n_low = np.bincount(ev[low], minlength=n_events)
+    u = np.empty(len(low))
+    u[np.argsort(ev[low], kind="stable")] = np.concatenate([rngs[e].random(n) for e, n in enumerate(n_low.tolist())])
+    survive = u < p
+    kept, killed = low[survive], low[~survive]
+    stats["rouletted"] = np.bincount(ev[low], minlength=n_events)
+    stats["roulette_killed"] = np.bincount(ev[killed], minlength=n_events)
+    stats["roulette_energy_in"] = np.bincount(ev[low], weights=pk.energy[low], minlength=n_events)
+    stats["roulette_expected_removed"] = (1.0 - p) * stats["roulette_energy_in"]
+    stats["roulette_removed"] = np.bincount(ev[killed], weights=pk.energy[killed], minlength=n_events)
+    energy = pk.energy.copy()
+    energy[kept] = energy[kept] / p
+    stats["roulette_energy_delta"] = (np.bincount(ev[kept], weights=energy[kept] - pk.energy[kept], minlength=n_events)
+                                      - stats["roulette_removed"])
+    pk.energy = energy
+    keep = np.ones(len(pk), dtype=bool)
+    keep[killed] = False
+    return pk.take(np.flatnonzero(keep)), stats
+
+
+def roulette_packets(packets: List[Packet], cfg: "EmissionConfig", threshold: float,
+                     rng: np.random.Generator) -> Tuple[List[Packet], Dict[str, Any]]:
+    """`roulette` for the packet engine's `Packet` list (single event)."""
+    stats: Dict[str, Any] = {k: v[0].item() for k, v in _roulette_stats(1).items()}
+    low = [pk for pk in packets if pk.energy < threshold]
+    if not low:
+        return packets, stats
+    p = cfg.roulette_survival
+    killed = set()
+    for pk, u in zip(low, rng.random(len(low)).tolist()):
+        stats["roulette_energy_in"] += pk.energy
+        if u < p:
+            E = pk.energy / p
+            stats["roulette_energy_delta"] += E - pk.energy
+            pk.energy = E
+        else:
+            stats["roulette_removed"] += pk.energy
+            killed.add(id(pk))
+    stats["rouletted"] = len(low)
+    stats["roulette_killed"] = len(killed)
+    stats["roulette_expected_removed"] = (1.0 - p) * stats["roulette_energy_in"]
+    stats["roulette_energy_delta"] -= stats["roulette_removed"]
+    return [pk for pk in packets if id(pk) not in killed], stats
+
+
+def iter_emission_vector(kernel: "PTKKernel", positive: List["Sound"], negative: List["Sound"], run: "_RunContext") -> Generator[EmissionStep, None, float]:
+    steps = _steps(kernel, [(positive, negative)], [run])
+    while True:
+        try:
+            snaps = next(steps)
+        except StopIteration as stop:
+            return float(stop.value[0])
+        yield snaps[0][1]
+
+
+def simulate_emission_vector_batch(kernel: "PTKKernel", events: Sequence[Tuple[List["Sound"], List["Sound"]]], run: "_RunContext") -> List[EmissionResult]:
+    if not events:
+        return []
+    cols = [_Collector(kernel.graph, pos, neg) for pos, neg in events]
+    steps = _steps(kernel, events, [run.for_event(i) for i in range(len(events))])
+    while True:
+        try:
+            for ev, snap in next(steps):
+                cols[ev].add(snap)
+        except StopIteration as stop:
+            return [c.result(float(r)) for c, r in zip(cols, stop.value)]
+
+
+def _steps(kernel: "PTKKernel", events: Sequence[Tuple[List["Sound"], List["Sound"]]], runs: Sequence["_RunContext"]) -> Generator[List[Tuple[int, EmissionStep]], None, np.ndarray]:
+    """Advance independent events together; packets carry an event index.
+
+    Yields, per step, an `EmissionStep` for every event still running and
+    returns the per-event energy left in live packets. `runs` holds one
+    context per event (output ids, roulette generator); all share one
+    config. Each event stops on
+    its own `max_steps` / `max_outputs` / no-packets condition exactly as a
+    single `simulate_emission` call would.
+
+    With `cfg.profile`, phase timings are for the whole batch step and are
+    repeated in every event's record; counters are per event.
+    """
+    G = kernel.graph
+    cfg = runs[0].cfg
+    gain = G.gains(cfg)
+    n_ev = len(events)
+    pk = _seed(G, [pos + neg for pos, neg in events])
+    outs = [_Outputs(kernel, cfg, r.event) for r in runs]
+    rngs = [r.rng for r in runs]
+    n_out = np.zeros(n_ev, dtype=np.int64)
+    done = np.zeros(n_ev, dtype=bool)
+    remaining = np.zeros(n_ev, dtype=float)
+    # running per-event live energy, updated from the per-stage deltas below
+    live = np.bincount(pk.event, weights=pk.energy, minlength=n_ev)
+    ledger_err = np.zeros(n_ev, dtype=float)
+    roulette_below = cfg.roulette_frac * live
+    prof = _Profiler() if cfg.profile else None
+    counts: Optional[Dict[str, np.ndarray]] = {} if prof else None
+
+    step = 0
+    while True:
+        live_n = np.bincount(pk.event, minlength=n_ev)
+        finish = ~done & ((step >= cfg.max_steps) | (live_n == 0) | (n_out >= cfg.max_outputs))
+        if finish.any():
+            remaining[finish] = np.bincount(pk.event, weights=pk.energy, minlength=n_ev)[finish]
+            done |= finish
+            pk = pk.take(np.flatnonzero(~finish[pk.event]))
+        if done.all():
+            break
+        step += 1
+        active = np.flatnonzero(~done)
+        energy_before = live.copy()
+
+        # advance + gain
+        pk.prog = pk.prog + cfg.step_len
+        e0 = pk.energy
+        pk.energy = e0 * gain[pk.edge]
+        gained = np.bincount(pk.event, weights=pk.energy - e0, minlength=n_ev)
+
+        pk, grp, starts = _bucket(pk, G.n_edges)
+        n_groups = starts.shape[0]
+        g_event = pk.event[starts]
+        if prof:
+            prof.enter("cancel")
+        mixed, field_g, cancel_g = _cancel(pk, grp, n_groups, cfg, counts)
+
+        # field emission: the reference engine checks the running total of
+        # field energy over the event's edges visited so far in this step
+        field_cum = np.zeros(n_groups, dtype=float)
+        running = np.zeros(n_ev, dtype=float)
+        for g in np.flatnonzero(mixed):
+            running[g_event[g]] += field_g[g]
+            field_cum[g] = running[g_event[g]]
+        emit_field = mixed & (field_cum >= cfg.field_E_thresh)
+        coh_mean = np.bincount(grp, weights=pk.coherence, minlength=n_groups) / np.bincount(grp, minlength=n_groups)
+
+        # propagate / localize
+        if prof:
+            prof.enter("propagate")
+        alive = pk.energy > 1e-12
+        dropped = np.bincount(pk.event[~alive], weights=pk.energy[~alive], minlength=n_ev)
+        moving = alive & (pk.prog < 1.0)
+        arrived = np.flatnonzero(alive & (pk.prog >= 1.0))
+        deg = G.out_degree(row_of(G.edge_target[pk.edge[arrived]], pk.polarity[arrived]))
+        terminal = arrived[deg == 0]
+        localized = np.bincount(pk.event[terminal], weights=pk.energy[terminal], minlength=n_ev)
+        emit_particle = terminal[(pk.energy[terminal] >= cfg.particle_E_thresh) & (pk.coherence[terminal] >= cfg.coherence_thresh)]
+
+        # outputs in reference order: per edge group, field first, then particles
+        if prof:
+            prof.enter("emit")
+        keys = np.concatenate([2 * np.flatnonzero(emit_field), 2 * grp[emit_particle] + 1])
+        refs = np.concatenate([np.flatnonzero(emit_field), emit_particle])
+        tie = np.concatenate([np.zeros(int(emit_field.sum()), dtype=np.int64), emit_particle])
+        for o in np.lexsort((tie, keys)):
+            r = int(refs[o])
+            if keys[o] % 2 == 0:
+                outs[g_event[r]].field([int(pk.edge[starts[r]])], float(field_cum[r]), float(coh_mean[r]))
+            else:
+                outs[pk.event[r]].particle(int(G.edge_target[pk.edge[r]]), float(pk.energy[r]), float(pk.coherence[r]))
+        n_out += np.bincount(g_event[emit_field], minlength=n_ev) + np.bincount(pk.event[emit_particle], minlength=n_ev)
+
+        # next packet list: survivors stay in place, split children replace their parent
+        if prof:
+            prof.enter("propagate")
+        split = arrived[deg > 0]
+        split_deg = deg[deg > 0]
+        pk_event_split = pk.event[split]
+        split_in = np.bincount(pk.event[split], weights=pk.energy[split], minlength=n_ev)
+        split_out = np.bincount(pk.event[split], weights=(pk.energy[split] * cfg.split_decay) / split_deg * split_deg, minlength=n_ev)
+        count = moving.astype(np.int64)
+        count[split] = split_deg
+        parent = np.repeat(np.arange(len(pk)), count)
+        nxt = pk.take(parent)
+        is_child = ~moving[parent]
+        if is_child.any():
+            child_parent = parent[is_child]
+            first = np.cumsum(count) - count
+            k = np.flatnonzero(is_child) - first[child_parent]
+            crow = row_of(G.edge_target[pk.edge[child_parent]], pk.polarity[child_parent])
+            nxt.edge[is_child] = G.out_edges[G.out_ptr[crow] + k]
+            nxt.prog[is_child] = 0.0
+            nxt.energy[is_child] = (pk.energy[child_parent] * cfg.split_decay) / G.out_degree(crow)
+        pk = nxt
+        if prof:
+            prof.enter("coalesce")
+        if cfg.coalesce:
+            pk, co = coalesce(pk, cfg, n_ev)
+        if prof:
+            prof.enter("prune")
+        if cfg.roulette:
+            pk, rr = roulette(pk, cfg, roulette_below, rngs)
+        if prof:
+            prof.enter("ledger")
+
+        field_e = np.bincount(g_event, weights=field_g, minlength=n_ev)
+        cancelled_e = np.bincount(g_event, weights=cancel_g, minlength=n_ev)
+        net = gained - cancelled_e - dropped - localized - split_in + split_out
+        if cfg.coalesce:
+            net += co["coalesce_energy_delta"]
+        pruned: np.ndarray = rr["roulette_energy_delta"] if cfg.roulette else np.zeros(n_ev, dtype=float)
+        net = net + pruned
+        live = np.maximum(0.0, energy_before + net)
+        ledger_err += _EPS * (energy_before + np.abs(gained) + cancelled_e + dropped + localized + split_in + split_out)
+        if cfg.roulette:
+            ledger_err += _EPS * rr["roulette_energy_in"] / cfg.roulette_survival
+        resync = ledger_err > LEDGER_RESYNC_REL * live
+        check = bool(cfg.ledger_check_every) and step % cfg.ledger_check_every == 0
+        full = np.bincount(pk.event, weights=pk.energy, minlength=n_ev) if check or resync.any() else live
+        live = np.where(resync, full, live)
+        ledger_err[resync] = 0.0
+        n_live = np.bincount(pk.event, minlength=n_ev)
+        if prof and counts is not None:
+            times = prof.record()["time_s"]
+            ev_counts = {
+                "live_packets": live_n,
+                "edges_touched": np.bincount(g_event, minlength=n_ev),
+                "cancel_comparisons": np.bincount(g_event, weights=counts["cancel_comparisons"], minlength=n_ev),
+                "cancellations": np.bincount(g_event, weights=counts["cancellations"], minlength=n_ev),
+                "splits": np.bincount(pk_event_split, minlength=n_ev),
+            }
+        snaps: List[Tuple[int, EmissionStep]] = []
+        for ev in active:
+            step_rec = _step_record(step, float(energy_before[ev]), float(net[ev]), float(localized[ev]),
+                                    float(field_e[ev]), float(cancelled_e[ev]), cfg, float(pruned[ev]))
+            if cfg.coalesce:
+                step_rec.update({k: v[ev].item() for k, v in co.items()})
+            if cfg.roulette:
+                step_rec.update({k: v[ev].item() for k, v in rr.items()})
+            if check:
+                _check_ledger(step_rec, float(live[ev]), float(full[ev]), cfg)
+            prof_rec: Optional[Dict[str, Any]] = None
+            if prof:
+                prof_rec = {"time_s": dict(times), **{c: int(v[ev]) for c, v in ev_counts.items()}}
+            snaps.append((int(ev), outs[ev].snapshot(step, step_rec, int(n_live[ev]), float(live[ev]), prof_rec)))
+        yield snaps
+        if prof:
+            prof.restart()
+
+    return remaining
@@ -11,3 +11,25 @@ def test_adc_thresholding():
     adc = kernel_to_adc_counts([(node, 10.0)], geom=g)
     assert adc.sum() >= img.sum()  # pedestal + gain should lift counts
     assert (adc > 0).sum() >= 1    # thresholding yields at least one non-zero channel
+
+def test_digitizer_in_place_seeded_per_channel():
+    from pt_sim.core.rng import make_rng
+    from pt_sim.detector.digitize import Digitizer, adc_response
+    img = np.zeros((4, 6))
+    img[1, 2], img[3, 5] = 30.0, 8.0
+    ped = np.full((4, 6), 200.0)
+    ped[0] = 250.0                 # per-channel pedestal
+    thr = np.full((4, 6), 205.0)
+    thr[1, 2] = 1e9                # per-channel threshold kills the hot cell
+    d = Digitizer(pedestal=ped, gain=1.5, noise_sigma=np.full(6, 2.0), threshold=thr)
+    buf = img.copy()
+    out = d.digitize(buf, out=buf, rng=make_rng(4))
+    assert out is buf
+    noisy = ped + 1.5 * img + make_rng(4).normal(0.0, 2.0, size=img.shape)
+    assert np.array_equal(out, np.where(noisy >= thr, noisy, 0.0))
+    assert out[1, 2] == 0.0 and (out[0] > 0).all()
+    # own stream: reproducible from the seed, advancing between calls
+    a, b = Digitizer(rng=make_rng(1)), Digitizer(rng=make_rng(1))
+    assert np.array_equal(a.digitize(img), b.digitize(img))
+    assert not np.array_equal(a.digitize(img), b.digitize(img, rng=make_rng(2)))
+    assert np.array_equal(adc_response(img, rng=make_rng(3)), Digitizer(rng=make_rng(3)).digitize(img))
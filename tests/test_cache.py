@@ -0,0 +1,81 @@
+import json, math, os, stat
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_cache import EmissionCache
+from pt_sim import ptk_graph
+from pt_sim.ptk_graph import compiled_path_for, load_or_compile
+
+def _event(k):
+    return ([Sound(f"n{1 + (7 * k + i) % 57}", +1, 2.0 + k % 5, 440.0, 0.0, 0.9) for i in range(5)],
+            [Sound(f"n{1 + (3 * k + i) % 57}", -1, 3.0, 440.0, math.pi, 0.8) for i in range(4)])
+
+def test_cache_hit_returns_same_result(tmp_path):
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    cache = EmissionCache(str(tmp_path))
+    pos, neg = _event(1)
+    cfg = EmissionConfig(max_steps=25)
+    first = cache.simulate(K, pos, neg, cfg)
+    again = EmissionCache(str(tmp_path)).simulate(K, pos, neg, cfg)
+    assert cache.stats["misses"] == 1 and cache.stats["stores"] == 1
+    assert again.to_dict() == first.to_dict() == K.simulate_emission(pos, neg, cfg).to_dict()
+    cache.simulate(K, pos, neg, EmissionConfig(max_steps=26))
+    cache.simulate(K, pos, neg, EmissionConfig(rng_seed=None))
+    assert cache.stats == {"hits": 0, "misses": 2, "bypassed": 1, "stores": 2, "evictions": 0}
+    cache.simulate(K, pos, neg, cfg)
+    assert cache.stats["hits"] == 1
+
+def test_lru_eviction_under_size_cap(tmp_path):
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    ev = _event(0)
+    cfgs = [EmissionConfig(max_steps=30 + k) for k in range(5)]   # same outputs, distinct keys
+    probe = EmissionCache(str(tmp_path / "probe"))
+    probe.simulate(K, *ev, cfgs[0])
+    entry = probe._scan()[1]
+    cache = EmissionCache(str(tmp_path / "c"), max_bytes=int(entry * 3.5))
+    for k in range(3):
+        cache.simulate(K, *ev, cfgs[k])
+        os.utime(cache.path(cache.key(K, *ev, cfgs[k])), (k, k))
+    cache.simulate(K, *ev, cfgs[0])           # hit: entry 0 becomes most recent
+    for k in (3, 4):
+        cache.simulate(K, *ev, cfgs[k])
+    assert cache.stats["evictions"] == 2 and cache._scan()[1] <= cache.max_bytes
+    kept = [os.path.exists(cache.path(cache.key(K, *ev, c))) for c in cfgs]
+    assert kept == [True, False, False, True, True]
+
+def test_concurrent_writers_share_entries(tmp_path):
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    cfg = EmissionConfig(max_steps=20)
+    want = [K.simulate_emission(*_event(k % 4), cfg).to_dict() for k in range(16)]
+    caches = [EmissionCache(str(tmp_path)) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        got = list(pool.map(lambda k: caches[k % 4].simulate(K, *_event(k % 4), cfg).to_dict(), range(16)))
+    assert got == want
+    assert not [f for _, _, fs in os.walk(tmp_path) for f in fs if f.endswith(".tmp")]
+
+def test_entry_evicted_after_load_is_still_a_hit(tmp_path, monkeypatch):
+    from pt_sim import ptk_cache
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    cache = EmissionCache(str(tmp_path))
+    first = cache.simulate(K, *_event(2), EmissionConfig(max_steps=12))
+
+    def evicted(path):
+        raise FileNotFoundError(path)
+    monkeypatch.setattr(ptk_cache.os, "utime", evicted)
+    again = cache.simulate(K, *_event(2), EmissionConfig(max_steps=12))
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+    assert again.to_dict() == first.to_dict()
+
+@pytest.mark.skipif(os.name != "posix", reason="POSIX permission bits")
+def test_written_files_follow_umask(tmp_path, monkeypatch):
+    src = tmp_path / "ptk.json"
+    src.write_text(open("ptk.v1.json").read())
+    monkeypatch.setattr(ptk_graph, "_UMASK", 0o027)  # read once, at import
+    monkeypatch.setattr(os, "umask", None)            # never changed per write
+    load_or_compile(str(src))
+    cache = EmissionCache(str(tmp_path / "cache"))
+    cache.simulate(PTKKernel(json.load(open("ptk.v1.json"))), *_event(0), EmissionConfig(max_steps=10))
+    entries = [os.path.join(d, f) for d, _, fs in os.walk(tmp_path / "cache") for f in fs]
+    assert entries
+    for path in [compiled_path_for(str(src))] + entries:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o640
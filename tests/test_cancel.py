@@ -0,0 +1,78 @@
+import json, math
+import numpy as np
+import pytest
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_cancel import binned_pairs, eligible, two_pointer_pairs
+from pt_sim.ptk_vector import PacketColumns, _cancel
+
+def _sorted_lists(rng, n, freqs):
+    f = np.sort(rng.choice(freqs, n)).tolist()
+    return f, rng.uniform(-4.0, 10.0, n).tolist()
+
+@pytest.mark.parametrize("bw,tol", [(0.05, 0.6), (0.0, 0.6), (0.3, 0.05), (0.05, 2.5), (2.5, 4.0)])
+def test_binned_pairs_match_all_eligible_pairs(bw, tol):
+    rng = np.random.default_rng(11)
+    cfg = EmissionConfig(cancel_bandwidth=bw, cancel_phase_tol=tol)
+    freqs = [1e-7, 1e-6, 100.0, 430.0, 440.0, 441.0, 445.0, 460.0, 900.0]
+    fp, pp = _sorted_lists(rng, 60, freqs)
+    fn, pn = _sorted_lists(rng, 50, freqs)
+    want = [(i, j) for i in range(60) for j in range(50) if eligible(fp[i], pp[i], fn[j], pn[j], cfg)]
+    pairs, compared = binned_pairs(fp, pp, fn, pn, cfg)
+    assert pairs == want
+    assert len(want) <= compared <= 60 * 50
+
+def test_binned_pairs_prune_candidates():
+    cfg = EmissionConfig()
+    f = [100.0 * 1.1 ** k for k in range(200)]
+    pairs, compared = binned_pairs(f, [0.0] * 200, f, [math.pi] * 200, cfg)
+    assert pairs == [(i, i) for i in range(200)]
+    assert compared < 5 * 200
+
+def test_two_pointer_mode_is_a_subset():
+    rng = np.random.default_rng(3)
+    cfg = EmissionConfig(cancel_mode="two_pointer")
+    fp, pp = _sorted_lists(rng, 30, [440.0, 441.0, 445.0])
+    fn, pn = _sorted_lists(rng, 30, [440.0, 441.0, 445.0])
+    walk, compared = two_pointer_pairs(fp, pp, fn, pn, cfg)
+    assert compared <= 60
+    assert set(walk) <= set(binned_pairs(fp, pp, fn, pn, cfg)[0])
+
+def test_vector_binned_cancellation_matches_pair_order():
+    rng = np.random.default_rng(7)
+    cfg = EmissionConfig()
+    n = 40
+    pk = PacketColumns(
+        edge=np.zeros(n, dtype=np.int64), prog=np.zeros(n),
+        energy=rng.uniform(0.5, 3.0, n), frequency=rng.choice([430.0, 440.0, 445.0, 460.0], n),
+        phase=rng.choice([0.0, math.pi, 3.0], n), coherence=rng.uniform(0.4, 1.0, n),
+        polarity=rng.choice([1, -1], n).astype(np.int8), event=np.zeros(n, dtype=np.int64),
+    )
+    grp = np.repeat([0, 1], n // 2)
+    energy = pk.energy.tolist()
+    want = []
+    for g in (0, 1):
+        P = sorted((k for k in range(n) if grp[k] == g and pk.polarity[k] == 1), key=lambda k: pk.frequency[k])
+        N = sorted((k for k in range(n) if grp[k] == g and pk.polarity[k] == -1), key=lambda k: pk.frequency[k])
+        field = 0.0
+        for p in P:
+            for q in N:
+                if eligible(pk.frequency[p], pk.phase[p], pk.frequency[q], pk.phase[q], cfg):
+                    dE = cfg.cancel_efficiency * min(pk.coherence[p], pk.coherence[q]) * min(energy[p], energy[q])
+                    energy[p] -= dE; energy[q] -= dE; field += 0.5 * dE
+        want.append(field)
+    counts = {}
+    mixed, field_g, _ = _cancel(pk, grp, 2, cfg, counts)
+    assert mixed.all()
+    assert np.allclose(field_g, want)
+    assert pk.energy.tolist() == energy
+    assert counts["cancellations"].sum() > 0
+
+def test_modes_agree_without_cancellation_and_reject_unknown():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 2.0, 440.0, 0.0, 0.9) for i in range(1, 58, 5)]
+    neg = [Sound(f"n{i}", -1, 2.0, 440.0, math.pi, 0.9) for i in range(1, 58, 5)]
+    a = K.simulate_emission(pos, neg, EmissionConfig(max_steps=20))
+    b = K.simulate_emission(pos, neg, EmissionConfig(max_steps=20, cancel_mode="two_pointer"))
+    assert a["particles"] == b["particles"] and a["ledger"] == b["ledger"]
+    with pytest.raises(ValueError):
+        K.simulate_emission(pos, neg, EmissionConfig(cancel_mode="nearest"))
@@ -0,0 +1,51 @@
+import json, math
+import numpy as np
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_vector import PacketColumns, coalesce
+
+def test_coalesce_merges_within_tolerance_only():
+    cfg = EmissionConfig(coalesce_freq_tol=1e-3, coalesce_phase_tol=1e-2)
+    pk = PacketColumns(
+        edge=np.array([3, 3, 3, 3, 5]), prog=np.zeros(5),
+        energy=np.array([1.0, 3.0, 2.0, 1.0, 1.0]),
+        frequency=np.array([440.0, 440.0, 440.0, 500.0, 440.0]),
+        phase=np.array([0.1, 0.1, 0.1, 0.1, 0.1]),
+        coherence=np.array([0.5, 0.9, 0.5, 0.7, 0.8]),
+        polarity=np.array([1, 1, -1, 1, 1], dtype=np.int8),
+        event=np.zeros(5, dtype=np.int64),
+    )
+    merged, stats = coalesce(pk, cfg)
+    assert len(merged) == 4 and stats["coalesced"][0] == 1
+    assert merged.energy[0] == 4.0 and math.isclose(merged.coherence[0], (0.5 + 2.7) / 4.0)
+    assert math.isclose(merged.energy.sum(), pk.energy.sum())
+    assert abs(stats["coalesce_energy_delta"][0]) < 1e-12
+    assert list(merged.edge) == [3, 3, 3, 5]
+
+def test_coalesced_runs_agree_across_engines():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 5.0, 440.0, 0.0, 0.9) for i in range(1, 58)] * 3
+    neg = [Sound(f"n{i}", -1, 5.0, 440.0, math.pi, 0.9) for i in range(1, 58)] * 3
+    a = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, max_outputs=10**6, coalesce=True))
+    b = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, max_outputs=10**6, coalesce=True, engine="vector"))
+    plain = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, max_outputs=10**6))
+    assert sum(s["coalesced"] for s in a["ledger"]["steps"]) > 0
+    assert [s["coalesced"] for s in a["ledger"]["steps"]] == [s["coalesced"] for s in b["ledger"]["steps"]]
+    for r in (a, b):
+        assert math.isclose(r["ledger"]["final"]["remaining_packets_energy"],
+                            plain["ledger"]["final"]["remaining_packets_energy"], rel_tol=1e-9)
+
+def test_coalesce_phase_wraps_at_two_pi():
+    from pt_sim.ptk_kernel import Packet
+    from pt_sim.ptk_vector import coalesce_packets
+    cfg = EmissionConfig(coalesce_freq_tol=1e-3, coalesce_phase_tol=1e-2)
+    # 0.001 and 2 pi + 0.002 share a phase bin; a raw mean would give ~pi
+    pk = PacketColumns(
+        edge=np.array([3, 3]), prog=np.zeros(2), energy=np.array([1.0, 2.0]),
+        frequency=np.full(2, 440.0), phase=np.array([0.001, 2 * math.pi + 0.002]), coherence=np.full(2, 0.9),
+        polarity=np.ones(2, dtype=np.int8), event=np.zeros(2, dtype=np.int64),
+    )
+    merged, _ = coalesce(pk, cfg)
+    assert len(merged) == 1 and math.isclose(merged.phase[0], (0.001 + 2 * 0.002) / 3, abs_tol=1e-9)
+    packets = [Packet(3, 0.0, 1.0, 440.0, 0.001, 0.9, 1), Packet(3, 0.0, 2.0, 440.0, 2 * math.pi + 0.002, 0.9, 1)]
+    out, stats = coalesce_packets(packets, cfg)
+    assert stats["coalesced"] == 1 and math.isclose(out[0].phase, (0.001 + 2 * 0.002) / 3, abs_tol=1e-9)
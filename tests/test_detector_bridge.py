@@ -6,3 +6,48 @@ def test_bridge_image_nonzero(tmp_path):
     img = kernel_to_ecal_image(dummy, n=32, E_scale=1.0)
     assert img.shape == (32,32)
     assert float(img.sum()) > 0.0
+
+def _loop_image(edges, cells, ribbon_width, atten):
+    # reference: patch-by-patch accumulation
+    img = np.zeros((cells, cells))
+    for node_id, e in edges:
+        x = node_id % cells
+        y = (node_id // cells) % cells
+        x0, x1 = max(0, x - ribbon_width), min(cells, x + ribbon_width + 1)
+        y0, y1 = max(0, y - ribbon_width), min(cells, y + ribbon_width + 1)
+        ky = np.abs(np.arange(y0, y1) - y)[:, None]
+        kx = np.abs(np.arange(x0, x1) - x)[None, :]
+        img[y0:y1, x0:x1] += e * np.power(atten, ky + kx)
+    return img
+
+def test_vectorized_image_is_bit_identical_to_patch_loop():
+    rng = np.random.default_rng(5)
+    nodes = rng.integers(-50, 40 * 40 + 50, 3000).tolist()
+    edges = list(zip(nodes, rng.lognormal(0.0, 2.0, 3000).tolist()))
+    for w, atten in ((0, 0.7), (1, 0.7), (3, 0.55), (2, 1.0)):
+        assert np.array_equal(kernel_to_ecal_image(edges, n=40, ribbon_width=w, atten=atten),
+                              _loop_image(edges, 40, w, atten))
+
+def test_batch_images_match_single_calls():
+    from pt_sim.detector.bridge import kernel_to_ecal_image_batch
+    rng = np.random.default_rng(2)
+    events = [list(zip(rng.integers(0, 32 * 32, k).tolist(), rng.random(k).tolist())) for k in (0, 5, 300)]
+    events.append({"particles": [{"Q": {"line": 5, "pos": 2}, "energy": 3.0}], "fields": []})
+    imgs = kernel_to_ecal_image_batch(events, n=32, ribbon_width=2, atten=0.7)
+    assert imgs.shape == (4, 32, 32)
+    for k, ev in enumerate(events):
+        assert np.array_equal(imgs[k], kernel_to_ecal_image(ev, n=32, ribbon_width=2, atten=0.7))
+    many = events * 20  # spans several scatter chunks
+    f32 = kernel_to_ecal_image_batch(many, n=32, ribbon_width=2, atten=0.7, dtype=np.float32)
+    assert f32.dtype == np.float32 and np.array_equal(f32, np.tile(imgs, (20, 1, 1)).astype(np.float32))
+
+def test_batch_adc_noise_is_seeded_per_event():
+    from pt_sim.core.rng import derive_seed, make_rng
+    from pt_sim.detector.bridge import kernel_to_adc_counts_batch
+    events = [[(100, 10.0)], [(300, 4.0), (301, 7.0)], [(5, 20.0)]]
+    adc = kernel_to_adc_counts_batch(events, n=32, seed=9)
+    assert np.array_equal(adc[1:], kernel_to_adc_counts_batch(events[1:], n=32, seed=9, first_event=1))
+    assert not np.array_equal(adc, kernel_to_adc_counts_batch(events, n=32, seed=10))
+    img = kernel_to_ecal_image(events[2], n=32)
+    noisy = 200.0 + 1.0 * img + make_rng(derive_seed(9, 2)).normal(0.0, 2.0, size=img.shape)
+    assert np.array_equal(adc[2], np.where(noisy >= 205.0, noisy, 0.0))
@@ -0,0 +1,42 @@
+import json, math
+import numpy as np
+from pt_sim.detector.geometry import Geometry
+from pt_sim.detector.bridge import kernel_to_adc_sparse
+from pt_sim.detector.readout import iter_chunks, read_readout
+from pt_sim.detector.run_from_kernel import BridgeSettings, iter_results, run_pipeline
+from pt_sim.ptk_kernel import EmissionConfig, PTKKernel, Sound
+
+def _results(n):
+    rng = np.random.default_rng(0)
+    return [{"particles": [{"Q": {"line": int(q), "pos": int(p)}, "energy": float(e)}
+                           for q, p, e in zip(rng.integers(1, 40, 6), rng.integers(1, 40, 6), rng.uniform(5, 40, 6))],
+             "fields": []} for _ in range(n)]
+
+def test_pipeline_is_independent_of_workers_and_chunks(tmp_path):
+    geom = Geometry.from_yaml("detector/geometry.yaml")
+    results = _results(23)
+    src = tmp_path / "results.jsonl"
+    src.write_text("".join(json.dumps(r) + "\n" for r in results))
+    settings = BridgeSettings(seed=7)
+    serial = run_pipeline(iter_results(str(src)), geom, str(tmp_path / "a.sparse"), settings, chunk=8)
+    pooled = run_pipeline(iter_results(str(src)), geom, str(tmp_path / "b.sparse"), settings, workers=2, chunk=3, queue=2)
+    assert serial["events"] == pooled["events"] == 23 and serial["events_per_s"] > 0
+    assert [len(c) for c in iter_chunks(str(tmp_path / "a.sparse"))] == [8, 8, 7]
+    a, b = read_readout(str(tmp_path / "a.sparse")), read_readout(str(tmp_path / "b.sparse"))
+    want = kernel_to_adc_sparse(results, geom, atten=0.7, seed=7)
+    for r in (a, b):
+        assert np.array_equal(r.offsets, want.offsets) and np.array_equal(r.channel, want.channel)
+        assert np.array_equal(r.adc, want.adc)
+
+def test_pipeline_reads_result_store(tmp_path):
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    store = tmp_path / "store"
+    store.mkdir()
+    for k in range(3):
+        pos = [Sound(f"n{i}", +1, 4.0 + k, 440.0, 0.0, 0.9) for i in range(1, 58, 7)]
+        neg = [Sound(f"n{i}", -1, 3.0, 440.0, math.pi, 0.9) for i in range(2, 58, 9)]
+        K.simulate_emission(pos, neg, EmissionConfig(max_steps=20)).save(str(store / f"ev{k:03d}.npz"))
+    geom = Geometry.from_yaml("detector/geometry.yaml")
+    stats = run_pipeline(iter_results(str(store)), geom, str(tmp_path / "adc.sparse"))
+    assert stats["events"] == 3 and stats["peak_rss_bytes"]["self"] > 0
+    assert len(read_readout(str(tmp_path / "adc.sparse"))) == 3
@@ -0,0 +1,44 @@
+import json, math
+import numpy as np
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_result import EmissionResult, OutputColumns
+from pt_sim.detector.bridge import kernel_to_ecal_image
+
+def _run():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 4.0, 440.0, 0.0, 0.9) for i in range(1, 58, 2)]
+    neg = [Sound(f"n{i}", -1, 4.0, 440.0, math.pi, 0.6) for i in range(2, 58, 2)]
+    return K, K.simulate_emission(pos, neg, EmissionConfig(max_steps=30))
+
+def test_result_is_a_lazy_mapping():
+    K, res = _run()
+    assert isinstance(res, EmissionResult)
+    assert list(res) == ["particles", "fields", "detections", "steps", "ledger"]
+    assert not res._views
+    d = res.to_dict()
+    assert json.loads(json.dumps(d)) == d
+    p = res.particle
+    assert len(d["particles"]) == len(p.id) > 0
+    assert [x["locus"] for x in d["particles"]] == [K.graph.node_ids[n] for n in p.locus]
+    assert np.allclose([x["Q"]["line"] for x in d["particles"]], p.q_line)
+    assert np.array_equal([x["mass2"] for x in d["particles"]], p.mass2)
+    assert math.isclose(res["ledger"]["final"]["particles_energy"], float(p.energy.sum()))
+    assert [x["ref_id"] for x in d["detections"]] == [x["id"] for x in d["particles"]]
+
+def test_field_columns_and_dict_views():
+    K, _ = _run()
+    cols = OutputColumns()
+    cols.add_particle("p0", "d0", 3, 2.5, 0.9)
+    cols.add_field("f0", "d1", list(range(40)), 1.5, 0.6)
+    res = EmissionResult.from_outputs(K.graph, cols, 1, {"steps": [], "final": {}})
+    f = res["fields"][0]
+    assert f["support_edges"] == K.graph.edge_ids[:32]
+    assert f["mode"] == "scalar" and math.isclose(f["strength"], 1.5 * 0.8)
+    assert [d["kind"] for d in res["detections"]] == ["particle", "field"]
+    assert np.allclose(res.detection.confidence, [min(1.0, 0.6 + 0.4 * 0.9), 0.8])
+
+def test_bridge_reads_columns_like_dicts():
+    _, res = _run()
+    a = kernel_to_ecal_image(res, n=32, e_scale=0.5)
+    b = kernel_to_ecal_image(res.to_dict(), n=32, e_scale=0.5)
+    assert np.array_equal(a, b) and a.sum() > 0
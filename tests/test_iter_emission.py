@@ -0,0 +1,40 @@
+import json, math
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+
+def _sounds():
+    pos = [Sound(f"n{i}", +1, 4.0, 440.0, 0.0, 0.9) for i in range(1, 58, 2)]
+    neg = [Sound(f"n{i}", -1, 4.0, 440.0, math.pi, 0.9) for i in range(2, 58, 2)]
+    return pos, neg
+
+def test_iter_emission_replays_simulate_emission():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos, neg = _sounds()
+    for engine in ("packet", "vector"):
+        cfg = EmissionConfig(max_steps=25, engine=engine)
+        res = K.simulate_emission(pos, neg, cfg)
+        snaps = list(K.iter_emission(pos, neg, cfg))
+        assert len(snaps) == res["steps"]
+        assert [s.record for s in snaps] == res["ledger"]["steps"]
+        assert [p.locus for s in snaps for p in s.particles] == [p["locus"] for p in res["particles"]]
+        assert math.isclose(snaps[-1].live_energy, res["ledger"]["final"]["remaining_packets_energy"], rel_tol=1e-12)
+
+def test_iter_emission_early_stop():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos, neg = _sounds()
+    seen = 0
+    for snap in K.iter_emission(pos, neg, EmissionConfig(max_steps=200, max_outputs=10**6)):
+        seen += 1
+        assert snap.live_packets > 0
+        if snap.step == 7:
+            break
+    assert seen == 7
+
+def test_incremental_ledger_matches_full_sums():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos, neg = _sounds()
+    for engine in ("packet", "vector", "event"):
+        for kw in ({"max_steps": 30}, {"max_steps": 60, "step_len": 0.3, "within_gain": 1e-4, "max_outputs": 10**6}):
+            res = K.simulate_emission(pos, neg, EmissionConfig(engine=engine, ledger_check_every=3, **kw))
+            checked = [r for r in res["ledger"]["steps"] if "ledger_check_rel" in r]
+            assert len(checked) == res["steps"] // 3
+            assert not any(r.get("ledger_mismatch") for r in checked)
@@ -0,0 +1,59 @@
+import dataclasses, json, math
+import numpy as np
+import pytest
+from pt_sim.ptk_graph import CompiledGraph
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_event import steps_per_edge
+
+def _sorted(res):
+    return sorted((p["locus"], p["energy"]) for p in res["particles"])
+
+def test_event_engine_matches_packet_engine():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 1.0 + i % 5, 440.0, 0.0, 0.3 + 0.01 * i) for i in range(1, 58, 3)]
+    neg = [Sound(f"n{i}", -1, 2.0 + i % 3, 440.0, math.pi, 0.9) for i in range(2, 58, 4)]
+    for kw in ({"max_steps": 40}, {"max_steps": 60, "step_len": 0.3, "max_outputs": 10**6},
+               {"max_steps": 200, "step_len": 0.1, "within_gain": 1e-4, "max_outputs": 10**6}):
+        a = K.simulate_emission(pos, neg, EmissionConfig(**kw))
+        b = K.simulate_emission(pos, neg, EmissionConfig(engine="event", **kw))
+        assert a["steps"] == b["steps"]
+        sa, sb = _sorted(a), _sorted(b)
+        assert [x[0] for x in sa] == [x[0] for x in sb]
+        assert all(math.isclose(x[1], y[1], rel_tol=1e-12) for x, y in zip(sa, sb))
+        for x, y in zip(a["ledger"]["steps"], b["ledger"]["steps"]):
+            assert math.isclose(x["drift_rel"], y["drift_rel"], rel_tol=1e-6, abs_tol=1e-9)
+        fa, fb = a["ledger"]["final"], b["ledger"]["final"]
+        assert math.isclose(fa["remaining_packets_energy"], fb["remaining_packets_energy"], rel_tol=1e-9, abs_tol=1e-12)
+
+def _shared_edge_kernel():
+    # both polarity rows of a node list all its out-edges, so opposite
+    # packets meet on edges, cancel and emit fields
+    G = CompiledGraph.from_ptk(json.load(open("ptk.v1.json")))
+    rows = np.concatenate([2 * G.edge_source, 2 * G.edge_source + 1])
+    out_ptr = np.zeros(2 * G.n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=2 * G.n_nodes), out=out_ptr[1:])
+    out_edges = np.tile(np.arange(G.n_edges), 2)[np.argsort(rows, kind="stable")]
+    K = PTKKernel.__new__(PTKKernel)
+    K._ptk, K.source = None, None
+    K.graph = dataclasses.replace(G, out_ptr=out_ptr, out_edges=out_edges, _gain_cache={})
+    return K
+
+def test_event_engine_matches_fields_in_order():
+    K = _shared_edge_kernel()
+    pos = [Sound(f"n{i}", +1, 2.0 + i % 3, 440.0, 0.0, 0.6 + 0.05 * (i % 7)) for i in (3, 11, 20, 31, 44)]
+    neg = [Sound(f"n{i}", -1, 1.5 + i % 4, 440.0, math.pi, 0.9) for i in (3, 12, 20, 33, 44)]
+    for kw in ({"max_steps": 8, "field_E_thresh": 1.0}, {"max_steps": 9, "step_len": 0.5, "field_E_thresh": 0.2}):
+        a = K.simulate_emission(pos, neg, EmissionConfig(max_outputs=10**6, **kw))
+        b = K.simulate_emission(pos, neg, EmissionConfig(max_outputs=10**6, engine="event", **kw))
+        assert len(a["fields"]) > 10
+        for out in ("fields", "particles"):
+            key = "support_edges" if out == "fields" else "locus"
+            assert [x[key] for x in a[out]] == [x[key] for x in b[out]]
+            assert np.allclose([x["energy"] for x in a[out]], [x["energy"] for x in b[out]], rtol=1e-9)
+
+def test_steps_per_edge():
+    assert steps_per_edge(1.0) == 1
+    assert steps_per_edge(0.5) == 2
+    assert steps_per_edge(0.1) == 11  # 10 x 0.1 sums to 0.9999999999999999
+    with pytest.raises(ValueError):
+        steps_per_edge(0.0)
@@ -0,0 +1,99 @@
+import json, math
+import numpy as np
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_parallel import run_serial
+from pt_sim.ptk_vector import PacketColumns, _cancel
+
+def _run(K, pos, neg, **kw):
+    a = K.simulate_emission(pos, neg, EmissionConfig(**kw))
+    b = K.simulate_emission(pos, neg, EmissionConfig(engine="vector", **kw))
+    return a, b
+
+def test_vector_engine_matches_packet_engine():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 1.0 + i % 5, 440.0, 0.0, 0.3 + 0.01 * i) for i in range(1, 58, 3)]
+    neg = [Sound(f"n{i}", -1, 2.0 + i % 3, 440.0, math.pi, 0.9) for i in range(2, 58, 4)]
+    for kw in ({"max_steps": 40}, {"max_steps": 25, "step_len": 0.5, "max_outputs": 10**6}):
+        a, b = _run(K, pos, neg, **kw)
+        assert a["steps"] == b["steps"]
+        assert [p["locus"] for p in a["particles"]] == [p["locus"] for p in b["particles"]]
+        assert np.allclose([p["energy"] for p in a["particles"]], [p["energy"] for p in b["particles"]])
+        assert [d["kind"] for d in a["detections"]] == [d["kind"] for d in b["detections"]]
+        assert a["ledger"]["steps"] == b["ledger"]["steps"]
+        fa, fb = a["ledger"]["final"], b["ledger"]["final"]
+        assert math.isclose(fa["remaining_packets_energy"], fb["remaining_packets_energy"], rel_tol=1e-9)
+
+def _two_pointer(P, N, cfg):
+    # reference sweep on (freq, phase, energy, coherence) lists
+    P = sorted(P, key=lambda x: x[0]); N = sorted(N, key=lambda x: x[0])
+    i = j = 0; field = 0.0
+    while i < len(P) and j < len(N):
+        p, n = P[i], N[j]
+        df = abs(p[0] - n[0]) / max(1e-6, (p[0] + n[0]) / 2.0)
+        dphi = abs(((p[1] - n[1] + math.pi) % (2 * math.pi)) - math.pi)
+        if df <= cfg.cancel_bandwidth and dphi >= (math.pi - cfg.cancel_phase_tol):
+            dE = cfg.cancel_efficiency * min(p[3], n[3]) * min(p[2], n[2])
+            p[2] -= dE; n[2] -= dE; field += 0.5 * dE
+        if p[0] <= n[0]: i += 1
+        else: j += 1
+    return field
+
+def test_vector_cancellation_matches_two_pointer():
+    rng = np.random.default_rng(7)
+    cfg = EmissionConfig(cancel_mode="two_pointer")
+    n = 40
+    pk = PacketColumns(
+        edge=np.zeros(n, dtype=np.int64), prog=np.zeros(n),
+        energy=rng.uniform(0.5, 3.0, n), frequency=rng.choice([430.0, 440.0, 445.0, 460.0], n),
+        phase=rng.choice([0.0, math.pi, 3.0], n), coherence=rng.uniform(0.4, 1.0, n),
+        polarity=rng.choice([1, -1], n).astype(np.int8), event=np.zeros(n, dtype=np.int64),
+    )
+    grp = np.repeat([0, 1], n // 2)
+    rows = [[pk.frequency[k], pk.phase[k], pk.energy[k], pk.coherence[k]] for k in range(n)]
+    want = [_two_pointer([r for k, r in enumerate(rows) if grp[k] == g and pk.polarity[k] == 1],
+                         [r for k, r in enumerate(rows) if grp[k] == g and pk.polarity[k] == -1], cfg)
+            for g in (0, 1)]
+    mixed, field_g, _ = _cancel(pk, grp, 2, cfg)
+    assert mixed.all()
+    assert np.allclose(field_g, want)
+    assert np.allclose(pk.energy, [r[2] for r in rows])
+
+def test_batch_matches_single_event_runs():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    events = [
+        ([Sound("n1", +1, 5.0, 440.0, 0.0, 0.9)], [Sound("n4", -1, 5.0, 440.0, math.pi, 0.9)]),
+        ([], []),
+        ([Sound(f"n{i}", +1, 3.0, 440.0, 0.0, 0.8) for i in range(1, 58, 2)], []),
+        ([], [Sound(f"n{i}", -1, 4.0, 220.0, 1.0, 0.95) for i in range(2, 58, 3)]),
+    ]
+    for engine in ("packet", "vector"):
+        cfg = EmissionConfig(max_steps=35, max_outputs=5, engine=engine)
+        batch = K.simulate_emission_batch(events, cfg)
+        assert len(batch) == len(events)
+        for (pos, neg), b in zip(events, batch):
+            a = K.simulate_emission(pos, neg, EmissionConfig(max_steps=35, max_outputs=5))
+            assert a["steps"] == b["steps"]
+            assert [p["locus"] for p in a["particles"]] == [p["locus"] for p in b["particles"]]
+            assert np.allclose([p["energy"] for p in a["particles"]], [p["energy"] for p in b["particles"]])
+            assert a["ledger"]["steps"] == b["ledger"]["steps"]
+            assert math.isclose(a["ledger"]["final"]["remaining_packets_energy"],
+                                b["ledger"]["final"]["remaining_packets_energy"], rel_tol=1e-9)
+
+def test_roulette_batch_matches_single_event_runs():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    events = [([Sound(f"n{i}", +1, 6.0, 440.0, 0.0, 0.9) for i in range(1, 58, 2)],
+               [Sound(f"n{i}", -1, 5.0, 440.0, math.pi, 0.9) for i in range(1, 58, 3)]),
+              ([], []),
+              ([Sound(f"n{i}", +1, 4.0, 220.0, 0.5, 0.95) for i in range(3, 58, 4)], [])]
+    cfg = dict(max_steps=25, max_outputs=10**6, within_gain=0.55, cross_gain=0.6, special_gain=0.3,
+               roulette=True, roulette_frac=1e-3, rng_seed=11)
+    # run_serial seeds event i with derive_seed(rng_seed, i), as the batch does
+    singles = list(run_serial(K, events, EmissionConfig(**cfg)))
+    for engine in ("packet", "vector"):
+        batch = K.simulate_emission_batch(events, EmissionConfig(engine=engine, **cfg))
+        for a, b in zip(singles, batch):
+            assert a["steps"] == b["steps"]
+            assert [s["roulette_killed"] for s in a["ledger"]["steps"]] == [s["roulette_killed"] for s in b["ledger"]["steps"]]
+            assert [p["locus"] for p in a["particles"]] == [p["locus"] for p in b["particles"]]
+            assert np.allclose([p["energy"] for p in a["particles"]], [p["energy"] for p in b["particles"]])
+    assert sum(s["roulette_killed"] for s in singles[0]["ledger"]["steps"]) > 0
@@ -0,0 +1,34 @@
+import json, math
+import numpy as np
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig, _RunContext
+from pt_sim.ptk_linear import cancellation_possible, packet_response, propagate_linear
+
+def _kernel():
+    return PTKKernel(json.load(open("ptk.v1.json")))
+
+def test_linear_path_matches_packet_stepping():
+    K = _kernel()
+    pos = [Sound(f"n{i}", +1, 3.0, 440.0, 0.0, 0.9) for i in range(1, 58, 3)]
+    neg = [Sound(f"n{i}", -1, 2.0, 900.0, 0.0, 0.4) for i in range(2, 58, 5)]
+    for cfg in (EmissionConfig(max_steps=40), EmissionConfig(max_steps=25, step_len=0.4, within_gain=0.6)):
+        fast = propagate_linear(K.graph, pos, neg, cfg)
+        ref = packet_response(K, pos, neg, _RunContext.start(cfg))
+        assert fast.linear and not ref.linear and fast.steps == ref.steps
+        assert np.allclose(fast.localized, ref.localized, rtol=1e-9, atol=1e-9)
+        assert math.isclose(fast.remaining, ref.remaining, rel_tol=1e-9)
+        assert fast.by_node(K.graph).keys() == ref.by_node(K.graph).keys()
+
+def test_falls_back_when_cancellation_is_possible():
+    K = _kernel()
+    pos = [Sound("n1", +1, 5.0, 440.0, 0.0, 0.9)]
+    anti = [Sound("n4", -1, 5.0, 441.0, math.pi, 0.9)]
+    off = [Sound("n4", -1, 5.0, 880.0, math.pi, 0.9)]
+    cfg = EmissionConfig(max_steps=30)
+    assert not cancellation_possible(pos, [], cfg)
+    assert not cancellation_possible(pos, off, cfg)
+    assert cancellation_possible(pos, anti, cfg)
+    assert cancellation_possible(pos, off, EmissionConfig(coalesce=True))
+    assert K.localized_response(pos, off, cfg).linear
+    res = K.localized_response(pos, anti, cfg)
+    assert not res.linear
+    assert np.allclose(res.localized, propagate_linear(K.graph, pos, anti, cfg).localized)
@@ -0,0 +1,42 @@
+import json, math, uuid
+import pytest
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig, OutputId
+
+def _sounds():
+    pos = [Sound(f"n{i}", +1, 4.0, 440.0, 0.0, 0.9) for i in range(1, 58, 2)]
+    neg = [Sound(f"n{i}", -1, 4.0, 440.0, math.pi, 0.9) for i in range(2, 58, 2)]
+    return pos, neg
+
+def _ids(res):
+    return [o["id"] for k in ("particles", "fields", "detections") for o in res[k]]
+
+def test_counter_ids_are_reproducible_and_unique():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos, neg = _sounds()
+    a = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30))
+    b = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, engine="vector"))
+    c = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, rng_seed=7))
+    assert a["particles"] and _ids(a) == _ids(b)
+    assert len(set(_ids(a))) == len(_ids(a))
+    assert all(isinstance(i, str) for i in _ids(a))
+    assert {d["ref_id"] for d in a["detections"]} == {o["id"] for o in a["particles"] + a["fields"]}
+    assert set(_ids(a)).isdisjoint(_ids(c))
+
+def test_ids_stay_objects_until_serialized():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos, neg = _sounds()
+    parts = [p for s in K.iter_emission(pos, neg, EmissionConfig(max_steps=30)) for p in s.particles]
+    assert parts and all(isinstance(p.id, OutputId) and p.id.event == 0 for p in parts)
+    assert [p.id.seq for p in parts] == sorted(p.id.seq for p in parts)
+
+def test_batch_ids_carry_event_index_and_uuid4_strategy():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos, neg = _sounds()
+    for engine in ("packet", "vector"):
+        batch = K.simulate_emission_batch([(pos, neg), (pos, neg)], EmissionConfig(max_steps=20, engine=engine))
+        assert set(_ids(batch[0])).isdisjoint(_ids(batch[1]))
+        assert all(i.split("-")[1] == "1" for i in _ids(batch[1]))
+    res = K.simulate_emission(pos, neg, EmissionConfig(max_steps=20, id_strategy="uuid4"))
+    assert all(uuid.UUID(i) for i in _ids(res))
+    with pytest.raises(ValueError):
+        K.simulate_emission(pos, neg, EmissionConfig(id_strategy="nope"))
@@ -0,0 +1,28 @@
+import json, math
+import pytest
+from pt_sim import ptk_parallel
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_parallel import run_parallel, run_serial, derive_seed
+
+def _events(n):
+    return [([Sound(f"n{1 + (3 * k + i) % 57}", +1, 2.0 + k % 4, 440.0, 0.0, 0.9) for i in range(4)],
+             [Sound(f"n{1 + (5 * k + i) % 57}", -1, 3.0, 440.0, math.pi, 0.8) for i in range(3)])
+            for k in range(n)]
+
+def test_parallel_matches_serial_in_order():
+    events = _events(11)
+    cfg = EmissionConfig(max_steps=20, engine="vector")
+    serial = [r.to_dict() for r in run_serial(PTKKernel(json.load(open("ptk.v1.json"))), events, cfg, root_seed=5)]
+    par = [r.to_dict() for r in run_parallel("ptk.v1.json", events, cfg, root_seed=5, workers=2, chunksize=3)]
+    assert par == serial
+    assert len({r["particles"][0]["id"] for r in serial if r["particles"]}) == sum(1 for r in serial if r["particles"])
+
+def test_derived_seeds_are_stable_and_distinct():
+    assert derive_seed(5, 0) == derive_seed(5, 0)
+    assert len({derive_seed(5, i) for i in range(100)}) == 100
+    assert derive_seed(5, 1) != derive_seed(6, 1)
+
+def test_uninitialized_worker_raises(monkeypatch):
+    monkeypatch.setattr(ptk_parallel, "_KERNEL", None)
+    with pytest.raises(RuntimeError):
+        ptk_parallel._run_chunk((0, _events(1), EmissionConfig(), 5))
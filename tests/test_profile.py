@@ -0,0 +1,21 @@
+import json, math
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig, PROFILE_PHASES, PROFILE_COUNTERS
+
+def test_profile_is_opt_in_and_consistent_across_engines():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 4.0, 440.0, 0.0, 0.9) for i in range(1, 58, 2)]
+    neg = [Sound(f"n{i}", -1, 4.0, 440.0, math.pi, 0.9) for i in range(2, 58, 2)]
+    counters = {}
+    for engine in ("packet", "vector", "event"):
+        plain = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, engine=engine))
+        res = K.simulate_emission(pos, neg, EmissionConfig(max_steps=30, engine=engine, profile=True))
+        assert "profile" not in plain
+        assert res["ledger"] == plain["ledger"]
+        prof = res["profile"]
+        assert len(prof["steps"]) == res["steps"]
+        assert set(prof["totals"]["time_s"]) == set(PROFILE_PHASES)
+        assert all(t >= 0.0 for s in prof["steps"] for t in s["time_s"].values())
+        counters[engine] = [[s[c] for c in PROFILE_COUNTERS] for s in prof["steps"]]
+        assert prof["totals"]["splits"] == sum(s["splits"] for s in prof["steps"])
+    assert counters["packet"] == counters["vector"] == counters["event"]
+    assert counters["packet"][0][0] == sum(len(K.graph.outs(K.graph.node_index[s.node_id], s.polarity)) for s in pos + neg)
@@ -0,0 +1,24 @@
+import copy
+from pt_sim.ptk_bench import BenchCase, compare, load_graph, run_suite
+
+def test_bench_case_reports_throughput_and_memory():
+    report = run_suite([BenchCase("canonical", 4, 10, "cancel", "packet", events=2)], repeat=1)
+    (name, r), = report["cases"].items()
+    assert name == "canonical/s4/t10/cancel/packet"
+    assert r["events_per_s"] > 0 and r["packets"] > 0 and r["peak_mem_bytes"] > 0
+    assert r["packets_per_s"] == r["packets"] / r["seconds"]
+
+def test_compare_flags_slowdowns_and_memory_growth():
+    base = {"cases": {"a": {"events_per_s": 100.0, "peak_mem_bytes": 1000},
+                      "b": {"events_per_s": 100.0, "peak_mem_bytes": 1000},
+                      "c": {"events_per_s": 100.0, "peak_mem_bytes": 1000}}}
+    cur = copy.deepcopy(base)
+    cur["cases"]["a"]["events_per_s"] = 95.0
+    cur["cases"]["b"]["events_per_s"] = 80.0
+    cur["cases"]["c"]["peak_mem_bytes"] = 1500
+    cur["cases"]["new"] = cur["cases"]["a"]
+    rows = {r["case"]: r["regression"] for r in compare(base, cur, threshold=0.1)}
+    assert rows == {"a": False, "b": True, "c": True}
+
+def test_synthetic_bench_graph_loads():
+    assert len(load_graph("1k").graph.node_ids) > 900
@@ -0,0 +1,62 @@
+import json, os
+import numpy as np
+from pt_sim.ptk_graph import CompiledGraph, load_or_compile, compiled_path_for
+from pt_sim.ptk_kernel import EmissionConfig, PTKKernel, Sound
+
+def test_compiled_graph_csr_matches_document():
+    ptk = json.load(open("ptk.v1.json"))
+    G = CompiledGraph.from_ptk(ptk)
+    assert G.n_nodes == len(ptk["nodes"]) and G.n_edges == len(ptk["edges"])
+    for nid in ("n1", "n4", "n14", "n56"):
+        for pol in (1, -1):
+            want = [e["id"] for e in ptk["edges"] if e["source"] == nid and e["polarity"] == pol]
+            got = [G.edge_ids[e] for e in G.outs(G.node_index[nid], pol)]
+            assert got == want
+
+def test_compiled_graph_gains():
+    ptk = json.load(open("ptk.v1.json"))
+    G = CompiledGraph.from_ptk(ptk)
+    cfg = EmissionConfig(within_gain=1.0, cross_gain=0.5, special_gain=2.0)
+    g = G.gains(cfg)
+    by_type = {"within_line": 1.0, "cross_sutra": 0.5, "special": 2.0}
+    for i, e in enumerate(ptk["edges"]):
+        assert g[i] == by_type[e["type"]] * e["flow"]["weight"]
+    assert G.gains(cfg) is g
+
+def test_compiled_copy_is_reused_and_invalidated(tmp_path):
+    src = tmp_path / "ptk.json"
+    doc = json.load(open("ptk.v1.json"))
+    src.write_text(json.dumps(doc))
+    G, meta = load_or_compile(str(src))
+    ref = CompiledGraph.from_ptk(doc)
+    assert G.node_ids == ref.node_ids and G.edge_ids == ref.edge_ids and G.node_labels == ref.node_labels
+    for name in ("edge_target", "edge_weight", "out_ptr", "out_edges", "node_line"):
+        assert np.array_equal(getattr(G, name), getattr(ref, name))
+    path = compiled_path_for(str(src))
+    mtime = os.stat(path).st_mtime_ns
+    load_or_compile(str(src))
+    assert os.stat(path).st_mtime_ns == mtime
+    doc["edges"][0]["flow"]["weight"] = 0.25
+    src.write_text(json.dumps(doc))
+    G2, meta2 = load_or_compile(str(src))
+    assert G2.edge_weight[0] == 0.25 and meta2["source_hash"] != meta["source_hash"]
+
+def test_unwritable_compiled_copy_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("")
+    G, meta = load_or_compile("ptk.v1.json", str(blocker / "ptk.npz"))
+    assert G.edge_ids == CompiledGraph.from_ptk(json.load(open("ptk.v1.json"))).edge_ids
+    assert meta["ptk_hash"] and os.listdir(tmp_path) == ["not_a_dir"]
+    K = PTKKernel.from_file("ptk.v1.json", str(blocker / "ptk.npz"))
+    assert K.graph.n_edges == G.n_edges
+
+def test_kernel_from_file_matches_json_kernel(tmp_path):
+    src = tmp_path / "ptk.json"
+    src.write_text(open("ptk.v1.json").read())
+    a = PTKKernel(json.load(open("ptk.v1.json")))
+    PTKKernel.from_file(str(src))
+    b = PTKKernel.from_file(str(src))
+    assert b._ptk is None and b.ptk_hash == a.ptk_hash
+    pos = [Sound("n1", +1, 5.0, 440.0, 0.0, 0.9)]
+    assert a.simulate_emission(pos, []).to_dict() == b.simulate_emission(pos, []).to_dict()
+    assert b.ptk["nodes"][0]["id"] == a.ptk["nodes"][0]["id"]
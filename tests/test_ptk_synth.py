@@ -0,0 +1,39 @@
+import io, json
+import pytest
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_synth import SynthSpec, write_synthetic_ptk
+
+def _doc(spec):
+    buf = io.StringIO()
+    counts = write_synthetic_ptk(buf, spec)
+    return buf.getvalue(), counts
+
+def test_synthetic_ptk_is_reproducible_and_well_formed():
+    spec = SynthSpec(lines=30, nodes_min=3, nodes_max=12, cross_density=0.5, special_pairs=4,
+                     weight_dist="lognormal", seed=11)
+    text, counts = _doc(spec)
+    assert text == _doc(spec)[0]
+    assert text != _doc(SynthSpec(lines=30, nodes_min=3, nodes_max=12, seed=12))[0]
+    doc = json.loads(text)
+    assert (len(doc["nodes"]), len(doc["edges"])) == (counts["nodes"], counts["edges"])
+    ids = {n["id"] for n in doc["nodes"]}
+    assert len(ids) == len(doc["nodes"])
+    pairs = {}
+    for e in doc["edges"]:
+        assert e["source"] in ids and e["target"] in ids and e["polarity"] in (1, -1)
+        assert e["flow"]["weight"] > 0
+        if e["type"] != "within_line":
+            pairs.setdefault((frozenset((e["source"], e["target"])), e["type"]), set()).add(e["polarity"])
+    assert all(p == {1, -1} for p in pairs.values())
+    assert sum(1 for k in pairs if k[1] == "special") == 4
+    assert sorted(i for g in doc["groups"] for i in g["node_ids"]) == sorted(ids)
+
+    K = PTKKernel(doc)
+    res = K.simulate_emission([Sound("n1", +1, 5.0, 440.0, 0.0, 0.9)], [], EmissionConfig(max_steps=30))
+    assert res["steps"] > 0
+
+def test_synthetic_spec_is_validated():
+    with pytest.raises(ValueError):
+        write_synthetic_ptk(io.StringIO(), SynthSpec(lines=1, cross_density=0.1))
+    with pytest.raises(ValueError):
+        write_synthetic_ptk(io.StringIO(), SynthSpec(weight_dist="zipf"))
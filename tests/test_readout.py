@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from pt_sim.detector.bridge import kernel_to_adc_counts_batch, kernel_to_adc_sparse
+from pt_sim.detector.readout import SparseReadout, SparseWriter, iter_chunks, read_readout, write_readout
+
+def _dense(rng, n=5):
+    d = rng.normal(210.0, 5.0, (n, 6, 7))
+    d[d < 212.0] = 0.0
+    d[n // 2] = 0.0  # an empty event
+    return d
+
+def test_dense_roundtrip_with_time():
+    rng = np.random.default_rng(0)
+    d = _dense(rng)
+    t = rng.uniform(0.0, 25.0, d.shape)
+    r = SparseReadout.from_dense(d, time=t)
+    assert len(r) == 5 and r.n_hits == int((d != 0).sum())
+    assert np.array_equal(r.to_dense(), d)
+    ch, adc, tm = r.event(1)
+    assert np.array_equal(adc, d[1].ravel()[ch]) and np.array_equal(tm, t[1].ravel()[ch])
+    assert r.event(2)[0].size == 0
+
+def test_chunked_file_roundtrip(tmp_path):
+    rng = np.random.default_rng(1)
+    parts = [SparseReadout.from_dense(_dense(rng, n)) for n in (3, 5, 1)]
+    path = str(tmp_path / "adc.sparse")
+    with SparseWriter(path, (6, 7)) as w:
+        for p in parts:
+            w.write(p)
+    assert w.n_events == 9
+    assert [len(c) for c in iter_chunks(path)] == [3, 5, 1]
+    whole = read_readout(path)
+    assert np.array_equal(whole.to_dense(), np.concatenate([p.to_dense() for p in parts]))
+    write_readout(path, parts[0])
+    assert np.array_equal(read_readout(path).to_dense(), parts[0].to_dense())
+    with SparseWriter(path, (6, 7), time=True):
+        pass
+    empty = read_readout(path)
+    assert len(empty) == 0 and empty.time is not None
+
+def test_writer_checks_shape_before_creating_the_file(tmp_path):
+    path = tmp_path / "bad.sparse"
+    for shape in ((0, 7), (6,), (6, 7, 1)):
+        with pytest.raises(ValueError):
+            SparseWriter(str(path), shape)
+    assert not path.exists()
+    empty = SparseReadout.empty((6, 7), dtype=np.float32)
+    assert len(empty) == 0 and empty.adc.dtype == np.float32 and empty.to_dense().shape == (0, 6, 7)
+
+def test_bridge_sparse_matches_dense_batch():
+    rng = np.random.default_rng(2)
+    events = [list(zip(rng.integers(0, 32 * 32, 20).tolist(), rng.uniform(0.0, 30.0, 20).tolist())) for _ in range(70)]
+    dense = kernel_to_adc_counts_batch(events, n=32, seed=5, atten=0.6)
+    sparse = kernel_to_adc_sparse(events, n=32, seed=5, atten=0.6)
+    assert len(sparse) == 70 and sparse.n_hits < dense.size // 5
+    ref = SparseReadout.from_dense(dense)
+    assert np.array_equal(sparse.offsets, ref.offsets) and np.array_equal(sparse.channel, ref.channel)
+    assert np.array_equal(sparse.adc, ref.adc)
+    assert np.array_equal(sparse.to_dense(), dense)
+    assert kernel_to_adc_sparse(events[:3], n=32, seed=5, atten=0.6, dtype=np.float32).adc.dtype == np.float32
@@ -0,0 +1,75 @@
+import json, math
+import numpy as np
+import pytest
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.core.rng import derive_seed
+from pt_sim.ptk_vector import PacketColumns, roulette
+
+def _columns(energy):
+    n = len(energy)
+    return PacketColumns(edge=np.zeros(n, dtype=np.int64), prog=np.zeros(n), energy=np.asarray(energy, dtype=float),
+                         frequency=np.full(n, 440.0), phase=np.zeros(n), coherence=np.full(n, 0.9),
+                         polarity=np.ones(n, dtype=np.int8), event=np.zeros(n, dtype=np.int64))
+
+def test_roulette_is_unbiased_and_accounted():
+    cfg = EmissionConfig(roulette_survival=0.2)
+    energy = np.r_[np.full(20000, 1e-3), [5.0, 7.0]]
+    out, stats = roulette(_columns(energy), cfg, np.array([1.0]), [np.random.default_rng(0)])
+    assert stats["rouletted"][0] == 20000 and len(out) == 2 + 20000 - stats["roulette_killed"][0]
+    assert 5.0 in out.energy and 7.0 in out.energy
+    assert math.isclose(out.energy.sum(), energy.sum() + stats["roulette_energy_delta"][0], rel_tol=1e-12)
+    assert math.isclose(stats["roulette_expected_removed"][0], 0.8 * 20.0)
+    # expected change is zero: within ~4 sigma of the binomial spread
+    sigma = 1e-3 / 0.2 * math.sqrt(20000 * 0.2 * 0.8)
+    assert abs(stats["roulette_energy_delta"][0]) < 4 * sigma
+
+def test_roulette_collapses_packets_with_consistent_ledger():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound(f"n{i}", +1, 5.0, 440.0, 0.0, 0.9) for i in range(1, 58)]
+    neg = [Sound(f"n{i}", -1, 5.0, 440.0, math.pi, 0.9) for i in range(1, 58)]
+    base = dict(max_steps=40, max_outputs=10**6, within_gain=0.55, cross_gain=0.6, special_gain=0.3,
+                ledger_check_every=1, profile=True, rng_seed=3)
+    plain = K.simulate_emission(pos, neg, EmissionConfig(**base))
+    runs = [K.simulate_emission(pos, neg, EmissionConfig(**base, engine=e, roulette=True, roulette_frac=1e-3))
+            for e in ("packet", "vector", "packet")]
+    a, b, again = runs
+    steps = a["ledger"]["steps"]
+    assert a.profile["totals"]["live_packets"] < plain.profile["totals"]["live_packets"] / 2
+    assert sum(s["roulette_killed"] for s in steps) > 0
+    assert sum(s["roulette_removed"] for s in steps) > 0 and sum(s["roulette_expected_removed"] for s in steps) > 0
+    assert not any(s.get("ledger_mismatch") for r in runs for s in r["ledger"]["steps"])
+    assert [s["roulette_killed"] for s in steps] == [s["roulette_killed"] for s in b["ledger"]["steps"]]
+    assert math.isclose(a["ledger"]["final"]["particles_energy"], b["ledger"]["final"]["particles_energy"], rel_tol=1e-9)
+    assert again.to_dict()["ledger"] == a.to_dict()["ledger"]
+
+def test_roulette_batch_matches_single_event_runs():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    events = [([Sound(f"n{i}", +1, 5.0 + k, 440.0, 0.0, 0.9) for i in range(1, 58, 2 + k)],
+               [Sound(f"n{i}", -1, 4.0, 440.0, math.pi, 0.9) for i in range(2, 58, 3 + k)]) for k in range(3)]
+    base = dict(max_steps=30, max_outputs=10**6, within_gain=0.55, cross_gain=0.6, special_gain=0.3,
+                roulette=True, roulette_frac=1e-3)
+    killed = lambda r: [s["roulette_killed"] for s in r["ledger"]["steps"]]  # noqa: E731
+    batches = [K.simulate_emission_batch(events, EmissionConfig(**base, engine=e, rng_seed=9)) for e in ("packet", "vector")]
+    for i, (pos, neg) in enumerate(events):
+        single = K.simulate_emission(pos, neg, EmissionConfig(**base, rng_seed=derive_seed(9, i)))
+        assert sum(killed(single)) > 0
+        for b in (batches[0][i], batches[1][i]):
+            assert killed(b) == killed(single) and b["steps"] == single["steps"]
+            assert [p["locus"] for p in b["particles"]] == [p["locus"] for p in single["particles"]]
+            assert math.isclose(b["ledger"]["final"]["particles_energy"], single["ledger"]["final"]["particles_energy"],
+                                rel_tol=1e-9)
+
+def test_event_engine_rejects_roulette():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    with pytest.raises(ValueError):
+        K.simulate_emission([Sound("n1", +1, 5.0, 440.0, 0.0)], [], EmissionConfig(engine="event", roulette=True))
+
+def test_roulette_survival_is_validated():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    pos = [Sound("n1", +1, 5.0, 440.0, 0.0)]
+    for p in (0.0, -0.5, 1.5):
+        with pytest.raises(ValueError):
+            K.simulate_emission(pos, [], EmissionConfig(roulette_survival=p))
+        with pytest.raises(ValueError):
+            K.simulate_emission_batch([(pos, [])], EmissionConfig(engine="vector", roulette_survival=p))
+    assert K.simulate_emission(pos, [], EmissionConfig(roulette_survival=1.0, roulette=True))["steps"] > 0
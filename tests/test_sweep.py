@@ -0,0 +1,55 @@
+import json, math
+import numpy as np
+import pytest
+from pt_sim.ptk_kernel import Sound, EmissionConfig
+from pt_sim.ptk_sweep import grid, random_design, run_sweep, point_id, SweepTable
+
+EVENTS = [([Sound(f"n{1 + 7 * k}", +1, 5.0, 440.0, 0.0, 0.9)], [Sound(f"n{4 + 5 * k}", -1, 5.0, 440.0, math.pi, 0.9)])
+          for k in range(3)]
+
+def test_designs():
+    pts = grid({"split_decay": [0.8, 0.9], "max_steps": [10, 20, 30]})
+    assert len(pts) == 6 and pts[1] == {"split_decay": 0.8, "max_steps": 20}
+    rnd = random_design({"split_decay": (0.5, 1.0), "max_steps": (5, 9), "engine": ["packet", "vector"]}, 20, seed=1)
+    assert rnd == random_design({"split_decay": (0.5, 1.0), "max_steps": (5, 9), "engine": ["packet", "vector"]}, 20, seed=1)
+    assert all(0.5 <= p["split_decay"] <= 1.0 and p["max_steps"] in range(5, 10) for p in rnd)
+    with pytest.raises(ValueError):
+        grid({"no_such_field": [1]})
+
+def test_sweep_resumes_from_checkpoint_and_matches_parallel(tmp_path):
+    pts = grid({"split_decay": [0.7, 0.9], "within_gain": [0.8, 1.0, 1.2]})
+    cfg = EmissionConfig(max_steps=15, max_outputs=10**6)
+    ckpt = str(tmp_path / "sweep.ckpt.jsonl")
+    run_sweep("ptk.v1.json", pts[:2], EVENTS, cfg, checkpoint=ckpt)
+    with open(ckpt, "a") as f:
+        f.write('{"sweep": "torn')  # interrupted mid-write
+    full = run_sweep("ptk.v1.json", pts, EVENTS, cfg, checkpoint=ckpt)
+    recs = [json.loads(line) for line in open(ckpt) if line.strip().endswith("}")]
+    assert [r["id"] for r in recs] == [point_id(p) for p in pts]  # each point run once
+
+    fresh = run_sweep("ptk.v1.json", pts, EVENTS, cfg, workers=2)
+    assert list(full.rows()) == list(fresh.rows())
+    assert len(full) == 6 and list(full.columns["within_gain"]) == [0.8, 1.0, 1.2] * 2
+    assert full.columns["particles_energy"].dtype == float and (full.columns["steps"] > 0).all()
+
+    # different events: checkpointed points do not apply
+    other = run_sweep("ptk.v1.json", pts[:1], EVENTS[:1], cfg, checkpoint=ckpt)
+    assert other.columns["steps"][0] != full.columns["steps"][0]
+    assert sum(1 for line in open(ckpt) if point_id(pts[0]) in line) == 2
+
+    out = str(tmp_path / "sweep.npz")
+    full.save(out)
+    loaded = SweepTable.load(out)
+    assert loaded.params == ["split_decay", "within_gain"]
+    assert np.array_equal(loaded.columns["max_drift_rel"], full.columns["max_drift_rel"])
+
+def test_rng_seed_axis_is_the_point_root_seed():
+    events = [([Sound(f"n{i}", +1, 5.0, 440.0, 0.0, 0.9) for i in range(1, 58, 2)],
+               [Sound(f"n{i}", -1, 5.0, 440.0, math.pi, 0.9) for i in range(2, 58, 3)])]
+    cfg = EmissionConfig(max_steps=25, max_outputs=10**6, within_gain=0.55, cross_gain=0.6, special_gain=0.3,
+                         roulette=True, roulette_frac=1e-3)
+    swept = run_sweep("ptk.v1.json", grid({"rng_seed": [1, 2]}), events, cfg)
+    by_root = [run_sweep("ptk.v1.json", [{}], events, cfg, root_seed=s) for s in (1, 2)]
+    e = swept.columns["remaining_energy"]
+    assert e[0] != e[1]
+    assert [e[0], e[1]] == [t.columns["remaining_energy"][0] for t in by_root]
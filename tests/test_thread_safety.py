@@ -0,0 +1,30 @@
+import json, math, random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+
+def test_one_kernel_serves_concurrent_calls():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    jobs = []
+    for k in range(24):
+        pos = [Sound(f"n{1 + (7 * k + i) % 57}", +1, 2.0 + k % 5, 440.0, 0.0, 0.9) for i in range(5)]
+        neg = [Sound(f"n{1 + (3 * k + i) % 57}", -1, 3.0, 440.0, math.pi, 0.8) for i in range(4)]
+        cfg = EmissionConfig(max_steps=15 + k % 10, rng_seed=k, engine=("packet", "vector", "event")[k % 3],
+                             within_gain=(1.0, 0.5)[k % 2])
+        jobs.append((pos, neg, cfg))
+    want = [K.simulate_emission(*j).to_dict() for j in jobs]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        got = list(pool.map(lambda j: K.simulate_emission(*j).to_dict(), jobs * 3))
+    assert got == want * 3
+
+def test_no_global_rng_or_kernel_state():
+    K = PTKKernel(json.load(open("ptk.v1.json")))
+    random.seed(123)
+    before = random.getstate()
+    K.simulate_emission([Sound("n1", +1, 5.0, 440.0, 0.0, 0.9)], [], EmissionConfig(rng_seed=1))
+    assert random.getstate() == before
+    assert not hasattr(K, "cfg")
+    with pytest.raises(ValueError):
+        K.graph.edge_weight[0] = 2.0
+    assert isinstance(K.graph.gains(EmissionConfig()), np.ndarray)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""Bridge throughput: per-event time of single-event calls vs the batched builders."""
+import argparse, time
+import numpy as np
+from pt_sim.detector.bridge import (kernel_to_adc_counts, kernel_to_adc_counts_batch,
+                                    kernel_to_ecal_image, kernel_to_ecal_image_batch)
+
+def best_per_event(fn, n_events, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best / n_events
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=256)
+    ap.add_argument("--deposits", type=int, default=200, help="deposits per event")
+    ap.add_argument("--cells", type=int, default=64, help="square geometry size")
+    ap.add_argument("--ribbon-width", type=int, default=1)
+    ap.add_argument("--atten", type=float, default=0.7)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    events = [list(zip(rng.integers(0, args.cells ** 2, args.deposits).tolist(),
+                       rng.lognormal(0.0, 1.0, args.deposits).tolist())) for _ in range(args.events)]
+    kw = dict(n=args.cells, ribbon_width=args.ribbon_width, atten=args.atten)
+    out = np.empty((args.events, args.cells, args.cells), dtype=np.float32)
+    cases = {
+        "image loop": lambda: np.stack([kernel_to_ecal_image(ev, **kw) for ev in events]),
+        "image batch": lambda: kernel_to_ecal_image_batch(events, **kw),
+        "image batch f32 out": lambda: kernel_to_ecal_image_batch(events, out=out, **kw),
+        "adc loop": lambda: np.stack([kernel_to_adc_counts(ev, **kw) for ev in events]),
+        "adc batch": lambda: kernel_to_adc_counts_batch(events, seed=1, **kw),
+    }
+    for name, fn in cases.items():
+        t = best_per_event(fn, args.events, args.repeat)
+        print(f"{name:22s} {t * 1e6:9.1f} us/event {1.0 / t:10.0f} ev/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Emission benchmarks: `run` the matrix (optionally saving a baseline), `compare` two reports."""
+import argparse, os, sys
+from pt_sim.ptk_bench import INPUT_KINDS, BenchCase, compare, default_matrix, load, run_suite, save
+
+def print_row(name, r):
+    print(f"{name:45s} {r['events_per_s']:10.1f} ev/s {r['packets_per_s']:12.0f} pk/s "
+          f"{r['peak_mem_bytes'] / 1024:9.0f} KiB")
+
+def print_compare(rows):
+    for r in rows:
+        flag = "REGRESSION" if r["regression"] else ""
+        print(f"{r['case']:45s} speed x{r['speed']:.2f}  mem x{r['mem']:.2f}  {flag}")
+    bad = sum(r["regression"] for r in rows)
+    print(f"{len(rows)} cases compared, {bad} regressions")
+    return bad
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="run the benchmark matrix")
+    r.add_argument("--quick", action="store_true", help="small matrix for CI smoke runs")
+    r.add_argument("--kernel", default="ptk.v1.json", help="canonical PTK document")
+    r.add_argument("--repeat", type=int, default=3, help="timed repeats per case (best is kept)")
+    r.add_argument("--filter", default="", help="only cases whose name contains this")
+    r.add_argument("--case", help="single case: graph/sounds/max_steps/inputs/engine, e.g. 1k/8/50/cancel/vector")
+    r.add_argument("--out", default="out/bench/emission.json", help="report path (use as a baseline later)")
+    r.add_argument("--baseline", help="compare against this report after running")
+    r.add_argument("--threshold", type=float, default=0.10, help="allowed events/s drop")
+    r.add_argument("--mem-threshold", type=float, default=0.25, help="allowed peak memory growth")
+    c = sub.add_parser("compare", help="compare a report against a baseline")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.10, help="allowed events/s drop")
+    c.add_argument("--mem-threshold", type=float, default=0.25, help="allowed peak memory growth")
+    args = ap.parse_args()
+
+    if args.cmd == "compare":
+        rows = compare(load(args.baseline), load(args.current), args.threshold, args.mem_threshold)
+        sys.exit(1 if print_compare(rows) else 0)
+
+    if args.case:
+        g, s, t, i, e = args.case.split("/")
+        if i not in INPUT_KINDS:
+            ap.error(f"inputs must be one of {INPUT_KINDS}")
+        cases = [BenchCase(g, int(s), int(t), i, e)]
+    else:
+        cases = [cs for cs in default_matrix(args.quick) if args.filter in cs.name]
+    report = run_suite(cases, args.repeat, args.kernel, progress=print_row)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    save(report, args.out)
+    print("Wrote", args.out)
+    if args.baseline:
+        rows = compare(load(args.baseline), report, args.threshold, args.mem_threshold)
+        sys.exit(1 if print_compare(rows) else 0)
+
+if __name__ == "__main__":
+    main()
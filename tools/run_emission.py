@@ -1,6 +1,7 @@
 #!/usr/bin/env python
 import os, json, math, argparse
 from pt_sim.ptk_kernel import PTKKernel, Sound, EmissionConfig
+from pt_sim.ptk_parallel import run_parallel
 
 def load_sounds(slist):
     out = []
@@ -13,25 +14,48 @@ def load_sounds(slist):
         ))
     return out
 
+def load_events(path):
+    """JSON list of {"positive": [...], "negative": [...]} sound sets."""
+    evs = json.load(open(path, "r", encoding="utf-8"))
+    return [(load_sounds(e.get("positive", [])), load_sounds(e.get("negative", []))) for e in evs]
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--kernel", default="ptk.v1.json", help="Path to ptk.v1.json")
-    ap.add_argument("--positive", required=True, help="JSON list of + sounds")
-    ap.add_argument("--negative", required=True, help="JSON list of - sounds")
+    ap.add_argument("--positive", help="JSON list of + sounds (single event)")
+    ap.add_argument("--negative", help="JSON list of - sounds (single event)")
+    ap.add_argument("--events", help="JSON file with a list of {positive, negative} events (parallel mode)")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes for --events (default: CPU count)")
+    ap.add_argument("--chunksize", type=int, default=8, help="Events per worker task for --events")
+    ap.add_argument("--seed", type=int, default=None, help="Root seed for per-event seeds (default: cfg rng_seed)")
     ap.add_argument("--cfg", default="{}", help="EmissionConfig JSON")
-    ap.add_argument("--out", default="out/ptk_emission_result.json")
+    ap.add_argument("--out", default=None, help="Output path (default out/ptk_emission_result.json, or .jsonl with --events)")
     args = ap.parse_args()
+    cfg = EmissionConfig(**json.loads(args.cfg))
 
-    ptk = json.load(open(args.kernel, "r", encoding="utf-8"))
-    K = PTKKernel(ptk)
+    if args.events:
+        out = args.out or "out/ptk_emission_results.jsonl"
+        os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+        events = load_events(args.events)
+        with open(out, "w") as f:
+            # one JSON line per event, written as results stream back in order
+            for res in run_parallel(args.kernel, events, cfg, root_seed=args.seed,
+                                    workers=args.workers, chunksize=args.chunksize):
+                f.write(json.dumps(res.to_dict()) + "\n")
+        print("Wrote", len(events), "events to", out)
+        return
+
+    if args.positive is None or args.negative is None:
+        ap.error("--positive and --negative are required without --events")
+    K = PTKKernel.from_file(args.kernel)
     pos = load_sounds(json.loads(args.positive))
     neg = load_sounds(json.loads(args.negative))
-    cfg = EmissionConfig(**json.loads(args.cfg))
 
     res = K.simulate_emission(pos, neg, cfg)
-    os.makedirs(os.path.dirname(args.out), exist_ok=True)
-    json.dump(res, open(args.out, "w"), indent=2)
-    print("Wrote", args.out)
+    out = args.out or "out/ptk_emission_result.json"
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    json.dump(res.to_dict(), open(out, "w"), indent=2)
+    print("Wrote", out)
 
 if __name__ == "__main__":
     main()
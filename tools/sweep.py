@@ -1,15 +1,37 @@
-from __future__ import annotations
-import itertools, json, os, subprocess
-
-def run_one(seed: int, size: int):
-    # Placeholder: call your real driver here
-    subprocess.check_call(["python", "-m", "pt_sim.tools.demo_run"])
+#!/usr/bin/env python
+"""Sweep EmissionConfig parameters over a set of events; writes one summary table."""
+import argparse, json, os
+from pt_sim.ptk_kernel import EmissionConfig
+from pt_sim.ptk_sweep import grid, random_design, run_sweep
+from run_emission import load_events
 
 def main():
-    seeds = [11, 22]
-    sizes = [256, 1024]
-    for s, n in itertools.product(seeds, sizes):
-        run_one(seed=s, size=n)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--kernel", default="ptk.v1.json", help="Path to ptk.v1.json")
+    ap.add_argument("--events", required=True, help="JSON file with a list of {positive, negative} events")
+    design = ap.add_mutually_exclusive_group(required=True)
+    design.add_argument("--grid", help='JSON {field: [values...]}, e.g. {"split_decay": [0.8, 0.9]}')
+    design.add_argument("--random", help='JSON {field: [lo, hi] range or {"choice": [values...]}}')
+    ap.add_argument("--points", type=int, default=100, help="Points for --random")
+    ap.add_argument("--design-seed", type=int, default=0, help="Seed for --random")
+    ap.add_argument("--cfg", default="{}", help="Base EmissionConfig JSON")
+    ap.add_argument("--seed", type=int, default=None, help="Root seed for per-event seeds (default: cfg rng_seed)")
+    ap.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    ap.add_argument("--checkpoint", default=None, help="JSONL checkpoint (default: <out>.ckpt.jsonl)")
+    ap.add_argument("--out", default="out/sweep.npz", help="Summary table: .npz, or CSV for any other extension")
+    args = ap.parse_args()
+
+    if args.grid:
+        points = grid(json.loads(args.grid))
+    else:
+        space = {k: v["choice"] if isinstance(v, dict) else tuple(v) for k, v in json.loads(args.random).items()}
+        points = random_design(space, args.points, args.design_seed)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    table = run_sweep(args.kernel, points, load_events(args.events), EmissionConfig(**json.loads(args.cfg)),
+                      root_seed=args.seed, workers=args.workers,
+                      checkpoint=args.checkpoint or os.path.splitext(args.out)[0] + ".ckpt.jsonl")
+    table.save(args.out)
+    print("Wrote", len(table), "points to", args.out)
 
 if __name__ == "__main__":
     main()
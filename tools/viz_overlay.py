@@ -1,18 +1,21 @@
 import os, json, matplotlib.pyplot as plt
+from pt_sim.ptk_graph import load_or_compile
 
 def main(ptk_path="ptk.v1.json", layout_path="ptk.layout.json", emission_json="out/ptk_emission_result.json", out="out/ptk_overlay.png"):
-    ptk = json.load(open(ptk_path, "r", encoding="utf-8"))
+    G, _ = load_or_compile(ptk_path)
     layout = json.load(open(layout_path, "r", encoding="utf-8"))
     coords = layout["coords"]
-    labels = {n["id"]: n["label"] for n in ptk["nodes"]}
+    labels = dict(zip(G.node_ids, G.node_labels))
+    edges = [(eid, G.node_ids[s], G.node_ids[t], pol) for eid, s, t, pol in
+             zip(G.edge_ids, G.edge_source.tolist(), G.edge_target.tolist(), G.edge_polarity.tolist())]
 
     fig, ax = plt.subplots(figsize=(14,10))
     ax.set_aspect('equal'); ax.axis('off')
 
     # Edges
-    for e in ptk["edges"]:
-        x1,y1 = coords[e["source"]]; x2,y2 = coords[e["target"]]
-        color = "green" if e["polarity"]==1 else "red"
+    for _, src, dst, pol in edges:
+        x1,y1 = coords[src]; x2,y2 = coords[dst]
+        color = "green" if pol==1 else "red"
         ax.plot([x1,x2],[y1,y2], color=color, lw=0.6, alpha=0.35)
 
     # Nodes
@@ -25,9 +28,9 @@ def main(ptk_path="ptk.v1.json", layout_path="ptk.layout.json", emission_json="o
         res = json.load(open(emission_json))
         # Fields: thicken support edges
         support = set(eid for f in res.get("fields", []) for eid in f.get("support_edges", []))
-        for e in ptk["edges"]:
-            if e["id"] in support:
-                x1,y1 = coords[e["source"]]; x2,y2 = coords[e["target"]]
+        for eid, src, dst, _ in edges:
+            if eid in support:
+                x1,y1 = coords[src]; x2,y2 = coords[dst]
                 ax.plot([x1,x2],[y1,y2], lw=2.0, alpha=0.4, color="royalblue")
         # Particles: stars on nodes
         for p in res.get("particles", []):